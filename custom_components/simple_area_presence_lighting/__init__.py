@@ -1,7 +1,82 @@
 """The Simple Area Presence Lighting integration."""
 from __future__ import annotations
 
-from .const import DOMAIN, PLATFORMS
+import homeassistant.helpers.config_validation as cv
+from homeassistant.components.switch import DOMAIN as SWITCH_DOMAIN
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+
+from .adjacency import AreaAdjacency
+from .commands import CommandTracker
+from .const import (
+    CONF_NAME,
+    DATA_ADJACENCY,
+    DATA_COMMANDS,
+    DATA_HIERARCHY,
+    DATA_SCHEDULER,
+    DATA_SKIP_RELOAD,
+    DATA_STREAM,
+    DATA_SUN,
+    DOMAIN,
+    PLATFORMS,
+    STORAGE_VERSION,
+    SWITCH_LIGHT_CONTROL_PREFIX_ID,
+)
+from .hierarchy import PresenceHierarchy
+from .metrics import MetricsView
+from .scheduler import StaggeredScheduler
+from .services import async_setup_services
+from .sun import SunDarkness
+from .websocket_api import AreaStateStream, async_setup_websocket_api
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass, config) -> bool:
+    """Set up the integration."""
+    hass.data.setdefault(DOMAIN, {})
+    hass.data[DOMAIN][DATA_SKIP_RELOAD] = set()
+
+    # Spread startup and periodic work of all areas
+    scheduler = StaggeredScheduler(hass)
+    hass.data[DOMAIN][DATA_SCHEDULER] = scheduler
+    hass.bus.async_listen_once(
+        EVENT_HOMEASSISTANT_STOP, scheduler.async_shutdown
+    )
+
+    # Track light commands of all areas until the lights respond
+    commands = CommandTracker(hass)
+    hass.data[DOMAIN][DATA_COMMANDS] = commands
+    hass.bus.async_listen_once(
+        EVENT_HOMEASSISTANT_STOP, commands.async_shutdown
+    )
+
+    # Darkness of the areas following the sun
+    sun = SunDarkness(hass)
+    hass.data[DOMAIN][DATA_SUN] = sun
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, sun.async_shutdown)
+
+    # Presence of the areas rolled up to the areas containing them
+    hass.data[DOMAIN][DATA_HIERARCHY] = PresenceHierarchy()
+
+    # Transitions between neighbouring areas for pre-lighting
+    adjacency = AreaAdjacency(hass)
+    await adjacency.async_load()
+    hass.data[DOMAIN][DATA_ADJACENCY] = adjacency
+
+    # Compact state of all areas for dashboards
+    hass.data[DOMAIN][DATA_STREAM] = AreaStateStream(hass)
+    async_setup_websocket_api(hass)
+
+    # Internal metrics for Prometheus, straight from memory
+    if hass.http is not None:
+        hass.http.register_view(MetricsView)
+
+    await async_setup_services(hass)
+
+    return True
 
 
 async def async_setup_entry(hass, entry) -> bool:
@@ -25,6 +100,25 @@ async def async_unload_entry(hass, entry) -> bool:
     return unload_ok
 
 
+async def async_remove_entry(hass, entry) -> None:
+    """Remove the data learned about the area of a removed entry."""
+    name = entry.data[CONF_NAME]
+    await Store(
+        hass, STORAGE_VERSION, f"{DOMAIN}.{slugify(name)}"
+    ).async_remove()
+
+    # The transitions of all areas are kept together
+    if entity_id := er.async_get(hass).async_get_entity_id(
+        SWITCH_DOMAIN, DOMAIN, f"{SWITCH_LIGHT_CONTROL_PREFIX_ID}_{name}"
+    ):
+        hass.data[DOMAIN][DATA_ADJACENCY].async_remove_transitions(entity_id)
+
+
 async def update_listener(hass, entry):
     """Handle options update."""
+    # Entries updated by a batch import are reloaded by the import itself
+    if entry.entry_id in hass.data[DOMAIN][DATA_SKIP_RELOAD]:
+        hass.data[DOMAIN][DATA_SKIP_RELOAD].discard(entry.entry_id)
+        return
+
     await hass.config_entries.async_reload(entry.entry_id)
@@ -0,0 +1,166 @@
+"""Adjacency of areas for the integration."""
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from functools import partial
+
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    PRELIGHT_MIN_PROBABILITY,
+    PRELIGHT_MIN_SAMPLES,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    TRANSITION_MAX_COUNT,
+    TRANSITION_WINDOW,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AreaAdjacency:
+    """Transitions between neighbouring areas.
+
+    Learns how often presence moves from an area to each of its neighbours
+    and pre-lights the most likely next area. Only the neighbours of the
+    area with new presence are consulted, and the counts are halved once
+    they grow large so the graph stays compact and follows new habits.
+    """
+
+    def __init__(self, hass) -> None:
+        """Initialize the adjacency."""
+        self.hass = hass
+
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.transitions")
+        self._neighbours: dict[str, set[str]] = {}
+        self._declared: dict[str, set[str]] = {}
+        self._counts: dict[str, dict[str, int]] = {}
+        self._prelights: dict[str, Callable[[], None]] = {}
+
+        self._present: set[str] = set()
+        self._last_present: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        """Return the number of areas with neighbours."""
+        return len(self._neighbours)
+
+    async def async_load(self) -> None:
+        """Load the learned transitions."""
+        self._counts = (await self._store.async_load() or {}).get("counts", {})
+
+    @callback
+    def async_add_area(
+        self,
+        node: str,
+        neighbours: list[str],
+        prelight: Callable[[], None],
+    ) -> Callable[[], None]:
+        """Add an area and the neighbours it declares."""
+        self._declared[node] = set(neighbours) - {node}
+        self._prelights[node] = prelight
+        self._update_neighbours()
+
+        return partial(self._async_remove_area, node)
+
+    @callback
+    def _async_remove_area(self, node: str) -> None:
+        self._declared.pop(node, None)
+        self._prelights.pop(node, None)
+        self._present.discard(node)
+        self._update_neighbours()
+
+    @callback
+    def async_remove_transitions(self, node: str) -> None:
+        """Forget the transitions from and to a removed area."""
+        removed = self._counts.pop(node, None) is not None
+        for source in list(self._counts):
+            counts = self._counts[source]
+            if counts.pop(node, None) is not None:
+                removed = True
+                if not counts:
+                    self._counts.pop(source)
+
+        if removed:
+            self._store.async_delay_save(
+                lambda: {"counts": self._counts}, STORAGE_SAVE_DELAY
+            )
+
+    def _update_neighbours(self) -> None:
+        """Rebuild the undirected graph from the declared neighbours."""
+        self._neighbours = {}
+        for node, neighbours in self._declared.items():
+            for neighbour in neighbours:
+                self._neighbours.setdefault(node, set()).add(neighbour)
+                self._neighbours.setdefault(neighbour, set()).add(node)
+
+    def probabilities(self, node: str) -> dict[str, float]:
+        """Return how likely presence moves to each neighbour of an area."""
+        counts = self._counts.get(node, {})
+        total = sum(counts.values())
+        if not total:
+            return {}
+
+        return {
+            neighbour: count / total
+            for neighbour, count in counts.items()
+            if neighbour in self._neighbours.get(node, ())
+        }
+
+    @callback
+    def async_presence_changed(self, node: str, present: bool) -> None:
+        """Learn a transition and pre-light the most likely next area."""
+        now = time.monotonic()
+        if not present:
+            self._present.discard(node)
+            self._last_present[node] = now
+            return
+
+        self._present.add(node)
+        neighbours = self._neighbours.get(node, ())
+
+        # Presence moved here from neighbours with recent presence
+        for neighbour in neighbours:
+            if neighbour in self._present or (
+                (last_present := self._last_present.get(neighbour)) is not None
+                and now - last_present <= TRANSITION_WINDOW
+            ):
+                self._add_transition(neighbour, node)
+
+        if sum(self._counts.get(node, {}).values()) < PRELIGHT_MIN_SAMPLES:
+            return
+
+        target, probability = max(
+            self.probabilities(node).items(),
+            key=lambda item: item[1],
+            default=(None, 0.0),
+        )
+        if probability < PRELIGHT_MIN_PROBABILITY:
+            return
+
+        if (
+            target not in self._present
+            and (prelight := self._prelights.get(target)) is not None
+        ):
+            _LOGGER.debug("Pre-lighting %s after presence in %s", target, node)
+            prelight()
+
+    def _add_transition(self, source: str, target: str) -> None:
+        """Count a transition between two areas."""
+        counts = self._counts.setdefault(source, {})
+        counts[target] = counts.get(target, 0) + 1
+
+        # Halve the counts, old habits fade and the numbers stay small
+        if counts[target] > TRANSITION_MAX_COUNT:
+            self._counts[source] = {
+                neighbour: count // 2
+                for neighbour, count in counts.items()
+                if count > 1
+            }
+
+        self._store.async_delay_save(
+            lambda: {"counts": self._counts}, STORAGE_SAVE_DELAY
+        )
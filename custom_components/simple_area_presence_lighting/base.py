@@ -2,13 +2,39 @@
 from __future__ import annotations
 
 import logging
+from datetime import timedelta
 
 from homeassistant.components.binary_sensor import (
     DOMAIN as BINARY_SENSOR_DOMAIN,
 )
 from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
+from homeassistant.core import callback
 from homeassistant.helpers import device_registry, entity_registry
-
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import (
+    CONF_AREA_ID,
+    CONF_CHILD_AREAS,
+    CONF_LIGHTS,
+    CONF_NUMERIC_PRESENCE_ENTITIES,
+    CONF_PRESENCE_SENSOR_ENTITIES,
+    CONF_SENSOR_DEVICE_CLASSES,
+    CONF_USE_AREA_LIGHTS,
+    CONF_USE_AREA_PRESENCE_SENSORS,
+    DATA_CONTROLLERS,
+    DATA_LIGHT_OWNERS,
+    DATA_RECONCILE_UNSUB,
+    DATA_STREAM,
+    DEFAULT_CHILD_AREAS,
+    DEFAULT_LIGHTS,
+    DEFAULT_NUMERIC_PRESENCE_ENTITIES,
+    DEFAULT_PRESENCE_SENSOR_ENTITIES,
+    DEFAULT_SENSOR_DEVICE_CLASSES,
+    DEFAULT_USE_AREA_LIGHTS,
+    DEFAULT_USE_AREA_PRESENCE_SENSORS,
+    DOMAIN,
+    RECONCILE_INTERVAL,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -81,3 +107,137 @@ def get_presence_sensor_entities_in_area(
     )
 
     return presence_sensor_entities
+
+
+def get_area_entities(hass, options):
+    """Return the lights and presence sensing entities of an area.
+
+    Returns None if the area has no lights or nothing to detect presence,
+    the entities of the area are not created then.
+    """
+    # Get area id
+    # Warning: Check if None before use
+    area_id = options[CONF_AREA_ID]
+
+    all_lights = []
+
+    # Get all lights in area
+    if options.get(CONF_USE_AREA_LIGHTS, DEFAULT_USE_AREA_LIGHTS):
+        # Check if there is an area set
+        if not area_id:
+            return None
+
+        all_lights = all_lights + get_lights_in_area(hass, area_id)
+
+    # Add lights from options
+    all_lights = all_lights + options.get(CONF_LIGHTS, DEFAULT_LIGHTS)
+
+    # Check if there are any lights
+    if not all_lights:
+        return None
+
+    all_presence_sensor_entities = []
+
+    # Get all presence sensing entities in area
+    if options.get(
+        CONF_USE_AREA_PRESENCE_SENSORS,
+        DEFAULT_USE_AREA_PRESENCE_SENSORS,
+    ):
+        # Check if there is an area set
+        if not area_id:
+            return None
+
+        supported_device_classes = options.get(
+            CONF_SENSOR_DEVICE_CLASSES,
+            DEFAULT_SENSOR_DEVICE_CLASSES,
+        )
+
+        all_presence_sensor_entities = (
+            all_presence_sensor_entities
+            + get_presence_sensor_entities_in_area(
+                hass, area_id, supported_device_classes
+            )
+        )
+
+    # Add presence sensing entities from options
+    all_presence_sensor_entities = all_presence_sensor_entities + options.get(
+        CONF_PRESENCE_SENSOR_ENTITIES, DEFAULT_PRESENCE_SENSOR_ENTITIES
+    )
+
+    # Check if there are any presence sensing entities or child areas
+    if (
+        not all_presence_sensor_entities
+        and not options.get(
+            CONF_NUMERIC_PRESENCE_ENTITIES, DEFAULT_NUMERIC_PRESENCE_ENTITIES
+        )
+        and not options.get(CONF_CHILD_AREAS, DEFAULT_CHILD_AREAS)
+    ):
+        return None
+
+    return all_lights, all_presence_sensor_entities
+
+
+@callback
+def async_register_controller(hass, controller):
+    """Register a light control switch for the domain wide work."""
+    controllers = hass.data[DOMAIN].setdefault(DATA_CONTROLLERS, {})
+    controllers[controller.unique_id] = controller
+
+    # Areas sharing lights arbitrate them through their owners
+    owners = hass.data[DOMAIN].setdefault(DATA_LIGHT_OWNERS, {})
+    for light in controller.lights:
+        owners.setdefault(light, set()).add(controller.unique_id)
+
+    # A single timer reconciles all areas together
+    if hass.data[DOMAIN].get(DATA_RECONCILE_UNSUB) is None:
+
+        @callback
+        def _async_reconcile_all(_now=None):
+            for controller in list(controllers.values()):
+                controller.async_schedule_staggered_reconcile()
+
+        hass.data[DOMAIN][DATA_RECONCILE_UNSUB] = async_track_time_interval(
+            hass,
+            _async_reconcile_all,
+            timedelta(seconds=RECONCILE_INTERVAL),
+            cancel_on_shutdown=True,
+        )
+
+
+@callback
+def async_unregister_controller(hass, controller):
+    """Unregister a light control switch."""
+    controllers = hass.data[DOMAIN].get(DATA_CONTROLLERS, {})
+    controllers.pop(controller.unique_id, None)
+    hass.data[DOMAIN][DATA_STREAM].async_remove(controller.entity_id)
+
+    owners = hass.data[DOMAIN].get(DATA_LIGHT_OWNERS, {})
+    for light in controller.lights:
+        if (light_owners := owners.get(light)) is not None:
+            light_owners.discard(controller.unique_id)
+            if not light_owners:
+                owners.pop(light)
+
+    if not controllers and (
+        unsub := hass.data[DOMAIN].pop(DATA_RECONCILE_UNSUB, None)
+    ):
+        unsub()
+
+
+@callback
+def async_get_claimed_lights(hass, controller) -> set[str]:
+    """Return the lights of a controller which another area wants on."""
+    owners = hass.data[DOMAIN].get(DATA_LIGHT_OWNERS, {})
+    controllers = hass.data[DOMAIN].get(DATA_CONTROLLERS, {})
+
+    claimed = set()
+    for light in controller.lights:
+        for owner in owners.get(light, ()):
+            if (
+                owner != controller.unique_id
+                and controllers[owner].wants_lights_on
+            ):
+                claimed.add(light)
+                break
+
+    return claimed
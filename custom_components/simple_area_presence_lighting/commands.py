@@ -0,0 +1,314 @@
+"""Command tracking for the integration."""
+from __future__ import annotations
+
+import logging
+import time
+from functools import partial
+
+from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    EVENT_STATE_CHANGED,
+    SERVICE_TURN_ON,
+    STATE_OFF,
+    STATE_ON,
+    STATE_UNAVAILABLE,
+)
+from homeassistant.core import Context, Event, State, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    COMMAND_ACK_TIMEOUT,
+    COMMAND_FLAKY_RETRY_RATE,
+    COMMAND_MAX_RETRIES,
+    COMMAND_SLOW_LATENCY,
+)
+from .stats import LatencyHistogram
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LightStats:
+    """Statistics of the commands sent to a light."""
+
+    __slots__ = ("commands", "duplicates", "retries", "failures", "latency")
+
+    def __init__(self) -> None:
+        """Initialize the statistics."""
+        self.commands = 0
+        self.duplicates = 0
+        self.retries = 0
+        self.failures = 0
+        self.latency = LatencyHistogram()
+
+    @property
+    def is_slow(self) -> bool:
+        """Return if the light usually responds slowly."""
+        p95 = self.latency.quantile(0.95)
+        return p95 is not None and p95 >= COMMAND_SLOW_LATENCY
+
+    @property
+    def is_flaky(self) -> bool:
+        """Return if the light drops commands."""
+        return bool(self.failures) or (
+            bool(self.commands)
+            and self.retries / self.commands >= COMMAND_FLAKY_RETRY_RATE
+        )
+
+    def as_dict(self) -> dict:
+        """Return the statistics of the light."""
+        return {
+            "commands": self.commands,
+            "duplicates": self.duplicates,
+            "retries": self.retries,
+            "failures": self.failures,
+            "slow": self.is_slow,
+            "flaky": self.is_flaky,
+            "latency": self.latency.as_dict(),
+        }
+
+
+class _Command:
+    """A light service call awaiting the target state of its lights."""
+
+    __slots__ = (
+        "service",
+        "target",
+        "context",
+        "pending",
+        "sent_at",
+        "deadline",
+    )
+
+    def __init__(self, service: str, context: Context) -> None:
+        self.service = service
+        self.target = STATE_ON if service == SERVICE_TURN_ON else STATE_OFF
+        self.context = context
+        self.pending: dict[str, int] = {}
+        self.sent_at = 0.0
+        self.deadline = 0.0
+
+
+class CommandTracker:
+    """Track light commands until the lights report their target state.
+
+    Lights which did not respond within the timeout are sent the command
+    again, with a doubled timeout per attempt. The response latency of every
+    light is recorded, so slow and flaky bulbs can be found.
+    """
+
+    def __init__(self, hass) -> None:
+        """Initialize the tracker."""
+        self.hass = hass
+        self.stats: dict[str, LightStats] = {}
+
+        self._pending: dict[str, _Command] = {}
+        self._acknowledged: dict[str, State] = {}
+        self._timers: dict[_Command, object] = {}
+        self._unsub_state_changed = None
+
+    async def async_send(
+        self,
+        lights: list[str],
+        service: str,
+        context: Context,
+        group: str | None = None,
+    ) -> bool:
+        """Call a light service for the lights not in the target state yet.
+
+        Lights already in the target state are skipped, so they neither
+        cause mesh traffic nor restart their transition, unless a command
+        with another target is in flight which may still land. When all lights
+        need the command, it is sent to their group instead, which native
+        groups turn into a single multicast. Retries are always sent to the
+        individual lights.
+
+        Intents for lights which already have a matching command in flight
+        are dropped, whichever area issued it. Returns if a command was sent.
+        """
+        command = _Command(service, context)
+        now = time.monotonic()
+
+        for light in lights:
+            if (
+                pending := self._pending.get(light)
+            ) is not None and pending.target == command.target:
+                if now < pending.deadline:
+                    self._stats(light).duplicates += 1
+                    continue
+
+            # The newer command supersedes pending ones, the light may still
+            # reach the target of the superseded one, so it is sent anyway
+            self._async_release(light)
+            if pending is None and self.hass.states.is_state(
+                light, command.target
+            ):
+                continue
+
+            self._pending[light] = command
+            command.pending[light] = 0
+            self._stats(light).commands += 1
+
+        if not command.pending:
+            return False
+
+        self._async_listen()
+
+        targets = list(command.pending)
+        if (
+            group is not None
+            and len(targets) == len(set(lights))
+            and (state := self.hass.states.get(group)) is not None
+            and state.state != STATE_UNAVAILABLE
+        ):
+            targets = [group]
+
+        await self._async_call(command, targets)
+        return True
+
+    @callback
+    def async_shutdown(self, _event=None) -> None:
+        """Stop tracking all commands."""
+        for unsub in self._timers.values():
+            unsub()
+        self._timers.clear()
+        self._pending.clear()
+        self._acknowledged.clear()
+
+        if self._unsub_state_changed is not None:
+            self._unsub_state_changed()
+            self._unsub_state_changed = None
+
+    def is_acknowledged(self, state: State) -> bool:
+        """Return if a light state is the response to a command.
+
+        Members of native groups report their new state with a context of
+        their own, so the context alone does not identify the response.
+        """
+        return self._acknowledged.get(state.entity_id) is state
+
+    def __len__(self) -> int:
+        """Return the number of lights awaiting their target state."""
+        return len(self._pending)
+
+    def _stats(self, light: str) -> LightStats:
+        if (stats := self.stats.get(light)) is None:
+            stats = self.stats[light] = LightStats()
+
+        return stats
+
+    async def _async_call(self, command: _Command, lights: list[str]) -> None:
+        """Call the service and wait for the lights to respond."""
+        command.sent_at = time.monotonic()
+        self._async_arm(command)
+
+        await self.hass.services.async_call(
+            LIGHT_DOMAIN,
+            command.service,
+            {ATTR_ENTITY_ID: lights},
+            context=command.context,
+        )
+
+    @callback
+    def _async_arm(self, command: _Command) -> None:
+        if unsub := self._timers.pop(command, None):
+            unsub()
+
+        timeout = COMMAND_ACK_TIMEOUT * 2 ** max(command.pending.values())
+        command.deadline = command.sent_at + timeout
+        self._timers[command] = async_call_later(
+            self.hass, timeout, partial(self._async_timeout, command)
+        )
+
+    @callback
+    def _async_listen(self) -> None:
+        if self._unsub_state_changed is None:
+            self._unsub_state_changed = self.hass.bus.async_listen(
+                EVENT_STATE_CHANGED,
+                self._async_state_changed,
+                self._async_filter_event,
+                run_immediately=True,
+            )
+
+    @callback
+    def _async_filter_event(self, event: Event) -> bool:
+        return event.data[ATTR_ENTITY_ID] in self._pending
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Acknowledge a command when its light reaches the target state."""
+        light = event.data[ATTR_ENTITY_ID]
+        command = self._pending[light]
+        new_state = event.data.get("new_state")
+
+        if new_state is None:
+            self._async_release(light)
+            return
+
+        if new_state.state == command.target:
+            latency = time.monotonic() - command.sent_at
+            self._stats(light).latency.add(latency)
+            _LOGGER.debug("%s responded after %.3fs", light, latency)
+            self._acknowledged[light] = new_state
+            self._async_release(light)
+            return
+
+        # Someone else switched the light, stop fighting over it
+        if new_state.state in (STATE_ON, STATE_OFF) and (
+            command.context.id
+            not in (new_state.context.id, new_state.context.parent_id)
+        ):
+            self._async_release(light)
+
+    @callback
+    def _async_release(self, light: str) -> None:
+        """Stop tracking a light."""
+        if (command := self._pending.pop(light, None)) is None:
+            return
+
+        command.pending.pop(light, None)
+        if not command.pending and (unsub := self._timers.pop(command, None)):
+            unsub()
+
+    @callback
+    def _async_timeout(self, command: _Command, _now=None) -> None:
+        """Retry the lights which did not respond."""
+        self._timers.pop(command, None)
+
+        retry = []
+        for light, attempt in list(command.pending.items()):
+            # Missed the state change, the light did respond
+            if self.hass.states.is_state(light, command.target):
+                self._async_release(light)
+                continue
+
+            if attempt >= COMMAND_MAX_RETRIES:
+                _LOGGER.warning(
+                    "%s did not respond to '%s' after %d attempts",
+                    light,
+                    command.service,
+                    attempt + 1,
+                )
+                self._stats(light).failures += 1
+                self._async_release(light)
+                continue
+
+            command.pending[light] = attempt + 1
+            self._stats(light).retries += 1
+            retry.append(light)
+
+        if retry:
+            _LOGGER.debug("Retrying '%s' for %s", command.service, retry)
+            self.hass.async_create_task(self._async_retry(command, retry))
+
+    async def _async_retry(self, command: _Command, lights: list[str]) -> None:
+        # Lights may have been taken over by a newer command meanwhile
+        lights = [light for light in lights if light in command.pending]
+        if not lights:
+            return
+
+        try:
+            await self._async_call(command, lights)
+        except HomeAssistantError as err:
+            _LOGGER.warning("Error retrying '%s': %s", command.service, err)
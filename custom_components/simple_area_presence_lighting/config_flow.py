@@ -10,6 +10,11 @@ from homeassistant.components.binary_sensor import (
     DOMAIN as BINARY_SENSOR_DOMAIN,
 )
 from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
+from homeassistant.components.sensor import (
+    DOMAIN as SENSOR_DOMAIN,
+    SensorDeviceClass,
+)
+from homeassistant.const import ATTR_DEVICE_CLASS
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 
@@ -18,20 +23,48 @@ from homeassistant.helpers.selector import (
     AreaSelectorConfig,
     EntitySelector,
     EntitySelectorConfig,
+    NumberSelector,
+    NumberSelectorConfig,
+    NumberSelectorMode,
     selector,
 )
 
 from .const import (
     ALL_BINARY_SENSOR_DEVICE_CLASSES,
+    ATTR_OPTIONS,
+    CONF_ADAPTIVE_OFF_DELAY,
+    CONF_ADAPTIVE_OFF_DELAY_QUANTILE,
+    CONF_ADJACENT_AREAS,
     CONF_AREA_ID,
+    CONF_BRIGHT_ILLUMINANCE,
+    CONF_CHATTER_THRESHOLD,
+    CONF_CHILD_AREAS,
     CONF_CREATE_LIGHT_GROUP,
+    CONF_DARK_ILLUMINANCE,
+    CONF_DARK_MODE,
+    CONF_ILLUMINANCE_SENSOR,
+    CONF_LIGHT_GROUP_ENTITY,
     CONF_LIGHTS,
+    CONF_MANUAL_OVERRIDE_DURATION,
+    CONF_MAX_OFF_DELAY,
+    CONF_MIN_DWELL,
+    CONF_NUMERIC_PRESENCE_ENTITIES,
+    CONF_NUMERIC_PRESENCE_INTERVAL,
+    CONF_NUMERIC_PRESENCE_THRESHOLD,
     CONF_NAME,
+    CONF_OCCUPANCY_MODEL,
+    CONF_OFF_DELAY,
+    CONF_PRELIGHT,
     CONF_PRESENCE_SENSOR_ENTITIES,
     CONF_SENSOR_DEVICE_CLASSES,
+    CONF_STAGGER_WINDOW,
+    CONF_SUN_ELEVATION,
+    CONF_SUN_OFFSET,
     CONF_STEP_USER_DATA_SCHEMA,
     CONF_USE_AREA_LIGHTS,
     CONF_USE_AREA_PRESENCE_SENSORS,
+    DARK_MODES,
+    DATA_CONTROLLERS,
     DOMAIN,
     VALIDATION_TUPLES,
 )
@@ -90,6 +123,19 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    async def async_step_import(
+        self, import_data: dict[str, Any]
+    ) -> FlowResult:
+        """Handle an entry created by the import service."""
+        await self.async_set_unique_id(import_data[CONF_NAME])
+        self._abort_if_unique_id_configured()
+
+        return self.async_create_entry(
+            title=import_data[CONF_NAME],
+            data={CONF_NAME: import_data[CONF_NAME]},
+            options=import_data[ATTR_OPTIONS],
+        )
+
     @staticmethod
     @callback
     def async_get_options_flow(
@@ -133,6 +179,25 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             )
         ]
 
+        # Light control switches of the other areas
+        controllers = self.hass.data.get(DOMAIN, {}).get(DATA_CONTROLLERS, {})
+        all_areas = [
+            controller.entity_id
+            for controller in controllers.values()
+            if controller.registry_entry is None
+            or controller.registry_entry.config_entry_id
+            != self.config_entry.entry_id
+        ]
+
+        all_numeric_sensors = self.hass.states.async_entity_ids(SENSOR_DOMAIN)
+
+        all_illuminance_sensors = [
+            state.entity_id
+            for state in self.hass.states.async_all(SENSOR_DOMAIN)
+            if state.attributes.get(ATTR_DEVICE_CLASS)
+            == SensorDeviceClass.ILLUMINANCE
+        ]
+
         selectors = {
             CONF_AREA_ID: self._build_selector_area(multiple=False),
             CONF_USE_AREA_LIGHTS: bool,
@@ -146,7 +211,67 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             CONF_PRESENCE_SENSOR_ENTITIES: self._build_selector_entity(
                 all_usable_sensors, multiple=True
             ),
+            CONF_NUMERIC_PRESENCE_ENTITIES: self._build_selector_entity(
+                sorted(all_numeric_sensors), multiple=True
+            ),
+            CONF_NUMERIC_PRESENCE_THRESHOLD: self._build_selector_number(
+                max_value=10000, step=0.1
+            ),
+            CONF_NUMERIC_PRESENCE_INTERVAL: self._build_selector_number(
+                max_value=60, step=0.1, unit="s"
+            ),
+            CONF_CHILD_AREAS: self._build_selector_entity(
+                sorted(all_areas), multiple=True
+            ),
+            CONF_ADJACENT_AREAS: self._build_selector_entity(
+                sorted(all_areas), multiple=True
+            ),
+            CONF_PRELIGHT: bool,
             CONF_CREATE_LIGHT_GROUP: bool,
+            CONF_LIGHT_GROUP_ENTITY: self._build_selector_entity(
+                sorted(all_lights), multiple=False
+            ),
+            CONF_MIN_DWELL: self._build_selector_number(
+                max_value=60, step=0.5, unit="s"
+            ),
+            CONF_CHATTER_THRESHOLD: self._build_selector_number(
+                max_value=600, step=1
+            ),
+            CONF_STAGGER_WINDOW: self._build_selector_number(
+                max_value=600, step=1, unit="s"
+            ),
+            CONF_MANUAL_OVERRIDE_DURATION: self._build_selector_number(
+                max_value=1440, step=1, unit="min"
+            ),
+            CONF_OFF_DELAY: self._build_selector_number(
+                max_value=3600, step=1, unit="s"
+            ),
+            CONF_OCCUPANCY_MODEL: bool,
+            CONF_ADAPTIVE_OFF_DELAY: bool,
+            CONF_ADAPTIVE_OFF_DELAY_QUANTILE: self._build_selector_number(
+                min_value=0.5, max_value=0.99, step=0.01
+            ),
+            CONF_MAX_OFF_DELAY: self._build_selector_number(
+                max_value=3600, step=1, unit="s"
+            ),
+            CONF_DARK_MODE: self._build_selector_dropdown_values(
+                DARK_MODES, multiple=False
+            ),
+            CONF_SUN_ELEVATION: self._build_selector_number(
+                min_value=-18, max_value=90, step=0.5, unit="°"
+            ),
+            CONF_SUN_OFFSET: self._build_selector_number(
+                min_value=-120, max_value=120, step=1, unit="min"
+            ),
+            CONF_ILLUMINANCE_SENSOR: self._build_selector_entity(
+                sorted(all_illuminance_sensors), multiple=False
+            ),
+            CONF_DARK_ILLUMINANCE: self._build_selector_number(
+                max_value=100000, step=1, unit="lx"
+            ),
+            CONF_BRIGHT_ILLUMINANCE: self._build_selector_number(
+                max_value=100000, step=1, unit="lx"
+            ),
         }
 
         options_schema = {}
@@ -177,6 +302,20 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             }
         )
 
+    def _build_selector_number(
+        self, min_value=0, max_value=100, step=1, unit=None
+    ):
+        config = NumberSelectorConfig(
+            min=min_value,
+            max=max_value,
+            step=step,
+            mode=NumberSelectorMode.BOX,
+        )
+        if unit is not None:
+            config["unit_of_measurement"] = unit
+
+        return NumberSelector(config)
+
     def _build_selector_entity(self, options=[], multiple=False):
         return NullableEntitySelector(
             EntitySelectorConfig(include_entities=options, multiple=multiple)
@@ -1,11 +1,12 @@
 """Constants for the integration."""
+from datetime import timedelta
 
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
 from homeassistant.components.binary_sensor import BinarySensorDeviceClass
 from homeassistant.const import Platform
 
-PLATFORMS: list[Platform] = [Platform.LIGHT, Platform.SWITCH]
+PLATFORMS: list[Platform] = [Platform.LIGHT, Platform.SENSOR, Platform.SWITCH]
 DOMAIN = "simple_area_presence_lighting"
 
 ALL_BINARY_SENSOR_DEVICE_CLASSES = [
@@ -32,10 +33,64 @@ CONF_PRESENCE_SENSOR_ENTITIES, DEFAULT_PRESENCE_SENSOR_ENTITIES = (
     "presence_sensor_entities",
     [],
 )
+CONF_NUMERIC_PRESENCE_ENTITIES, DEFAULT_NUMERIC_PRESENCE_ENTITIES = (
+    "numeric_presence_entities",
+    [],
+)
+CONF_NUMERIC_PRESENCE_THRESHOLD, DEFAULT_NUMERIC_PRESENCE_THRESHOLD = (
+    "numeric_presence_threshold",
+    0.0,
+)
+CONF_NUMERIC_PRESENCE_INTERVAL, DEFAULT_NUMERIC_PRESENCE_INTERVAL = (
+    "numeric_presence_interval",
+    1.0,
+)
+CONF_CHILD_AREAS, DEFAULT_CHILD_AREAS = "child_areas", []
+CONF_ADJACENT_AREAS, DEFAULT_ADJACENT_AREAS = "adjacent_areas", []
+CONF_PRELIGHT, DEFAULT_PRELIGHT = "prelight", False
 CONF_CREATE_LIGHT_GROUP, DEFAULT_CREATE_LIGHT_GROUP = (
     "create_light_group",
     False,
 )
+CONF_LIGHT_GROUP_ENTITY, DEFAULT_LIGHT_GROUP_ENTITY = (
+    "light_group_entity",
+    None,
+)
+CONF_MIN_DWELL, DEFAULT_MIN_DWELL = "min_dwell", 0.0
+CONF_CHATTER_THRESHOLD, DEFAULT_CHATTER_THRESHOLD = "chatter_threshold", 30.0
+CONF_RECONCILE, DEFAULT_RECONCILE = "reconcile", True
+CONF_STAGGER_WINDOW, DEFAULT_STAGGER_WINDOW = "stagger_window", 30.0
+CONF_MANUAL_OVERRIDE_DURATION, DEFAULT_MANUAL_OVERRIDE_DURATION = (
+    "manual_override_duration",
+    30.0,
+)
+CONF_OFF_DELAY, DEFAULT_OFF_DELAY = "off_delay", 0.0
+CONF_OCCUPANCY_MODEL, DEFAULT_OCCUPANCY_MODEL = "occupancy_model", False
+CONF_ADAPTIVE_OFF_DELAY, DEFAULT_ADAPTIVE_OFF_DELAY = (
+    "adaptive_off_delay",
+    False,
+)
+CONF_ADAPTIVE_OFF_DELAY_QUANTILE, DEFAULT_ADAPTIVE_OFF_DELAY_QUANTILE = (
+    "adaptive_off_delay_quantile",
+    0.9,
+)
+CONF_MAX_OFF_DELAY, DEFAULT_MAX_OFF_DELAY = "max_off_delay", 600.0
+DARK_MODE_MANUAL = "manual"
+DARK_MODE_SUN = "sun"
+DARK_MODE_ILLUMINANCE = "illuminance"
+DARK_MODES = [DARK_MODE_MANUAL, DARK_MODE_SUN, DARK_MODE_ILLUMINANCE]
+CONF_DARK_MODE, DEFAULT_DARK_MODE = "dark_mode", DARK_MODE_MANUAL
+CONF_SUN_ELEVATION, DEFAULT_SUN_ELEVATION = "sun_elevation", 3.0
+CONF_SUN_OFFSET, DEFAULT_SUN_OFFSET = "sun_offset", 0.0
+CONF_ILLUMINANCE_SENSOR, DEFAULT_ILLUMINANCE_SENSOR = (
+    "illuminance_sensor",
+    None,
+)
+CONF_DARK_ILLUMINANCE, DEFAULT_DARK_ILLUMINANCE = "dark_illuminance", 20.0
+CONF_BRIGHT_ILLUMINANCE, DEFAULT_BRIGHT_ILLUMINANCE = (
+    "bright_illuminance",
+    50.0,
+)
 CONF_STEP_USER_DATA_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_NAME): cv.string,
@@ -61,20 +116,195 @@ VALIDATION_TUPLES = [
         DEFAULT_PRESENCE_SENSOR_ENTITIES,
         cv.entity_ids,
     ),
+    (
+        CONF_NUMERIC_PRESENCE_ENTITIES,
+        DEFAULT_NUMERIC_PRESENCE_ENTITIES,
+        cv.entity_ids,
+    ),
+    (
+        CONF_NUMERIC_PRESENCE_THRESHOLD,
+        DEFAULT_NUMERIC_PRESENCE_THRESHOLD,
+        vol.Coerce(float),
+    ),
+    (
+        CONF_NUMERIC_PRESENCE_INTERVAL,
+        DEFAULT_NUMERIC_PRESENCE_INTERVAL,
+        vol.All(vol.Coerce(float), vol.Range(min=0)),
+    ),
+    (CONF_CHILD_AREAS, DEFAULT_CHILD_AREAS, cv.entity_ids),
+    (CONF_ADJACENT_AREAS, DEFAULT_ADJACENT_AREAS, cv.entity_ids),
+    (CONF_PRELIGHT, DEFAULT_PRELIGHT, bool),
     (CONF_CREATE_LIGHT_GROUP, DEFAULT_CREATE_LIGHT_GROUP, bool),
+    (
+        CONF_LIGHT_GROUP_ENTITY,
+        DEFAULT_LIGHT_GROUP_ENTITY,
+        vol.Any(None, cv.entity_id),
+    ),
+    (
+        CONF_MIN_DWELL,
+        DEFAULT_MIN_DWELL,
+        vol.All(vol.Coerce(float), vol.Range(min=0)),
+    ),
+    (
+        CONF_CHATTER_THRESHOLD,
+        DEFAULT_CHATTER_THRESHOLD,
+        vol.All(vol.Coerce(float), vol.Range(min=0)),
+    ),
+    (CONF_RECONCILE, DEFAULT_RECONCILE, bool),
+    (
+        CONF_STAGGER_WINDOW,
+        DEFAULT_STAGGER_WINDOW,
+        vol.All(vol.Coerce(float), vol.Range(min=0)),
+    ),
+    (
+        CONF_MANUAL_OVERRIDE_DURATION,
+        DEFAULT_MANUAL_OVERRIDE_DURATION,
+        vol.All(vol.Coerce(float), vol.Range(min=0)),
+    ),
+    (
+        CONF_OFF_DELAY,
+        DEFAULT_OFF_DELAY,
+        vol.All(vol.Coerce(float), vol.Range(min=0)),
+    ),
+    (CONF_OCCUPANCY_MODEL, DEFAULT_OCCUPANCY_MODEL, bool),
+    (CONF_ADAPTIVE_OFF_DELAY, DEFAULT_ADAPTIVE_OFF_DELAY, bool),
+    (
+        CONF_ADAPTIVE_OFF_DELAY_QUANTILE,
+        DEFAULT_ADAPTIVE_OFF_DELAY_QUANTILE,
+        vol.All(vol.Coerce(float), vol.Range(min=0.5, max=0.99)),
+    ),
+    (
+        CONF_MAX_OFF_DELAY,
+        DEFAULT_MAX_OFF_DELAY,
+        vol.All(vol.Coerce(float), vol.Range(min=0)),
+    ),
+    (CONF_DARK_MODE, DEFAULT_DARK_MODE, vol.In(DARK_MODES)),
+    (
+        CONF_SUN_ELEVATION,
+        DEFAULT_SUN_ELEVATION,
+        vol.All(vol.Coerce(float), vol.Range(min=-18, max=90)),
+    ),
+    (
+        CONF_SUN_OFFSET,
+        DEFAULT_SUN_OFFSET,
+        vol.All(vol.Coerce(float), vol.Range(min=-120, max=120)),
+    ),
+    (
+        CONF_ILLUMINANCE_SENSOR,
+        DEFAULT_ILLUMINANCE_SENSOR,
+        vol.Any(None, cv.entity_id),
+    ),
+    (
+        CONF_DARK_ILLUMINANCE,
+        DEFAULT_DARK_ILLUMINANCE,
+        vol.All(vol.Coerce(float), vol.Range(min=0)),
+    ),
+    (
+        CONF_BRIGHT_ILLUMINANCE,
+        DEFAULT_BRIGHT_ILLUMINANCE,
+        vol.All(vol.Coerce(float), vol.Range(min=0)),
+    ),
 ]
 
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(name, default=default): validation
+        for name, default, validation in VALIDATION_TUPLES
+    }
+)
+
 ACTION_TURN_OFF_LIGHTS = "turn_off"
 ACTION_TURN_ON_LIGHTS = "turn_on"
 
+ATTR_CPROFILE = "cprofile"
+ATTR_DURATION = "duration"
+ATTR_ENTRIES = "entries"
+ATTR_FILENAME = "filename"
 ATTR_LIGHTS = "lights"
+ATTR_MANUAL_OVERRIDE_UNTIL = "manual_override_until"
+ATTR_OPTIONS = "options"
 ATTR_PRESENCE = "presence"
 ATTR_PRESENCE_ACTIVE = "active_sensors"
 ATTR_PRESENCE_SENSOR_ENTITIES = "sensors"
+ATTR_QUARANTINED_SENSORS = "quarantined_sensors"
+ATTR_VERSION = "version"
+
+DATA_ADJACENCY = "adjacency"
+DATA_COMMANDS = "commands"
+DATA_CONTROLLERS = "controllers"
+DATA_HIERARCHY = "hierarchy"
+DATA_LIGHT_OWNERS = "light_owners"
+DATA_RECONCILE_UNSUB = "reconcile_unsub"
+DATA_SCHEDULER = "scheduler"
+DATA_SKIP_RELOAD = "skip_reload"
+DATA_STREAM = "stream"
+DATA_SUN = "sun"
+
+RECONCILE_INTERVAL = 300
+RECONNECT_STAGGER_WINDOW = 2.0
+
+OCCUPANCY_BINS = 48
+OCCUPANCY_DECAY = 0.95
+OCCUPANCY_MAX_EXTENSION = 300
+OCCUPANCY_MIN_SAMPLES = 3
+RETRIGGER_WINDOW = 300
+
+ADAPTIVE_MIN_SAMPLES = 5
+
+COMMAND_ACK_TIMEOUT = 5
+COMMAND_MAX_RETRIES = 2
+COMMAND_SLOW_LATENCY = 2.0
+COMMAND_FLAKY_RETRY_RATE = 0.1
+
+PRELIGHT_MIN_PROBABILITY = 0.5
+PRELIGHT_MIN_SAMPLES = 5
+PRELIGHT_TIMEOUT = 60
+TRANSITION_MAX_COUNT = 1000
+TRANSITION_WINDOW = 30
+
+TRACE_OUTCOME_DELAYED_OFF = "delayed_off"
+TRACE_OUTCOME_MANUAL_OVERRIDE = "manual_override"
+TRACE_SIZE = 64
+TRACE_SOURCE_CHILD_AREAS = "child_areas"
+TRACE_SOURCE_OFF_DELAY = "off_delay"
+TRACE_SOURCE_PRELIGHT = "prelight"
+TRACE_SOURCE_RECONCILE = "reconcile"
+
+SUN_TABLE_STEP = timedelta(minutes=5)
+SUN_TABLE_MARGIN = timedelta(hours=3)
+
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 60
+
+ISSUE_SENSOR_QUARANTINED = "sensor_quarantined"
+QUARANTINE_CHECK_INTERVAL = 60
+
+EXPORT_VERSION = 1
+DEFAULT_EXPORT_FILENAME = f"{DOMAIN}.json"
+
+DEFAULT_PROFILE_DURATION = 60
+DEFAULT_PROFILE_FILENAME = f"{DOMAIN}_profile.json"
+MAX_PROFILE_DURATION = 3600
+
+SERVICE_EXPORT_CONFIG = "export_config"
+SERVICE_GET_TRACE = "get_trace"
+SERVICE_IMPORT_CONFIG = "import_config"
+SERVICE_PROFILE = "profile"
+
+WS_TYPE_SUBSCRIBE = f"{DOMAIN}/subscribe"
+
+METRICS_PREFIX = DOMAIN
+METRICS_URL = f"/api/{DOMAIN}/metrics"
 
 LIGHT_GROUP_PREFIX_ID = f"{DOMAIN}_lights"
 LIGHT_GROUP_PREFIX_NAME = "Area Lights"
 
+SENSOR_LATENCY_ICON = "mdi:timer-outline"
+SENSOR_DISPATCH_LATENCY_PREFIX_ID = f"{DOMAIN}_dispatch_latency"
+SENSOR_DISPATCH_LATENCY_PREFIX_NAME = "Dispatch Latency"
+SENSOR_LIGHT_LATENCY_PREFIX_ID = f"{DOMAIN}_light_latency"
+SENSOR_LIGHT_LATENCY_PREFIX_NAME = "Light Latency"
+
 SWITCH_AREA_DARK_ICON = "mdi:weather-night"
 SWITCH_AREA_DARK_PREFIX_ID = f"{DOMAIN}_area_dark"
 SWITCH_AREA_DARK_PREFIX_NAME = "Area Dark"
@@ -0,0 +1,51 @@
+"""Diagnostics for the integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_COMMANDS, DATA_CONTROLLERS, DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return the diagnostics of a config entry."""
+    commands = hass.data[DOMAIN][DATA_COMMANDS]
+
+    lights = {}
+    latency = {}
+    sensors = {}
+    trace = {}
+    for controller in hass.data[DOMAIN].get(DATA_CONTROLLERS, {}).values():
+        if (
+            controller.registry_entry is None
+            or controller.registry_entry.config_entry_id != entry.entry_id
+        ):
+            continue
+
+        latency[controller.entity_id] = {
+            "dispatch": controller.dispatch_latency.as_dict(),
+            "light": controller.light_latency.as_dict(),
+        }
+        trace[controller.entity_id] = controller.trace.as_list()
+        sensors[controller.entity_id] = controller.sensor_statistics()
+        for light in controller.lights:
+            if (stats := commands.stats.get(light)) is not None:
+                lights[light] = stats.as_dict()
+
+    return {
+        "options": dict(entry.options),
+        "lights": lights,
+        "latency": latency,
+        "sensors": sensors,
+        "trace": trace,
+        "slow_lights": [
+            light for light, stats in lights.items() if stats["slow"]
+        ],
+        "flaky_lights": [
+            light for light, stats in lights.items() if stats["flaky"]
+        ],
+    }
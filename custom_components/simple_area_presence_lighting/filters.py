@@ -0,0 +1,265 @@
+"""Streaming filters for the sources of the integration."""
+from __future__ import annotations
+
+import math
+from statistics import median
+
+# Time constant of the toggle rate, a rate of 1.0 is one toggle per minute
+CHATTER_RATE_WINDOW = 60.0
+
+# Readings of the median filter and weight of a reading in the average
+ILLUMINANCE_MEDIAN_WINDOW = 3
+ILLUMINANCE_SMOOTHING = 0.3
+
+
+class ChatterFilter:
+    """Streaming statistics and debounce of a binary presence sensor.
+
+    Keeps a constant amount of state per sensor: the accepted state, an
+    exponentially decayed toggle rate and the mean dwell time of both states.
+    """
+
+    __slots__ = (
+        "min_dwell",
+        "threshold",
+        "raw",
+        "state",
+        "last_toggle",
+        "last_accepted",
+        "toggles",
+        "toggle_rate",
+        "mean_dwell_on",
+        "mean_dwell_off",
+        "quarantined",
+    )
+
+    def __init__(self, min_dwell: float, threshold: float) -> None:
+        """Initialize the filter."""
+        self.min_dwell = min_dwell
+        self.threshold = threshold
+
+        self.raw: bool | None = None
+        self.state: bool | None = None
+        self.last_toggle: float | None = None
+        self.last_accepted: float | None = None
+
+        self.toggles = 0
+        self.toggle_rate = 0.0
+        self.mean_dwell_on: float | None = None
+        self.mean_dwell_off: float | None = None
+
+        self.quarantined = False
+
+    def rate(self, now: float) -> float:
+        """Return the toggle rate per minute decayed until now."""
+        if self.last_toggle is None:
+            return 0.0
+
+        return self.toggle_rate * math.exp(
+            -(now - self.last_toggle) / CHATTER_RATE_WINDOW
+        )
+
+    def update(self, is_on: bool, now: float) -> bool:
+        """Record a raw state and return if it is accepted as an edge."""
+        if self.raw is None:
+            self.raw = self.state = is_on
+            self.last_toggle = self.last_accepted = now
+            return False
+
+        if is_on != self.raw:
+            self._record_toggle(is_on, now)
+            self.raw = is_on
+
+        if is_on == self.state or self.quarantined:
+            return False
+
+        # Debounce toggles arriving before the minimum dwell time passed
+        if self.remaining_dwell(now) > 0:
+            return False
+
+        self.state = is_on
+        self.last_accepted = now
+        return True
+
+    def remaining_dwell(self, now: float) -> float:
+        """Return the time until a new state can be accepted."""
+        if self.last_accepted is None:
+            return 0.0
+
+        return max(0.0, self.last_accepted + self.min_dwell - now)
+
+    def check_quarantine(self, now: float) -> bool:
+        """Update and return if the sensor is quarantined."""
+        if not self.threshold:
+            self.quarantined = False
+        elif self.rate(now) > self.threshold:
+            self.quarantined = True
+        elif self.quarantined and self.rate(now) < self.threshold / 2:
+            # Release with hysteresis so the sensor does not flap in and out
+            self.quarantined = False
+            self.state = self.raw
+            self.last_accepted = now
+
+        return self.quarantined
+
+    def as_dict(self, now: float) -> dict:
+        """Return the statistics of the sensor."""
+        return {
+            "state": self.state,
+            "toggles": self.toggles,
+            "toggle_rate": round(self.rate(now), 2),
+            "mean_dwell_on": self.mean_dwell_on,
+            "mean_dwell_off": self.mean_dwell_off,
+            "quarantined": self.quarantined,
+        }
+
+    def _record_toggle(self, is_on: bool, now: float) -> None:
+        dwell = now - self.last_toggle
+
+        # The sensor left the opposite state, update its mean dwell time
+        if is_on:
+            self.mean_dwell_off = _ema(self.mean_dwell_off, dwell)
+        else:
+            self.mean_dwell_on = _ema(self.mean_dwell_on, dwell)
+
+        self.toggle_rate = self.rate(now) + 1.0
+        self.last_toggle = now
+        self.toggles += 1
+
+
+class NumericPresenceFilter:
+    """Thresholding and rate limiting of a numeric presence source.
+
+    Distance and energy entities of mmWave sensors update several times a
+    second. Readings are evaluated at most once per interval and only a
+    crossing of the threshold is reported, like the edge of a binary sensor.
+    """
+
+    __slots__ = ("threshold", "min_interval", "state", "last_update")
+
+    def __init__(self, threshold: float, min_interval: float) -> None:
+        """Initialize the filter."""
+        self.threshold = threshold
+        self.min_interval = min_interval
+
+        self.state: bool | None = None
+        self.last_update: float | None = None
+
+    def remaining_interval(self, now: float) -> float:
+        """Return the time until the next reading is evaluated."""
+        if self.last_update is None:
+            return 0.0
+
+        return max(0.0, self.last_update + self.min_interval - now)
+
+    def update(self, value: float, now: float | None = None) -> bool:
+        """Record a reading and return if it crossed the threshold.
+
+        Readings without a time, like the state when listening starts, do
+        not count towards the interval.
+        """
+        if now is not None:
+            self.last_update = now
+
+        state = value > self.threshold
+        if state == self.state:
+            return False
+
+        crossed = self.state is not None
+        self.state = state
+        return crossed
+
+    def clear(self) -> bool:
+        """Drop the presence of an unavailable source.
+
+        Returns if the source detected presence. A known source stays
+        known, so a reading above the threshold once it is back is a
+        crossing again.
+        """
+        present = bool(self.state)
+        if self.state is not None:
+            self.state = False
+
+        return present
+
+
+class IlluminanceFilter:
+    """Streaming darkness of an area from an illuminance sensor.
+
+    Readings pass a short median filter against spikes and an exponential
+    moving average, and the darkness only changes when the filtered value
+    crosses the thresholds. The illuminance of the own lights is learned
+    from the step when they turn on and subtracted while they are on.
+    """
+
+    __slots__ = (
+        "dark_below",
+        "bright_above",
+        "readings",
+        "value",
+        "dark",
+        "lights_on",
+        "contribution",
+        "reference",
+    )
+
+    def __init__(self, dark_below: float, bright_above: float) -> None:
+        """Initialize the filter."""
+        self.dark_below = dark_below
+        self.bright_above = max(bright_above, dark_below)
+
+        self.readings: list[float] = []
+        self.value: float | None = None
+        self.dark: bool | None = None
+
+        self.lights_on = False
+        self.contribution = 0.0
+        self.reference: float | None = None
+
+    def set_lights_on(self, lights_on: bool) -> None:
+        """Record if the own lights are on."""
+        # Learn the contribution of the lights from the next reading
+        if lights_on and not self.lights_on:
+            self.reference = self.value
+        elif not lights_on:
+            self.reference = None
+
+        self.lights_on = lights_on
+
+    def update(self, illuminance: float) -> bool | None:
+        """Record a reading and return the darkness if it changed."""
+        if self.lights_on:
+            if self.reference is not None:
+                step = max(illuminance - self.reference, 0.0)
+                self.contribution = _ema(
+                    self.contribution if self.contribution else None, step
+                )
+                self.reference = None
+
+            illuminance = max(illuminance - self.contribution, 0.0)
+
+        self.readings.append(illuminance)
+        del self.readings[:-ILLUMINANCE_MEDIAN_WINDOW]
+        self.value = _ema(
+            self.value, median(self.readings), ILLUMINANCE_SMOOTHING
+        )
+
+        if self.dark is None:
+            dark = self.value < (self.dark_below + self.bright_above) / 2
+        elif self.dark:
+            dark = self.value <= self.bright_above
+        else:
+            dark = self.value < self.dark_below
+
+        if dark == self.dark:
+            return None
+
+        self.dark = dark
+        return dark
+
+
+def _ema(mean: float | None, value: float, alpha: float = 0.2) -> float:
+    if mean is None:
+        return value
+
+    return mean + alpha * (value - mean)
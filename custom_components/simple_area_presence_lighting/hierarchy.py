@@ -0,0 +1,123 @@
+"""Hierarchy of areas for the integration."""
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from functools import partial
+
+from homeassistant.core import callback
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PresenceHierarchy:
+    """Presence of areas rolled up to the areas containing them.
+
+    Areas form a directed acyclic graph, e.g. room -> floor -> house. Every
+    area counts its children with presence, so a change of an area only
+    updates the counters of its ancestors until the presence of an ancestor
+    does not change, instead of recomputing the whole graph.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the hierarchy."""
+        self._children: dict[str, set[str]] = {}
+        self._parents: dict[str, set[str]] = {}
+        self._own: dict[str, bool] = {}
+        self._counts: dict[str, int] = {}
+        self._listeners: dict[str, Callable[[bool], None]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of areas in the hierarchy."""
+        return len(self._own)
+
+    def is_present(self, node: str) -> bool:
+        """Return if there is presence in an area or any area it contains."""
+        return self._own.get(node, False) or self._counts.get(node, 0) > 0
+
+    @callback
+    def async_add_node(
+        self,
+        node: str,
+        children: list[str],
+        present: bool,
+        listener: Callable[[bool], None],
+    ) -> Callable[[], None]:
+        """Add an area and call a listener when its children change it."""
+        self._children[node] = set()
+        for child in children:
+            if child == node or self._is_ancestor(child, node):
+                _LOGGER.warning(
+                    "Ignoring child area %s of %s, it contains %s",
+                    child,
+                    node,
+                    node,
+                )
+                continue
+
+            self._children[node].add(child)
+            self._parents.setdefault(child, set()).add(node)
+
+        self._own[node] = present
+        self._counts[node] = sum(
+            self.is_present(child) for child in self._children[node]
+        )
+        self._listeners[node] = listener
+
+        if self.is_present(node):
+            self._propagate(node, 1)
+
+        return partial(self._async_remove_node, node)
+
+    @callback
+    def async_set_present(self, node: str, present: bool) -> None:
+        """Set the presence detected by an area itself."""
+        if node not in self._own or self._own[node] == present:
+            return
+
+        before = self.is_present(node)
+        self._own[node] = present
+        if self.is_present(node) != before:
+            self._propagate(node, 1 if present else -1)
+
+    @callback
+    def _async_remove_node(self, node: str) -> None:
+        if self.is_present(node):
+            self._propagate(node, -1)
+
+        # Edges to the parents are kept, they belong to the parents
+        for child in self._children.pop(node, ()):
+            self._parents[child].discard(node)
+        self._own.pop(node, None)
+        self._counts.pop(node, None)
+        self._listeners.pop(node, None)
+
+    def _is_ancestor(self, node: str, descendant: str) -> bool:
+        """Return if an area contains another one."""
+        pending = [descendant]
+        seen = set()
+        while pending:
+            current = pending.pop()
+            for parent in self._parents.get(current, ()):
+                if parent == node:
+                    return True
+                if parent not in seen:
+                    seen.add(parent)
+                    pending.append(parent)
+
+        return False
+
+    def _propagate(self, node: str, delta: int) -> None:
+        """Update the counters of the ancestors of a changed area."""
+        for parent in self._parents.get(node, ()):
+            if parent not in self._counts:
+                continue
+
+            before = self.is_present(parent)
+            self._counts[parent] += delta
+            present = self.is_present(parent)
+            if present == before:
+                continue
+
+            self._listeners[parent](present)
+            self._propagate(parent, delta)
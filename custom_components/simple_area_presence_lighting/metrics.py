@@ -0,0 +1,195 @@
+"""Prometheus metrics for the integration."""
+from __future__ import annotations
+
+from aiohttp import web
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DATA_ADJACENCY,
+    DATA_COMMANDS,
+    DATA_CONTROLLERS,
+    DATA_HIERARCHY,
+    DATA_LIGHT_OWNERS,
+    DATA_SCHEDULER,
+    DATA_STREAM,
+    DOMAIN,
+    METRICS_PREFIX,
+    METRICS_URL,
+)
+from .stats import LatencyHistogram
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value) -> str:
+    """Format a sample value in full precision."""
+    if isinstance(value, float):
+        return repr(value)
+
+    return str(int(value))
+
+
+class _MetricsWriter:
+    """Writer of the Prometheus text format."""
+
+    def __init__(self) -> None:
+        """Initialize the writer."""
+        self._lines: list[str] = []
+
+    def metric(self, name: str, kind: str, description: str) -> None:
+        """Start a metric family."""
+        self._lines.append(f"# HELP {METRICS_PREFIX}_{name} {description}")
+        self._lines.append(f"# TYPE {METRICS_PREFIX}_{name} {kind}")
+
+    def sample(self, name: str, labels: dict[str, str], value) -> None:
+        """Add a sample of a metric."""
+        label_text = ",".join(
+            f'{key}="{_escape(label)}"' for key, label in labels.items()
+        )
+        if label_text:
+            label_text = f"{{{label_text}}}"
+        self._lines.append(
+            f"{METRICS_PREFIX}_{name}{label_text} {_format(value)}"
+        )
+
+    def histogram(
+        self, name: str, labels: dict[str, str], histogram: LatencyHistogram
+    ) -> None:
+        """Add the cumulative buckets, sum and count of a histogram."""
+        cumulative = 0
+        for bound, count in zip(histogram.bounds, histogram.counts):
+            cumulative += count
+            self.sample(
+                f"{name}_bucket", {**labels, "le": f"{bound:g}"}, cumulative
+            )
+        self.sample(
+            f"{name}_bucket", {**labels, "le": "+Inf"}, histogram.count
+        )
+        self.sample(f"{name}_sum", labels, histogram.total)
+        self.sample(f"{name}_count", labels, histogram.count)
+
+    def render(self) -> str:
+        """Return the metrics as text."""
+        return "\n".join(self._lines) + "\n"
+
+
+def render_metrics(hass: HomeAssistant) -> str:
+    """Render the in-memory metrics of all areas."""
+    data = hass.data[DOMAIN]
+    controllers = sorted(
+        data.get(DATA_CONTROLLERS, {}).values(),
+        key=lambda controller: controller.entity_id,
+    )
+    stats = sorted(data[DATA_COMMANDS].stats.items())
+    states = [
+        (controller.entity_id, controller.compact_state())
+        for controller in controllers
+    ]
+    writer = _MetricsWriter()
+
+    # Areas
+    for name, kind, description, index in (
+        ("presence", "gauge", "Presence detected in the area.", 0),
+        ("dark", "gauge", "Area is dark.", 1),
+        ("manual_override", "gauge", "Automatic control is paused.", 2),
+        ("lights_on", "gauge", "Number of lights on in the area.", 3),
+    ):
+        writer.metric(name, kind, description)
+        for entity_id, state in states:
+            writer.sample(name, {"area": entity_id}, state[index])
+
+    for name, attr, description in (
+        (
+            "handler_seconds",
+            "handler_latency",
+            "Time spent handling the queued events of an area.",
+        ),
+        (
+            "dispatch_seconds",
+            "dispatch_latency",
+            "Latency from a presence sensor edge to the light command.",
+        ),
+        (
+            "light_seconds",
+            "light_latency",
+            "Latency from a presence sensor edge to the first light on.",
+        ),
+    ):
+        writer.metric(name, "histogram", description)
+        for controller in controllers:
+            writer.histogram(
+                name,
+                {"area": controller.entity_id},
+                getattr(controller, attr),
+            )
+
+    writer.metric("tracked_entities", "gauge", "Entities an area listens to.")
+    for controller in controllers:
+        writer.sample(
+            "tracked_entities",
+            {"area": controller.entity_id},
+            len(controller.tracked_entities),
+        )
+
+    # Lights
+    for name, attr, description in (
+        ("commands_total", "commands", "Commands sent to the light."),
+        (
+            "duplicate_commands_total",
+            "duplicates",
+            "Commands dropped as a matching one was in flight.",
+        ),
+        ("retries_total", "retries", "Commands sent again to the light."),
+        (
+            "failures_total",
+            "failures",
+            "Commands the light did not respond to.",
+        ),
+    ):
+        writer.metric(name, "counter", description)
+        for light, light_stats in stats:
+            writer.sample(name, {"light": light}, getattr(light_stats, attr))
+
+    writer.metric(
+        "command_seconds",
+        "histogram",
+        "Latency from a command until the light reports its target state.",
+    )
+    for light, light_stats in stats:
+        writer.histogram(
+            "command_seconds", {"light": light}, light_stats.latency
+        )
+
+    # Sizes of the domain wide indexes
+    writer.metric("index_size", "gauge", "Entries of a domain wide index.")
+    for index, size in (
+        ("controllers", len(controllers)),
+        ("light_owners", len(data.get(DATA_LIGHT_OWNERS, {}))),
+        ("pending_commands", len(data[DATA_COMMANDS])),
+        ("scheduled", len(data[DATA_SCHEDULER])),
+        ("hierarchy", len(data[DATA_HIERARCHY])),
+        ("adjacency", len(data[DATA_ADJACENCY])),
+        ("subscribers", len(data[DATA_STREAM])),
+    ):
+        writer.sample("index_size", {"index": index}, size)
+
+    return writer.render()
+
+
+class MetricsView(HomeAssistantView):
+    """Metrics of the integration in the Prometheus text format."""
+
+    url = METRICS_URL
+    name = f"api:{DOMAIN}:metrics"
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Return the metrics."""
+        return web.Response(
+            text=render_metrics(request.app[KEY_HASS]),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
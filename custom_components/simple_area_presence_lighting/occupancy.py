@@ -0,0 +1,97 @@
+"""Occupancy model for the integration."""
+from __future__ import annotations
+
+from array import array
+from datetime import datetime
+
+from .const import (
+    OCCUPANCY_BINS,
+    OCCUPANCY_DECAY,
+    OCCUPANCY_MAX_EXTENSION,
+    OCCUPANCY_MIN_SAMPLES,
+    RETRIGGER_WINDOW,
+)
+
+_KEYS = ("clears", "retriggers", "gaps")
+
+
+class OccupancyModel:
+    """Time-of-day histograms of the presence of an area.
+
+    Every histogram is a fixed-size array of exponentially decayed counts,
+    so updates are O(1) and the memory per area is bounded. A presence
+    detected shortly after presence cleared counts as re-trigger of the bin
+    in which presence cleared, and its interval is added to the gaps of the
+    bin, so the mean interval of the re-triggers is known per bin.
+    """
+
+    __slots__ = (*_KEYS, "_last_clear", "_last_clear_bin")
+
+    def __init__(self, data: dict | None = None) -> None:
+        """Initialize the model, optionally from stored data."""
+        for key in _KEYS:
+            values = (data or {}).get(key)
+            if not values or len(values) != OCCUPANCY_BINS:
+                values = [0.0] * OCCUPANCY_BINS
+            setattr(self, key, array("d", values))
+
+        self._last_clear: float | None = None
+        self._last_clear_bin = 0
+
+    @staticmethod
+    def bin_of(local: datetime) -> int:
+        """Return the bin of a local time."""
+        return (local.hour * 60 + local.minute) * OCCUPANCY_BINS // 1440
+
+    def record_detected(self, now: float, local: datetime) -> None:
+        """Record presence detected at a monotonic and a local time."""
+        if (
+            self._last_clear is not None
+            and now - self._last_clear <= RETRIGGER_WINDOW
+        ):
+            self.retriggers[self._last_clear_bin] += 1
+            self.gaps[self._last_clear_bin] += now - self._last_clear
+
+        self._last_clear = None
+
+    def record_cleared(self, now: float, local: datetime) -> None:
+        """Record presence cleared at a monotonic and a local time."""
+        index = self.bin_of(local)
+
+        # Decay all counts of the bin so their ratios stay meaningful
+        self.clears[index] = self.clears[index] * OCCUPANCY_DECAY + 1
+        self.retriggers[index] *= OCCUPANCY_DECAY
+        self.gaps[index] *= OCCUPANCY_DECAY
+
+        self._last_clear = now
+        self._last_clear_bin = index
+
+    def retrigger_probability(self, local: datetime) -> float:
+        """Return the probability of a re-trigger after presence cleared."""
+        index = self.bin_of(local)
+        if self.clears[index] < OCCUPANCY_MIN_SAMPLES:
+            return 0.0
+
+        return min(1.0, self.retriggers[index] / self.clears[index])
+
+    def mean_gap(self, local: datetime) -> float:
+        """Return the mean seconds until presence returned after a clear."""
+        index = self.bin_of(local)
+        if not self.retriggers[index]:
+            return 0.0
+
+        return self.gaps[index] / self.retriggers[index]
+
+    def extension(self, local: datetime) -> float:
+        """Return the seconds to stretch the off delay by.
+
+        Covers the usual interval of the re-triggers, weighted by how
+        likely presence returns at this time of day.
+        """
+        return self.retrigger_probability(local) * min(
+            self.mean_gap(local), OCCUPANCY_MAX_EXTENSION
+        )
+
+    def as_dict(self) -> dict:
+        """Return the histograms for storage."""
+        return {key: list(getattr(self, key)) for key in _KEYS}
@@ -0,0 +1,107 @@
+"""Profiling of the hot paths of the integration."""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+from collections.abc import Callable
+from functools import wraps
+from time import perf_counter
+
+# Timings of the running profile, None while not profiling
+_timings: dict[str, FunctionTiming] | None = None
+
+
+class FunctionTiming:
+    """Call count and time spent in a function."""
+
+    __slots__ = ("count", "total", "maximum")
+
+    def __init__(self) -> None:
+        """Initialize the timing."""
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, duration: float) -> None:
+        """Add the duration of a call."""
+        self.count += 1
+        self.total += duration
+        self.maximum = max(self.maximum, duration)
+
+    def as_dict(self) -> dict:
+        """Return the timing in milliseconds."""
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.count * 1000, 3),
+            "max_ms": round(self.maximum * 1000, 3),
+        }
+
+
+def _record(name: str, start: float) -> None:
+    if _timings is not None:
+        _timings.setdefault(name, FunctionTiming()).add(perf_counter() - start)
+
+
+def profiled(func: Callable) -> Callable:
+    """Record the timing of a function while a profile is running.
+
+    Costs a single check per call while not profiling.
+    """
+    name = func.__qualname__
+
+    if asyncio.iscoroutinefunction(func):
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if _timings is None:
+                return await func(*args, **kwargs)
+
+            start = perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _record(name, start)
+
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if _timings is None:
+            return func(*args, **kwargs)
+
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _record(name, start)
+
+    return wrapper
+
+
+def is_profiling() -> bool:
+    """Return if a profile is running."""
+    return _timings is not None
+
+
+async def async_profile(
+    duration: float, use_cprofile: bool = False
+) -> tuple[dict[str, dict], cProfile.Profile | None]:
+    """Profile the hot paths of all areas for a duration."""
+    global _timings
+
+    profile = cProfile.Profile() if use_cprofile else None
+    _timings = timings = {}
+    if profile is not None:
+        profile.enable()
+
+    try:
+        await asyncio.sleep(duration)
+    finally:
+        if profile is not None:
+            profile.disable()
+        _timings = None
+
+    return {
+        name: timing.as_dict() for name, timing in sorted(timings.items())
+    }, profile
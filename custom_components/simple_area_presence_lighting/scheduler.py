@@ -0,0 +1,106 @@
+"""Scheduler for the integration."""
+from __future__ import annotations
+
+import heapq
+import logging
+import zlib
+from collections.abc import Callable
+
+from homeassistant.core import callback
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def stagger_offset(key: str, window: float) -> float:
+    """Return the deterministic offset of a key within a window."""
+    if window <= 0:
+        return 0.0
+
+    # Python's hash is salted per process, crc32 is stable across restarts
+    return (zlib.crc32(key.encode()) % 1000) / 1000 * window
+
+
+class StaggeredScheduler:
+    """Spread the work of all areas across a window.
+
+    Every key gets a deterministic offset within the window, so an area runs
+    at the same point of the window each time and many areas do not hit the
+    event loop in the same instant. All jobs share a single timer.
+    """
+
+    def __init__(self, hass) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+
+        self._jobs: dict[str, tuple[float, Callable[[], None]]] = {}
+        self._heap: list[tuple[float, str]] = []
+        self._timer = None
+
+    @callback
+    def async_schedule(
+        self, key: str, window: float, action: Callable[[], None]
+    ) -> None:
+        """Run an action at the offset of its key, replacing pending runs."""
+        due = self.hass.loop.time() + stagger_offset(key, window)
+
+        self._jobs[key] = (due, action)
+        heapq.heappush(self._heap, (due, key))
+        self._async_arm()
+
+    @callback
+    def async_cancel(self, key: str) -> None:
+        """Cancel the pending run of a key."""
+        if self._jobs.pop(key, None) is not None:
+            self._async_arm()
+
+    @callback
+    def async_shutdown(self, _event=None) -> None:
+        """Cancel all pending runs."""
+        self._jobs.clear()
+        self._heap.clear()
+        self._async_arm()
+
+    def __len__(self) -> int:
+        """Return the number of pending runs."""
+        return len(self._jobs)
+
+    def _is_stale(self, due: float, key: str) -> bool:
+        job = self._jobs.get(key)
+        return job is None or job[0] != due
+
+    @callback
+    def _async_arm(self) -> None:
+        """Set the timer to the earliest pending run."""
+        # Replaced and cancelled runs are dropped lazily
+        while self._heap and self._is_stale(*self._heap[0]):
+            heapq.heappop(self._heap)
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if self._heap:
+            when = self._heap[0][0]
+            self._timer = self.hass.loop.call_at(
+                when, self._async_run_due, when
+            )
+
+    @callback
+    def _async_run_due(self, when: float) -> None:
+        """Run all due jobs."""
+        self._timer = None
+
+        # The loop may fire the timer marginally before it is due
+        now = max(self.hass.loop.time(), when)
+        while self._heap and self._heap[0][0] <= now:
+            due, key = heapq.heappop(self._heap)
+            if self._is_stale(due, key):
+                continue
+
+            _, action = self._jobs.pop(key)
+            try:
+                action()
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error running scheduled job %s", key)
+
+        self._async_arm()
@@ -0,0 +1,135 @@
+"""Sensor for the integration."""
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.const import EntityCategory, UnitOfTime
+
+from . import base
+from .const import (
+    CONF_NAME,
+    DATA_CONTROLLERS,
+    DOMAIN,
+    SENSOR_DISPATCH_LATENCY_PREFIX_ID,
+    SENSOR_DISPATCH_LATENCY_PREFIX_NAME,
+    SENSOR_LATENCY_ICON,
+    SENSOR_LIGHT_LATENCY_PREFIX_ID,
+    SENSOR_LIGHT_LATENCY_PREFIX_NAME,
+    SWITCH_LIGHT_CONTROL_PREFIX_ID,
+)
+from .stats import LatencyHistogram
+
+_LOGGER = logging.getLogger(__name__)
+
+SCAN_INTERVAL = timedelta(seconds=60)
+
+
+async def async_setup_entry(hass, config_entry, async_add_entities: bool):
+    """Set up the latency sensors."""
+    entry_name = hass.data[DOMAIN][config_entry.entry_id][CONF_NAME]
+
+    # Check if already configured
+    if not config_entry.options:
+        return
+
+    # Only areas with a light control switch measure latencies
+    if base.get_area_entities(hass, config_entry.options) is None:
+        return
+
+    async_add_entities(
+        [
+            LatencySensor(
+                hass,
+                entry_name,
+                SENSOR_DISPATCH_LATENCY_PREFIX_ID,
+                SENSOR_DISPATCH_LATENCY_PREFIX_NAME,
+                "dispatch_latency",
+            ),
+            LatencySensor(
+                hass,
+                entry_name,
+                SENSOR_LIGHT_LATENCY_PREFIX_ID,
+                SENSOR_LIGHT_LATENCY_PREFIX_NAME,
+                "light_latency",
+            ),
+        ]
+    )
+
+
+class LatencySensor(SensorEntity):
+    """Representation of a latency sensor of an area.
+
+    The state is the 95th percentile of the latency from a presence sensor
+    edge, the other percentiles are attributes.
+    """
+
+    _attr_has_entity_name = True
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 3
+
+    def __init__(self, hass, entry_name, prefix_id, prefix_name, histogram):
+        """Initialize the latency sensor."""
+        self.hass = hass
+
+        self._unique_id = f"{prefix_id}_{entry_name}"
+        self._name = f"{prefix_name} {entry_name}"
+        self._controller_id = f"{SWITCH_LIGHT_CONTROL_PREFIX_ID}_{entry_name}"
+        self._histogram = histogram
+
+        self._icon = SENSOR_LATENCY_ICON
+        self._state = None
+        self._extra_state_attributes = {}
+
+        _LOGGER.debug("Latency sensor created (%s)", self._unique_id)
+
+    @property
+    def name(self):
+        """Return the name of the device if any."""
+        return self._name
+
+    @property
+    def unique_id(self):
+        """Return the unique ID of entity."""
+        return self._unique_id
+
+    @property
+    def icon(self) -> str:
+        """Icon to use in the frontend, if any."""
+        return self._icon
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the 95th percentile of the latency."""
+        return self._state
+
+    @property
+    def extra_state_attributes(self):
+        """Return the attributes of the entity."""
+        return self._extra_state_attributes
+
+    async def async_update(self) -> None:
+        """Read the latency histogram of the area."""
+        controller = (
+            self.hass.data[DOMAIN]
+            .get(DATA_CONTROLLERS, {})
+            .get(self._controller_id)
+        )
+        if controller is None:
+            return
+
+        histogram: LatencyHistogram = getattr(controller, self._histogram)
+        stats = histogram.as_dict()
+
+        self._state = stats["p95"]
+        self._extra_state_attributes = {
+            key: stats[key] for key in ("count", "p50", "p95", "p99")
+        }
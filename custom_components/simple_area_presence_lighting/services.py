@@ -0,0 +1,271 @@
+"""Services for the integration."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.config_entries import SOURCE_IMPORT
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util.json import load_json
+from homeassistant.helpers.json import save_json
+from homeassistant.util.yaml import load_yaml, save_yaml
+
+from .const import (
+    ATTR_CPROFILE,
+    ATTR_DURATION,
+    ATTR_ENTRIES,
+    ATTR_FILENAME,
+    ATTR_OPTIONS,
+    ATTR_VERSION,
+    CONF_NAME,
+    DATA_CONTROLLERS,
+    DATA_SKIP_RELOAD,
+    DEFAULT_EXPORT_FILENAME,
+    DEFAULT_PROFILE_DURATION,
+    DEFAULT_PROFILE_FILENAME,
+    DOMAIN,
+    EXPORT_VERSION,
+    MAX_PROFILE_DURATION,
+    OPTIONS_SCHEMA,
+    SERVICE_EXPORT_CONFIG,
+    SERVICE_GET_TRACE,
+    SERVICE_IMPORT_CONFIG,
+    SERVICE_PROFILE,
+)
+from .profiler import async_profile, is_profiling
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_CONFIG_FILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(
+            ATTR_FILENAME, default=DEFAULT_EXPORT_FILENAME
+        ): cv.string,
+    }
+)
+
+SERVICE_PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=DEFAULT_PROFILE_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=MAX_PROFILE_DURATION)
+        ),
+        vol.Optional(
+            ATTR_FILENAME, default=DEFAULT_PROFILE_FILENAME
+        ): cv.string,
+        vol.Optional(ATTR_CPROFILE, default=False): cv.boolean,
+    }
+)
+
+SERVICE_GET_TRACE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+    }
+)
+
+IMPORT_ENTRY_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_NAME): cv.string,
+        vol.Optional(ATTR_OPTIONS, default={}): OPTIONS_SCHEMA,
+    }
+)
+
+IMPORT_FILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_VERSION, default=EXPORT_VERSION): vol.All(
+            int, vol.Range(max=EXPORT_VERSION)
+        ),
+        vol.Required(ATTR_ENTRIES): [IMPORT_ENTRY_SCHEMA],
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+
+def _is_yaml(path: str) -> bool:
+    return path.endswith((".yaml", ".yml"))
+
+
+def _get_config_path(hass, filename: str) -> str:
+    """Return the path of a file inside the config directory."""
+    config_dir = os.path.realpath(hass.config.config_dir)
+    path = os.path.realpath(os.path.join(config_dir, filename))
+
+    if os.path.commonpath([config_dir, path]) != config_dir:
+        raise HomeAssistantError(
+            f"File {filename} is not inside the config directory"
+        )
+
+    return path
+
+
+def _normalize(options) -> dict:
+    """Return options as plain JSON types (e.g. device classes as str)."""
+    return json.loads(json.dumps(dict(options)))
+
+
+def _write_file(path: str, data: dict) -> None:
+    if _is_yaml(path):
+        save_yaml(path, data)
+    else:
+        save_json(path, data)
+
+
+def _read_file(path: str):
+    if _is_yaml(path):
+        return load_yaml(path)
+
+    return load_json(path)
+
+
+async def async_setup_services(hass) -> None:
+    """Register the services of the integration."""
+
+    async def async_export_config(call: ServiceCall) -> None:
+        """Export the options of all entries to a file."""
+        path = _get_config_path(hass, call.data[ATTR_FILENAME])
+
+        data = {
+            ATTR_VERSION: EXPORT_VERSION,
+            ATTR_ENTRIES: [
+                {
+                    CONF_NAME: entry.data[CONF_NAME],
+                    ATTR_OPTIONS: _normalize(entry.options),
+                }
+                for entry in hass.config_entries.async_entries(DOMAIN)
+            ],
+        }
+
+        await hass.async_add_executor_job(_write_file, path, data)
+
+        _LOGGER.info(
+            "Exported %s entries to %s", len(data[ATTR_ENTRIES]), path
+        )
+
+    async def async_import_config(call: ServiceCall) -> None:
+        """Create or update entries from a file in a single batch."""
+        path = _get_config_path(hass, call.data[ATTR_FILENAME])
+
+        try:
+            raw = await hass.async_add_executor_job(_read_file, path)
+            data = IMPORT_FILE_SCHEMA(raw)
+        except (HomeAssistantError, OSError, vol.Invalid) as err:
+            raise HomeAssistantError(
+                f"Unable to import {path}: {err}"
+            ) from err
+
+        entries = {
+            entry.unique_id: entry
+            for entry in hass.config_entries.async_entries(DOMAIN)
+        }
+
+        # Update existing entries without reloading each of them through
+        # the update listener, they are reloaded together afterwards
+        skip_reload = hass.data[DOMAIN][DATA_SKIP_RELOAD]
+        updated = []
+        created = []
+        for item in data[ATTR_ENTRIES]:
+            name = item[CONF_NAME]
+            options = _normalize(item[ATTR_OPTIONS])
+
+            entry = entries.get(name)
+            if entry is None:
+                created.append(
+                    hass.config_entries.flow.async_init(
+                        DOMAIN,
+                        context={"source": SOURCE_IMPORT},
+                        data={CONF_NAME: name, ATTR_OPTIONS: options},
+                    )
+                )
+                continue
+
+            skip_reload.add(entry.entry_id)
+            if hass.config_entries.async_update_entry(entry, options=options):
+                updated.append(entry.entry_id)
+            else:
+                skip_reload.discard(entry.entry_id)
+
+        await asyncio.gather(
+            *created,
+            *(
+                hass.config_entries.async_reload(entry_id)
+                for entry_id in updated
+            ),
+        )
+        skip_reload.difference_update(updated)
+
+        _LOGGER.info(
+            "Imported %s entries from %s (%s created, %s updated)",
+            len(data[ATTR_ENTRIES]),
+            path,
+            len(created),
+            len(updated),
+        )
+
+    async def async_profile_service(call: ServiceCall) -> None:
+        """Record the timing of the hot paths of all areas to a file."""
+        path = _get_config_path(hass, call.data[ATTR_FILENAME])
+        if is_profiling():
+            raise HomeAssistantError("A profile is already running")
+
+        duration = call.data[ATTR_DURATION]
+        timings, profile = await async_profile(
+            duration, call.data[ATTR_CPROFILE]
+        )
+
+        data = {ATTR_DURATION: duration, "functions": timings}
+
+        # The full profile is written next to the timings
+        if profile is not None:
+            stats_path = f"{os.path.splitext(path)[0]}.prof"
+            await hass.async_add_executor_job(profile.dump_stats, stats_path)
+            data[ATTR_CPROFILE] = stats_path
+
+        await hass.async_add_executor_job(_write_file, path, data)
+
+        _LOGGER.info("Wrote profile of %ss to %s", duration, path)
+
+    async def async_get_trace(call: ServiceCall) -> ServiceResponse:
+        """Return the latest decisions of the areas."""
+        entity_ids = call.data.get(ATTR_ENTITY_ID)
+
+        return {
+            controller.entity_id: controller.trace.as_list()
+            for controller in hass.data[DOMAIN]
+            .get(DATA_CONTROLLERS, {})
+            .values()
+            if entity_ids is None or controller.entity_id in entity_ids
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_CONFIG,
+        async_export_config,
+        schema=SERVICE_CONFIG_FILE_SCHEMA,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_CONFIG,
+        async_import_config,
+        schema=SERVICE_CONFIG_FILE_SCHEMA,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile_service,
+        schema=SERVICE_PROFILE_SCHEMA,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_TRACE,
+        async_get_trace,
+        schema=SERVICE_GET_TRACE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,194 @@
+"""Streaming statistics for the integration."""
+from __future__ import annotations
+
+from bisect import bisect_left
+
+
+class P2Quantile:
+    """Streaming quantile estimator using the P² algorithm.
+
+    Estimates a quantile with five markers, without storing the samples
+    (Jain and Chlamtac, 1985).
+    """
+
+    __slots__ = ("p", "count", "heights", "positions", "desired", "steps")
+
+    def __init__(self, p: float, data: dict | None = None) -> None:
+        """Initialize the estimator, optionally from stored data."""
+        self.p = p
+        self.count = 0
+        self.heights: list[float] = []
+        self.positions = [0, 1, 2, 3, 4]
+        self.desired = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self.steps = [0, p / 2, p, (1 + p) / 2, 1]
+
+        # Stored markers of another quantile are useless
+        if data and data.get("p") == p:
+            self.count = data["count"]
+            self.heights = list(data["heights"])
+            self.positions = list(data["positions"])
+            self.desired = list(data["desired"])
+
+    def add(self, value: float) -> None:
+        """Add a sample."""
+        self.count += 1
+        heights = self.heights
+
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        # Find the cell of the sample and adjust the extreme markers
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+
+        for index in range(cell + 1, 5):
+            self.positions[index] += 1
+        for index in range(5):
+            self.desired[index] += self.steps[index]
+
+        # Move the middle markers towards their desired positions
+        positions = self.positions
+        for index in range(1, 4):
+            delta = self.desired[index] - positions[index]
+            if (
+                delta >= 1
+                and positions[index + 1] - positions[index] > 1
+                or delta <= -1
+                and positions[index - 1] - positions[index] < -1
+            ):
+                step = 1 if delta > 0 else -1
+                height = self._parabolic(index, step)
+                if not heights[index - 1] < height < heights[index + 1]:
+                    height = self._linear(index, step)
+
+                heights[index] = height
+                positions[index] += step
+
+    def value(self) -> float | None:
+        """Return the estimated quantile."""
+        if not self.heights:
+            return None
+
+        if len(self.heights) < 5:
+            index = round(self.p * (len(self.heights) - 1))
+            return self.heights[index]
+
+        return self.heights[2]
+
+    def as_dict(self) -> dict:
+        """Return the markers for storage."""
+        return {
+            "p": self.p,
+            "count": self.count,
+            "heights": list(self.heights),
+            "positions": list(self.positions),
+            "desired": list(self.desired),
+        }
+
+    def _parabolic(self, index: int, step: int) -> float:
+        heights = self.heights
+        positions = self.positions
+
+        return heights[index] + step / (
+            positions[index + 1] - positions[index - 1]
+        ) * (
+            (positions[index] - positions[index - 1] + step)
+            * (heights[index + 1] - heights[index])
+            / (positions[index + 1] - positions[index])
+            + (positions[index + 1] - positions[index] - step)
+            * (heights[index] - heights[index - 1])
+            / (positions[index] - positions[index - 1])
+        )
+
+    def _linear(self, index: int, step: int) -> float:
+        heights = self.heights
+        positions = self.positions
+
+        return heights[index] + step * (
+            heights[index + step] - heights[index]
+        ) / (positions[index + step] - positions[index])
+
+
+# Upper bounds of the latency buckets in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Upper bounds of the event handling time buckets in seconds
+HANDLER_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05)
+
+
+class LatencyHistogram:
+    """Histogram of latencies with fixed buckets.
+
+    Keeps a constant amount of state, quantiles are interpolated within
+    their bucket.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "total", "maximum")
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """Initialize the histogram."""
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, value: float) -> None:
+        """Add a latency."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def quantile(self, q: float) -> float | None:
+        """Return the estimated quantile of the latencies."""
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = (
+                    self.bounds[index]
+                    if index < len(self.bounds)
+                    else self.maximum
+                )
+                upper = min(upper, self.maximum)
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+
+        return self.maximum
+
+    def as_dict(self) -> dict:
+        """Return the statistics of the latencies."""
+        buckets = {
+            f"le_{bound:g}": count
+            for bound, count in zip(self.bounds, self.counts)
+        }
+        buckets["inf"] = self.counts[-1]
+
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "p50": _round(self.quantile(0.5)),
+            "p95": _round(self.quantile(0.95)),
+            "p99": _round(self.quantile(0.99)),
+            "max": round(self.maximum, 3),
+            "buckets": buckets,
+        }
+
+
+def _round(value: float | None) -> float | None:
+    return None if value is None else round(value, 3)
@@ -0,0 +1,194 @@
+"""Sun position for the integration."""
+from __future__ import annotations
+
+import logging
+import math
+from array import array
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from functools import partial
+
+from astral.sun import elevation as solar_elevation
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.sun import get_astral_location
+from homeassistant.util import dt as dt_util
+
+from .const import SUN_TABLE_MARGIN, SUN_TABLE_STEP
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SunElevationTable:
+    """Sun elevation of a local day sampled at a fixed step.
+
+    Lookups interpolate linearly between the samples, so no astral
+    calculation is needed after the table was computed.
+    """
+
+    __slots__ = ("start", "end", "step", "values")
+
+    def __init__(self, observer, start: datetime, end: datetime) -> None:
+        """Compute the table between two points in time."""
+        self.start = start - SUN_TABLE_MARGIN
+        self.end = end
+        self.step = SUN_TABLE_STEP
+
+        count = math.ceil((end + SUN_TABLE_MARGIN - self.start) / self.step)
+        self.values = array(
+            "d",
+            (
+                solar_elevation(observer, self.start + index * self.step)
+                for index in range(count + 1)
+            ),
+        )
+
+    def _position(self, when: datetime) -> float:
+        position = (when - self.start) / self.step
+        return min(max(position, 0.0), len(self.values) - 1.0)
+
+    def elevation(self, when: datetime) -> float:
+        """Return the sun elevation at a point in time."""
+        position = self._position(when)
+        index = min(int(position), len(self.values) - 2)
+        fraction = position - index
+
+        return self.values[index] + fraction * (
+            self.values[index + 1] - self.values[index]
+        )
+
+    def next_crossing(
+        self, threshold: float, offset: timedelta, after: datetime
+    ) -> datetime | None:
+        """Return when the sun next crosses a threshold, if within the table.
+
+        The offset shifts the sun position, so a positive offset crosses
+        the threshold earlier.
+        """
+        shifted = after + offset
+        below = self.elevation(shifted) < threshold
+
+        index = int(self._position(shifted)) + 1
+        while index < len(self.values):
+            if (self.values[index] < threshold) != below:
+                previous = self.values[index - 1]
+                fraction = (threshold - previous) / (
+                    self.values[index] - previous
+                )
+                crossing = self.start + (index - 1 + fraction) * self.step
+
+                # Round up so the state has changed when the timer fires
+                crossing = crossing.replace(microsecond=0) + timedelta(
+                    seconds=1
+                )
+                return max(crossing - offset, after)
+            index += 1
+
+        return None
+
+
+class _Listener:
+    __slots__ = ("threshold", "offset", "action", "dark")
+
+    def __init__(self, threshold, offset, action) -> None:
+        self.threshold = threshold
+        self.offset = offset
+        self.action = action
+        self.dark: bool | None = None
+
+
+class SunDarkness:
+    """Darkness of all areas following the sun.
+
+    The elevation table is computed once a day and shared by all areas. A
+    single timer fires at the next change of any area, and all changes due
+    at that instant are applied together.
+    """
+
+    def __init__(self, hass) -> None:
+        """Initialize the sun darkness."""
+        self.hass = hass
+
+        self._table: SunElevationTable | None = None
+        self._listeners: dict[str, _Listener] = {}
+        self._unsub_timer = None
+
+    @callback
+    def async_add_listener(
+        self,
+        key: str,
+        threshold: float,
+        offset: timedelta,
+        action: Callable[[bool], None],
+    ) -> Callable[[], None]:
+        """Call an action with the darkness of an area whenever it changes."""
+        self._listeners[key] = _Listener(threshold, offset, action)
+        self._async_update()
+
+        return partial(self._async_remove_listener, key)
+
+    @callback
+    def async_shutdown(self, _event=None) -> None:
+        """Stop updating the darkness."""
+        self._listeners.clear()
+        self._async_cancel_timer()
+
+    @callback
+    def _async_remove_listener(self, key: str) -> None:
+        self._listeners.pop(key, None)
+        if not self._listeners:
+            self._async_cancel_timer()
+
+    @callback
+    def _async_cancel_timer(self) -> None:
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    def _get_table(self, now: datetime) -> SunElevationTable:
+        """Return the table of the current local day."""
+        if self._table is None or not (
+            self._table.start + SUN_TABLE_MARGIN <= now < self._table.end
+        ):
+            start = dt_util.start_of_local_day(dt_util.as_local(now))
+            end = dt_util.start_of_local_day(
+                start + timedelta(days=1, hours=1)
+            )
+            observer = get_astral_location(self.hass)[0].observer
+            self._table = SunElevationTable(
+                observer, dt_util.as_utc(start), dt_util.as_utc(end)
+            )
+            _LOGGER.debug("Computed sun elevation table until %s", end)
+
+        return self._table
+
+    @callback
+    def _async_update(self, now: datetime | None = None) -> None:
+        """Apply due darkness changes and wait for the next one."""
+        self._async_cancel_timer()
+        if not self._listeners:
+            return
+
+        now = max(now or dt_util.utcnow(), dt_util.utcnow())
+        table = self._get_table(now)
+
+        changed = []
+        next_update = table.end
+        for listener in self._listeners.values():
+            dark = table.elevation(now + listener.offset) < listener.threshold
+            if dark != listener.dark:
+                listener.dark = dark
+                changed.append(listener)
+
+            crossing = table.next_crossing(
+                listener.threshold, listener.offset, now
+            )
+            if crossing is not None:
+                next_update = min(next_update, crossing)
+
+        self._unsub_timer = async_track_point_in_utc_time(
+            self.hass, self._async_update, next_update
+        )
+
+        for listener in changed:
+            listener.action(listener.dark)
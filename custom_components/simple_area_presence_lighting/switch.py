@@ -2,7 +2,9 @@
 from __future__ import annotations
 
 import logging
-
+import time
+from datetime import datetime, timedelta
+from functools import partial
 
 from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
 from homeassistant.components.switch import SwitchEntity
@@ -15,30 +17,96 @@ from homeassistant.const import (
     SERVICE_TURN_ON,
     STATE_OFF,
     STATE_ON,
+    STATE_UNAVAILABLE,
+    STATE_UNKNOWN,
+)
+from homeassistant.core import Context, Event, callback
+from homeassistant.helpers import entity_registry as er, issue_registry as ir
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_time_interval,
 )
-from homeassistant.core import Context, Event
 from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
 
 from . import base
 from .const import (
     ACTION_TURN_OFF_LIGHTS,
     ACTION_TURN_ON_LIGHTS,
     ATTR_LIGHTS,
+    ATTR_MANUAL_OVERRIDE_UNTIL,
     ATTR_PRESENCE,
     ATTR_PRESENCE_SENSOR_ENTITIES,
+    ATTR_QUARANTINED_SENSORS,
+    ADAPTIVE_MIN_SAMPLES,
+    CONF_ADAPTIVE_OFF_DELAY,
+    CONF_ADAPTIVE_OFF_DELAY_QUANTILE,
+    CONF_ADJACENT_AREAS,
     CONF_AREA_ID,
-    CONF_LIGHTS,
+    CONF_BRIGHT_ILLUMINANCE,
+    CONF_CHATTER_THRESHOLD,
+    CONF_CHILD_AREAS,
+    CONF_CREATE_LIGHT_GROUP,
+    CONF_DARK_ILLUMINANCE,
+    CONF_DARK_MODE,
+    CONF_ILLUMINANCE_SENSOR,
+    CONF_LIGHT_GROUP_ENTITY,
+    CONF_MANUAL_OVERRIDE_DURATION,
+    CONF_MAX_OFF_DELAY,
+    CONF_MIN_DWELL,
     CONF_NAME,
-    CONF_PRESENCE_SENSOR_ENTITIES,
-    CONF_SENSOR_DEVICE_CLASSES,
-    CONF_USE_AREA_LIGHTS,
-    CONF_USE_AREA_PRESENCE_SENSORS,
-    DEFAULT_LIGHTS,
-    DEFAULT_PRESENCE_SENSOR_ENTITIES,
-    DEFAULT_SENSOR_DEVICE_CLASSES,
-    DEFAULT_USE_AREA_LIGHTS,
-    DEFAULT_USE_AREA_PRESENCE_SENSORS,
+    CONF_NUMERIC_PRESENCE_ENTITIES,
+    CONF_NUMERIC_PRESENCE_INTERVAL,
+    CONF_NUMERIC_PRESENCE_THRESHOLD,
+    CONF_OCCUPANCY_MODEL,
+    CONF_OFF_DELAY,
+    CONF_PRELIGHT,
+    CONF_RECONCILE,
+    CONF_STAGGER_WINDOW,
+    CONF_SUN_ELEVATION,
+    CONF_SUN_OFFSET,
+    DEFAULT_ADAPTIVE_OFF_DELAY,
+    DEFAULT_ADAPTIVE_OFF_DELAY_QUANTILE,
+    DEFAULT_ADJACENT_AREAS,
+    DEFAULT_BRIGHT_ILLUMINANCE,
+    DEFAULT_CHATTER_THRESHOLD,
+    DEFAULT_CHILD_AREAS,
+    DEFAULT_CREATE_LIGHT_GROUP,
+    DEFAULT_DARK_ILLUMINANCE,
+    DEFAULT_DARK_MODE,
+    DEFAULT_ILLUMINANCE_SENSOR,
+    DEFAULT_LIGHT_GROUP_ENTITY,
+    DEFAULT_MANUAL_OVERRIDE_DURATION,
+    DEFAULT_MAX_OFF_DELAY,
+    DEFAULT_MIN_DWELL,
+    DEFAULT_NUMERIC_PRESENCE_ENTITIES,
+    DEFAULT_NUMERIC_PRESENCE_INTERVAL,
+    DEFAULT_NUMERIC_PRESENCE_THRESHOLD,
+    DEFAULT_OCCUPANCY_MODEL,
+    DEFAULT_OFF_DELAY,
+    DEFAULT_PRELIGHT,
+    DEFAULT_RECONCILE,
+    DEFAULT_STAGGER_WINDOW,
+    DEFAULT_SUN_ELEVATION,
+    DEFAULT_SUN_OFFSET,
+    DARK_MODE_ILLUMINANCE,
+    DARK_MODE_SUN,
+    DATA_ADJACENCY,
+    DATA_COMMANDS,
+    DATA_HIERARCHY,
+    DATA_SCHEDULER,
+    DATA_STREAM,
+    DATA_SUN,
     DOMAIN,
+    ISSUE_SENSOR_QUARANTINED,
+    LIGHT_GROUP_PREFIX_ID,
+    PRELIGHT_TIMEOUT,
+    QUARANTINE_CHECK_INTERVAL,
+    RECONNECT_STAGGER_WINDOW,
+    RETRIGGER_WINDOW,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
     SWITCH_AREA_DARK_ICON,
     SWITCH_AREA_DARK_PREFIX_ID,
     SWITCH_AREA_DARK_PREFIX_NAME,
@@ -48,7 +116,22 @@ from .const import (
     SWITCH_OVERRIDE_PRESENCE_ICON,
     SWITCH_OVERRIDE_PRESENCE_PREFIX_ID,
     SWITCH_OVERRIDE_PRESENCE_PREFIX_NAME,
+    TRACE_OUTCOME_DELAYED_OFF,
+    TRACE_OUTCOME_MANUAL_OVERRIDE,
+    TRACE_SOURCE_CHILD_AREAS,
+    TRACE_SOURCE_OFF_DELAY,
+    TRACE_SOURCE_PRELIGHT,
+    TRACE_SOURCE_RECONCILE,
+)
+from .filters import (
+    ChatterFilter,
+    IlluminanceFilter,
+    NumericPresenceFilter,
 )
+from .occupancy import OccupancyModel
+from .profiler import profiled
+from .stats import HANDLER_BUCKETS, LatencyHistogram, P2Quantile
+from .trace import DecisionTrace
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -68,57 +151,13 @@ async def async_setup_entry(hass, config_entry, async_add_entities: bool):
     # Warning: Check if None before use
     area_id = options[CONF_AREA_ID]
 
-    all_lights = []
-
-    # Get all lights in area
-    if options.get(CONF_USE_AREA_LIGHTS, DEFAULT_USE_AREA_LIGHTS):
-        # Check if there is an area set
-        if not area_id:
-            return
-
-        all_lights = all_lights + base.get_lights_in_area(hass, area_id)
-
-    # Add lights from options
-    all_lights = all_lights + options.get(CONF_LIGHTS, DEFAULT_LIGHTS)
-
-    # Check if there are any lights
-    if not all_lights:
-        return
-
-    all_presence_sensor_entities = []
-
-    # Get all presence sensing entities in area
-    if options.get(
-        CONF_USE_AREA_PRESENCE_SENSORS,
-        DEFAULT_USE_AREA_PRESENCE_SENSORS,
-    ):
-        # Check if there is an area set
-        if not area_id:
-            return
-
-        supported_device_classes = options.get(
-            CONF_SENSOR_DEVICE_CLASSES,
-            DEFAULT_SENSOR_DEVICE_CLASSES,
-        )
-
-        all_presence_sensor_entities = (
-            all_presence_sensor_entities
-            + base.get_presence_sensor_entities_in_area(
-                hass, area_id, supported_device_classes
-            )
-        )
-
-    # Add presence sensing entities from options
-    all_presence_sensor_entities = all_presence_sensor_entities + options.get(
-        CONF_PRESENCE_SENSOR_ENTITIES, DEFAULT_PRESENCE_SENSOR_ENTITIES
-    )
-
-    # Check if there are any presence sensing entities
-    if not all_presence_sensor_entities:
+    # Check if there are lights and presence sources to control them
+    if (entities := base.get_area_entities(hass, options)) is None:
         return
+    all_lights, all_presence_sensor_entities = entities
 
     # Create area dark switch
-    area_dark_switch = AreaDarkSwitch(hass, entry_name)
+    area_dark_switch = AreaDarkSwitch(hass, entry_name, options, all_lights)
 
     # Create override occupancy switch
     override_presence_switch = OverrideOccupancySwitch(hass, entry_name)
@@ -132,12 +171,12 @@ async def async_setup_entry(hass, config_entry, async_add_entities: bool):
         all_presence_sensor_entities,
         area_dark_switch,
         override_presence_switch,
+        options,
     )
 
     # Create all switches
     async_add_entities(
-        [area_dark_switch, override_presence_switch, light_control_switch],
-        update_before_add=True,
+        [area_dark_switch, override_presence_switch, light_control_switch]
     )
 
 
@@ -155,6 +194,7 @@ class LightControlSwitch(SwitchEntity, RestoreEntity):
         presence_sensor_entities,
         area_dark_switch: AreaDarkSwitch,
         override_presence_switch: OverrideOccupancySwitch,
+        options=None,
     ):
         """Initialize the light control switch."""
         self.hass = hass
@@ -170,9 +210,144 @@ class LightControlSwitch(SwitchEntity, RestoreEntity):
 
         self._lights = lights
         self._presence_detected = False
-        self._presence_sensor_entities = presence_sensor_entities
         self._presence_sensor_entities_active = []
 
+        options = options or {}
+
+        # Group which switches all lights with a single command
+        self._light_group = options.get(
+            CONF_LIGHT_GROUP_ENTITY, DEFAULT_LIGHT_GROUP_ENTITY
+        )
+        self._light_group_unique_id = None
+        if not self._light_group and options.get(
+            CONF_CREATE_LIGHT_GROUP, DEFAULT_CREATE_LIGHT_GROUP
+        ):
+            self._light_group_unique_id = (
+                f"{LIGHT_GROUP_PREFIX_ID}_{entry_name}"
+            )
+
+        # Chatter filter of every presence sensing entity
+        min_dwell = options.get(CONF_MIN_DWELL, DEFAULT_MIN_DWELL)
+        chatter_threshold = options.get(
+            CONF_CHATTER_THRESHOLD, DEFAULT_CHATTER_THRESHOLD
+        )
+        self._sensor_filters = {
+            entity_id: ChatterFilter(min_dwell, chatter_threshold)
+            for entity_id in presence_sensor_entities
+        }
+        self._debounce_unsubs = {}
+        self._quarantine_unsub = None
+
+        # Numeric presence sources, only threshold crossings are processed
+        numeric_threshold = options.get(
+            CONF_NUMERIC_PRESENCE_THRESHOLD,
+            DEFAULT_NUMERIC_PRESENCE_THRESHOLD,
+        )
+        numeric_interval = options.get(
+            CONF_NUMERIC_PRESENCE_INTERVAL, DEFAULT_NUMERIC_PRESENCE_INTERVAL
+        )
+        self._numeric_filters = {
+            entity_id: NumericPresenceFilter(
+                numeric_threshold, numeric_interval
+            )
+            for entity_id in options.get(
+                CONF_NUMERIC_PRESENCE_ENTITIES,
+                DEFAULT_NUMERIC_PRESENCE_ENTITIES,
+            )
+        }
+        self._presence_sensor_entities = [
+            *presence_sensor_entities,
+            *self._numeric_filters,
+        ]
+        self._throttle_unsubs = {}
+
+        # Areas contained in this area, their presence rolls up to it
+        self._child_areas = options.get(CONF_CHILD_AREAS, DEFAULT_CHILD_AREAS)
+        self._unsub_hierarchy = None
+
+        # Neighbouring areas, the lights are turned on in advance when
+        # presence is likely to move here
+        self._adjacent_areas = options.get(
+            CONF_ADJACENT_AREAS, DEFAULT_ADJACENT_AREAS
+        )
+        self._prelight = options.get(CONF_PRELIGHT, DEFAULT_PRELIGHT)
+        self._unsub_adjacency = None
+
+        self._reconcile = options.get(CONF_RECONCILE, DEFAULT_RECONCILE)
+        self._stagger_window = options.get(
+            CONF_STAGGER_WINDOW, DEFAULT_STAGGER_WINDOW
+        )
+
+        # Lights changed by someone else pause the automatic control
+        self._manual_override_duration = timedelta(
+            minutes=options.get(
+                CONF_MANUAL_OVERRIDE_DURATION,
+                DEFAULT_MANUAL_OVERRIDE_DURATION,
+            )
+        )
+        self._manual_override_until: datetime | None = None
+        self._manual_override_presence_seen = False
+        self._manual_override_unsub = None
+
+        # Delay turning off the lights after presence cleared
+        self._off_delay = options.get(CONF_OFF_DELAY, DEFAULT_OFF_DELAY)
+        self._max_off_delay = max(
+            options.get(CONF_MAX_OFF_DELAY, DEFAULT_MAX_OFF_DELAY),
+            self._off_delay,
+        )
+        self._off_delay_unsub = None
+        self._presence_cleared_at: float | None = None
+
+        # Time-of-day model which stretches the off delay
+        self._occupancy_model: OccupancyModel | None = None
+        self._use_occupancy_model = options.get(
+            CONF_OCCUPANCY_MODEL, DEFAULT_OCCUPANCY_MODEL
+        )
+
+        # Quantile of the gaps until presence is detected again
+        self._retrigger_gaps: P2Quantile | None = None
+        self._adaptive_off_delay_quantile: float | None = None
+        if options.get(CONF_ADAPTIVE_OFF_DELAY, DEFAULT_ADAPTIVE_OFF_DELAY):
+            self._adaptive_off_delay_quantile = options.get(
+                CONF_ADAPTIVE_OFF_DELAY_QUANTILE,
+                DEFAULT_ADAPTIVE_OFF_DELAY_QUANTILE,
+            )
+
+        # Everything learned about the area is kept in a single store
+        self._store: Store | None = None
+        if (
+            self._use_occupancy_model
+            or self._adaptive_off_delay_quantile is not None
+        ):
+            self._store = Store(
+                hass, STORAGE_VERSION, f"{DOMAIN}.{slugify(entry_name)}"
+            )
+
+        self._unsub_state_changed = None
+        self._tracked_entities: frozenset[str] = frozenset()
+
+        # Newest pending event per entity as (old state, new state,
+        # accepted by the chatter filter)
+        self._pending_events: dict[str, tuple] = {}
+        self._events_scheduled = False
+
+        # Latest requested light service and the worker sending it
+        self._intent: str | None = None
+        self._intent_triggered_at: float | None = None
+        self._intent_task = None
+
+        # Latency from a presence sensor edge until the command is sent and
+        # until the first light reports on
+        self.dispatch_latency = LatencyHistogram()
+        self.light_latency = LatencyHistogram()
+
+        # Time spent handling the queued events
+        self.handler_latency = LatencyHistogram(HANDLER_BUCKETS)
+        self._light_triggered_at: float | None = None
+
+        # Latest decisions of the area, instead of debug logging
+        self.trace = DecisionTrace()
+
         self._context = Context(id=DOMAIN)
 
         self._extra_state_attributes = {
@@ -180,6 +355,8 @@ class LightControlSwitch(SwitchEntity, RestoreEntity):
             ATTR_LIGHTS: self._lights,
             ATTR_PRESENCE: self._presence_detected,
             ATTR_PRESENCE_SENSOR_ENTITIES: self._presence_sensor_entities,
+            ATTR_QUARANTINED_SENSORS: [],
+            ATTR_MANUAL_OVERRIDE_UNTIL: None,
         }
 
         _LOGGER.debug("Light control switch created (%s)", self._unique_id)
@@ -209,6 +386,35 @@ class LightControlSwitch(SwitchEntity, RestoreEntity):
         """Return the attributes of the switch."""
         return self._extra_state_attributes
 
+    @property
+    def lights(self) -> list[str]:
+        """Return the lights controlled by the switch."""
+        return self._lights
+
+    @property
+    def tracked_entities(self) -> frozenset[str]:
+        """Return the entities the switch listens to."""
+        return self._tracked_entities
+
+    def sensor_statistics(self) -> dict[str, dict]:
+        """Return the statistics of the presence sensors."""
+        now = time.monotonic()
+        return {
+            entity_id: sensor_filter.as_dict(now)
+            for entity_id, sensor_filter in self._sensor_filters.items()
+        }
+
+    @property
+    def wants_lights_on(self) -> bool:
+        """Return if the area wants its lights on."""
+        return bool(
+            self.is_on
+            and self._presence_detected
+            and self.hass.states.is_state(
+                self.area_dark_switch.entity_id, STATE_ON
+            )
+        )
+
     async def async_turn_on(self, **kwargs) -> None:
         """Turn on switch."""
         _LOGGER.debug(
@@ -240,6 +446,18 @@ class LightControlSwitch(SwitchEntity, RestoreEntity):
 
     async def async_added_to_hass(self) -> None:
         """Call when entity about to be added to hass."""
+        if self._store is not None:
+            data = await self._store.async_load() or {}
+
+            if self._use_occupancy_model:
+                self._occupancy_model = OccupancyModel(data.get("occupancy"))
+
+            if self._adaptive_off_delay_quantile is not None:
+                self._retrigger_gaps = P2Quantile(
+                    self._adaptive_off_delay_quantile,
+                    data.get("retrigger_gaps"),
+                )
+
         if self.hass.is_running:
             await self._setup_listeners()
         else:
@@ -254,13 +472,69 @@ class LightControlSwitch(SwitchEntity, RestoreEntity):
         else:
             self._state = False
 
+    async def async_will_remove_from_hass(self) -> None:
+        """Call when entity will be removed from hass."""
+        base.async_unregister_controller(self.hass, self)
+        self.hass.data[DOMAIN][DATA_SCHEDULER].async_cancel(
+            self._reconcile_key
+        )
+
+        if self._unsub_state_changed is not None:
+            self._unsub_state_changed()
+            self._unsub_state_changed = None
+
+        if self._unsub_hierarchy is not None:
+            self._unsub_hierarchy()
+            self._unsub_hierarchy = None
+
+        if self._unsub_adjacency is not None:
+            self._unsub_adjacency()
+            self._unsub_adjacency = None
+
+        self._cancel_delayed_off()
+        self._cancel_manual_override_timer()
+        self._pending_events.clear()
+        self._intent = None
+
+        for unsub in self._debounce_unsubs.values():
+            unsub()
+        self._debounce_unsubs.clear()
+
+        for unsub in self._throttle_unsubs.values():
+            unsub()
+        self._throttle_unsubs.clear()
+
+        if self._quarantine_unsub is not None:
+            self._quarantine_unsub()
+            self._quarantine_unsub = None
+
+        for entity_id, sensor_filter in self._sensor_filters.items():
+            if sensor_filter.quarantined:
+                ir.async_delete_issue(
+                    self.hass, DOMAIN, self._issue_id(entity_id)
+                )
+
+    def _is_sensor_active(self, entity_id) -> bool:
+        """Return if a presence sensing entity detects presence."""
+        if entity_id in self._numeric_filters:
+            return bool(self._numeric_filters[entity_id].state)
+
+        sensor_filter = self._sensor_filters[entity_id]
+
+        # Use the raw state until the filter has seen the sensor
+        if sensor_filter.raw is None:
+            return self.hass.states.is_state(entity_id, STATE_ON)
+
+        return sensor_filter.state and not sensor_filter.quarantined
+
+    @profiled
     def _update_attributes(self) -> None:
         """Update attributes."""
 
         # Update active presence sensing entities
         self._presence_sensor_entities_active = []
         for presence_sensing_entity in self._presence_sensor_entities:
-            if self.hass.states.is_state(presence_sensing_entity, STATE_ON):
+            if self._is_sensor_active(presence_sensing_entity):
                 self._presence_sensor_entities_active.append(
                     presence_sensing_entity
                 )
@@ -271,9 +545,19 @@ class LightControlSwitch(SwitchEntity, RestoreEntity):
         )
 
         # Check if presence is detected
-        self._presence_detected = False
-        if self._presence_sensor_entities_active or presence_overriden:
-            self._presence_detected = True
+        presence_detected = bool(
+            self._presence_sensor_entities_active or presence_overriden
+        )
+
+        # Roll the presence up to the areas containing this area
+        if self._unsub_hierarchy is not None:
+            hierarchy = self.hass.data[DOMAIN][DATA_HIERARCHY]
+            hierarchy.async_set_present(self.entity_id, presence_detected)
+            presence_detected = hierarchy.is_present(self.entity_id)
+
+        if presence_detected != self._presence_detected:
+            self._presence_detected = presence_detected
+            self._presence_changed()
 
         self._extra_state_attributes.update(
             {
@@ -287,35 +571,144 @@ class LightControlSwitch(SwitchEntity, RestoreEntity):
             _LOGGER.debug("%s cancelled '_setup_listeners'", self._name)
             return
 
+        # Seed the chatter filters with the current states
+        now = time.monotonic()
+        for entity_id, sensor_filter in self._sensor_filters.items():
+            state = self.hass.states.get(entity_id)
+            if state is not None and state.state in (STATE_ON, STATE_OFF):
+                sensor_filter.update(state.state == STATE_ON, now)
+        for entity_id in self._numeric_filters:
+            self._update_numeric(entity_id, self.hass.states.get(entity_id))
+
+        # Join the hierarchy, the presence is set by the attributes update
+        if self._unsub_hierarchy is None:
+            self._unsub_hierarchy = self.hass.data[DOMAIN][
+                DATA_HIERARCHY
+            ].async_add_node(
+                self.entity_id,
+                self._child_areas,
+                False,
+                self._async_child_presence_changed,
+            )
+        if self._unsub_adjacency is None:
+            self._unsub_adjacency = self.hass.data[DOMAIN][
+                DATA_ADJACENCY
+            ].async_add_area(
+                self.entity_id, self._adjacent_areas, self._async_prelight
+            )
+
         # Update attributes
         self._update_attributes()
 
         # Listen for state changes
-        self.hass.bus.async_listen(
-            EVENT_STATE_CHANGED, self._handle_state_changed
-        )
+        if self._unsub_state_changed is None:
+            self._tracked_entities = frozenset(
+                (
+                    *self._presence_sensor_entities,
+                    *self._lights,
+                    self.area_dark_switch.entity_id,
+                    self.override_presence_switch.entity_id,
+                )
+            )
 
-    async def _handle_state_changed(self, event: Event) -> None:
-        """Track 'state_changed' events."""
+            # Events of other entities are dropped by the filter, and the
+            # handler runs inline without creating a task per event
+            self._unsub_state_changed = self.hass.bus.async_listen(
+                EVENT_STATE_CHANGED,
+                self._handle_state_changed,
+                self._filter_state_changed,
+                run_immediately=True,
+            )
+            base.async_register_controller(self.hass, self)
 
-        # Check if the event is for our presence sensing entity
-        # or the dark mode switch
-        # or the override occupancy switch
-        entity_id = event.data.get(ATTR_ENTITY_ID, "")
-        if not (
-            entity_id in self._presence_sensor_entities
-            or entity_id == self.area_dark_switch.entity_id
-            or entity_id == self.override_presence_switch.entity_id
-        ):
+        # Correct lights which changed while we were not listening
+        self.async_schedule_staggered_reconcile()
+
+    @callback
+    def _filter_state_changed(self, event: Event) -> bool:
+        """Return if a 'state_changed' event is for a tracked entity."""
+        return event.data[ATTR_ENTITY_ID] in self._tracked_entities
+
+    @callback
+    @profiled
+    def _handle_state_changed(self, event: Event) -> None:
+        """Track 'state_changed' events.
+
+        Runs inline in the event loop and only queues the event. The queue
+        is processed once per loop iteration and only requests commands, so
+        event storms and slow lights do not pile up work.
+        """
+
+        # Only events of the presence sensing entities, the lights, the
+        # dark mode switch and the override occupancy switch arrive here
+        entity_id = event.data[ATTR_ENTITY_ID]
+        new_state = event.data.get("new_state")
+        old_state = event.data.get("old_state")
+
+        # Numeric sources only reach the decision path when they cross the
+        # threshold, the other readings are dropped here
+        if entity_id in self._numeric_filters:
+            self._handle_numeric_reading(entity_id, new_state)
             return
 
-        # Update attributes
-        self._update_attributes()
+        # Drop chattering and debounced presence sensor events, the filters
+        # see every event so their statistics stay exact during storms
+        accepted = True
+        if entity_id in self._sensor_filters:
+            accepted = self._filter_event(entity_id, new_state)
+
+        # Collapse the pending events of an entity to the newest one, so
+        # the queue never holds more than one event per tracked entity
+        if (pending := self._pending_events.get(entity_id)) is not None:
+            old_state = pending[0]
+            accepted = accepted or pending[2]
+        self._pending_events[entity_id] = (old_state, new_state, accepted)
+
+        if not self._events_scheduled:
+            self._events_scheduled = True
+            self.hass.loop.call_soon(self._async_process_events)
+
+    @callback
+    def _async_process_events(self) -> None:
+        """Process the collapsed events queued since the last run."""
+        self._events_scheduled = False
+        events, self._pending_events = self._pending_events, {}
+        started_at = time.perf_counter()
+
+        for entity_id, (old_state, new_state, accepted) in events.items():
+            self._process_state_change(
+                entity_id, old_state, new_state, accepted
+            )
+
+        self._async_publish_state()
+        self.handler_latency.add(time.perf_counter() - started_at)
+
+    @callback
+    @profiled
+    def _process_state_change(
+        self, entity_id, old_state, new_state, accepted
+    ) -> None:
+        """Run the state machine for the state change of an entity."""
+
+        # Reconcile when a sensor or light reconnects, there is no edge.
+        # A whole mesh may come back at once, so the areas are spread
+        # across a short window
+        if _is_reconnect(old_state, new_state):
+            self.async_schedule_staggered_reconcile(RECONNECT_STAGGER_WINDOW)
+            return
+
+        if entity_id in self._lights:
+            if self._is_manual_change(old_state, new_state):
+                self._start_manual_override(entity_id)
+            else:
+                self._record_light_latency(old_state, new_state)
+            return
+
+        if not accepted:
+            return
 
         # State machine
         action = None
-        new_state = event.data.get("new_state")
-        old_state = event.data.get("old_state")
         if (
             new_state is not None
             and new_state.state == STATE_ON
@@ -331,11 +724,19 @@ class LightControlSwitch(SwitchEntity, RestoreEntity):
         ):
             action = ACTION_TURN_OFF_LIGHTS
 
-        _LOGGER.debug(
-            "Detected a '%s' 'state_changed' action: '%s'",
-            entity_id,
-            action,
-        )
+        # Measure the latency from the presence sensor edge
+        triggered_at = None
+        if entity_id in self._sensor_filters and new_state is not None:
+            triggered_at = new_state.last_updated_timestamp
+
+        self._handle_action(action, triggered_at, entity_id)
+
+    @callback
+    def _handle_action(self, action, triggered_at=None, source=None) -> None:
+        """Turn the lights on or off for an action of the state machine."""
+
+        # Update attributes
+        self._update_attributes()
 
         # Check if area is dark
         area_dark = self.hass.states.is_state(
@@ -343,38 +744,600 @@ class LightControlSwitch(SwitchEntity, RestoreEntity):
         )
 
         # Check if all lights are off
-        all_lights_off = True
-        for light in self._lights:
-            if self.hass.states.get(light).state == STATE_ON:
-                all_lights_off = False
-                break
+        all_lights_off = not self._any_light_on()
+
+        outcome = None
+
+        # Check if the automatic control is paused
+        if self._is_manual_override_active():
+            outcome = TRACE_OUTCOME_MANUAL_OVERRIDE
 
         # Determine if lights should be turned off
-        if action == ACTION_TURN_OFF_LIGHTS:
+        elif action == ACTION_TURN_OFF_LIGHTS:
             if not all_lights_off and (
                 not area_dark or not self._presence_detected
             ):
-                service_data = {ATTR_ENTITY_ID: self._lights}
-                await self.hass.services.async_call(
-                    LIGHT_DOMAIN,
-                    SERVICE_TURN_OFF,
-                    service_data,
-                    context=self._context,
-                )
-                return
+                # Keep the lights on for a while after presence cleared
+                if not self._presence_detected and (
+                    delay := self._get_off_delay()
+                ):
+                    self._schedule_delayed_off(delay)
+                    outcome = TRACE_OUTCOME_DELAYED_OFF
+                else:
+                    self._async_request_lights(SERVICE_TURN_OFF)
+                    outcome = SERVICE_TURN_OFF
 
         # Determine if lights should be turned on
-        if action == ACTION_TURN_ON_LIGHTS:
-            if all_lights_off and (self._presence_detected and area_dark):
-                service_data = {ATTR_ENTITY_ID: self._lights}
-                await self.hass.services.async_call(
-                    LIGHT_DOMAIN,
-                    SERVICE_TURN_ON,
-                    service_data,
-                    context=self._context,
+        elif action == ACTION_TURN_ON_LIGHTS:
+            if self._own_lights_off() and (
+                self._presence_detected and area_dark
+            ):
+                self._async_request_lights(SERVICE_TURN_ON, triggered_at)
+                outcome = SERVICE_TURN_ON
+
+        self.trace.record(
+            source,
+            action,
+            self._presence_detected,
+            area_dark,
+            not all_lights_off,
+            outcome,
+        )
+        self._async_publish_state()
+
+    def compact_state(self) -> tuple[bool, bool, bool, int]:
+        """Return the presence, darkness, pause and lights on of the area."""
+        return (
+            self._presence_detected,
+            self.hass.states.is_state(
+                self.area_dark_switch.entity_id, STATE_ON
+            ),
+            self._manual_override_until is not None,
+            sum(
+                self.hass.states.is_state(light, STATE_ON)
+                for light in self._lights
+            ),
+        )
+
+    @callback
+    def _async_publish_state(self) -> None:
+        """Stream the compact state of the area to dashboards."""
+        stream = self.hass.data[DOMAIN][DATA_STREAM]
+        if stream.has_subscribers and self._unsub_state_changed is not None:
+            stream.async_publish(self.entity_id, self.compact_state())
+
+    def _trace(self, source, outcome) -> None:
+        """Record a decision made outside of the state machine."""
+        self.trace.record(
+            source,
+            None,
+            self._presence_detected,
+            self.hass.states.is_state(
+                self.area_dark_switch.entity_id, STATE_ON
+            ),
+            self._any_light_on(),
+            outcome,
+        )
+
+    def _any_light_on(self, exclude=()) -> bool:
+        """Return if any of the lights is on."""
+        return any(
+            self.hass.states.is_state(light, STATE_ON)
+            for light in self._lights
+            if light not in exclude
+        )
+
+    def _own_lights_off(self) -> bool:
+        """Return if all lights are off which no other area wants on.
+
+        A shared light turned on for another area does not keep the other
+        lights of this area off.
+        """
+        claimed = base.async_get_claimed_lights(self.hass, self)
+        return any(
+            light not in claimed for light in self._lights
+        ) and not self._any_light_on(exclude=claimed)
+
+    def _reconcile_service(self) -> str | None:
+        """Return the service which brings the lights to the desired state.
+
+        Lights are desired off without presence and on with presence in a
+        dark area. With presence in a bright area the lights are left alone.
+        """
+        if not self.is_on or not self._reconcile:
+            return None
+
+        self._update_attributes()
+
+        if self._is_manual_override_active():
+            return None
+
+        area_dark = self.hass.states.is_state(
+            self.area_dark_switch.entity_id, STATE_ON
+        )
+        any_light_on = self._any_light_on()
+
+        # Lights which another area wants on are not ours to turn off
+        if (
+            not self._presence_detected
+            and any_light_on
+            and self._off_delay_unsub is None
+            and self._any_light_on(
+                exclude=base.async_get_claimed_lights(self.hass, self)
+            )
+        ):
+            return SERVICE_TURN_OFF
+
+        if self._presence_detected and area_dark and self._own_lights_off():
+            return SERVICE_TURN_ON
+
+        return None
+
+    @callback
+    def async_schedule_reconcile(self) -> None:
+        """Compare the desired with the actual state and correct it."""
+        if service := self._reconcile_service():
+            self._trace(TRACE_SOURCE_RECONCILE, service)
+            self._async_request_lights(service)
+
+    @property
+    def _reconcile_key(self) -> str:
+        return f"{self._unique_id}_reconcile"
+
+    @callback
+    def async_schedule_staggered_reconcile(
+        self, window: float | None = None
+    ) -> None:
+        """Reconcile at the offset of the area within the stagger window."""
+        self.hass.data[DOMAIN][DATA_SCHEDULER].async_schedule(
+            self._reconcile_key,
+            self._stagger_window if window is None else window,
+            self.async_schedule_reconcile,
+        )
+
+    @callback
+    def _async_request_lights(self, service, triggered_at=None) -> None:
+        """Request a light service, superseding pending requests.
+
+        A single worker per area sends the requests, so intermediate
+        requests made while a command is sent are dropped and only the
+        latest one is sent.
+        """
+        self._intent = service
+        self._intent_triggered_at = triggered_at
+        if self._intent_task is None:
+            self._intent_task = self.hass.async_create_task(
+                self._async_process_intents()
+            )
+
+    async def _async_process_intents(self) -> None:
+        """Send the latest requested light service until none is left."""
+        try:
+            while (service := self._intent) is not None:
+                self._intent = None
+                await self._async_call_lights(
+                    service, self._intent_triggered_at
                 )
+        finally:
+            self._intent_task = None
+
+    @profiled
+    async def _async_call_lights(self, service, triggered_at=None) -> None:
+        """Call a light service for all lights."""
+        lights = self._lights
+        group = self._get_light_group()
+        self._light_triggered_at = None
+
+        # Leave the lights to the other areas which want them on
+        if claimed := base.async_get_claimed_lights(self.hass, self):
+            _LOGGER.debug("%s leaves lights on: %s", self._name, claimed)
+            lights = [light for light in lights if light not in claimed]
+            group = None
+
+            if not lights:
                 return
 
+        dispatched_at = time.time()
+        if (
+            await self.hass.data[DOMAIN][DATA_COMMANDS].async_send(
+                lights, service, self._context, group
+            )
+            and triggered_at is not None
+        ):
+            self.dispatch_latency.add(max(dispatched_at - triggered_at, 0.0))
+            self._light_triggered_at = triggered_at
+
+    def _record_light_latency(self, old_state, new_state) -> None:
+        """Measure the latency until the first light reports on."""
+        if (
+            self._light_triggered_at is not None
+            and new_state is not None
+            and new_state.state == STATE_ON
+            and old_state is not None
+            and old_state.state == STATE_OFF
+        ):
+            self.light_latency.add(
+                max(
+                    new_state.last_updated_timestamp
+                    - self._light_triggered_at,
+                    0.0,
+                )
+            )
+            self._light_triggered_at = None
+
+    def _get_light_group(self) -> str | None:
+        """Return the group entity of the lights, if any."""
+        if self._light_group_unique_id is not None:
+            # The created light group may be added after the switch
+            return er.async_get(self.hass).async_get_entity_id(
+                LIGHT_DOMAIN, DOMAIN, self._light_group_unique_id
+            )
+
+        return self._light_group
+
+    def _filter_event(self, entity_id, new_state) -> bool:
+        """Return if a presence sensor event passes the chatter filter."""
+        if new_state is None or new_state.state not in (STATE_ON, STATE_OFF):
+            return True
+
+        sensor_filter = self._sensor_filters[entity_id]
+        now = time.monotonic()
+        accepted = sensor_filter.update(new_state.state == STATE_ON, now)
+        self._check_quarantine(entity_id, now)
+
+        # Re-check a debounced state once the minimum dwell time passed
+        if (
+            not accepted
+            and not sensor_filter.quarantined
+            and sensor_filter.state != sensor_filter.raw
+            and entity_id not in self._debounce_unsubs
+        ):
+            self._debounce_unsubs[entity_id] = async_call_later(
+                self.hass,
+                sensor_filter.remaining_dwell(now),
+                partial(self._async_debounce_expired, entity_id),
+            )
+
+        return accepted
+
+    @callback
+    def _async_child_presence_changed(self, present: bool) -> None:
+        """Act on presence rolled up from the child areas."""
+        self._handle_action(
+            ACTION_TURN_ON_LIGHTS if present else ACTION_TURN_OFF_LIGHTS,
+            source=TRACE_SOURCE_CHILD_AREAS,
+        )
+
+    @callback
+    def _async_prelight(self) -> None:
+        """Turn on the lights before presence is likely to arrive."""
+        if (
+            not self._prelight
+            or not self.is_on
+            or self._presence_detected
+            or self._is_manual_override_active()
+            or self._any_light_on()
+            or not self.hass.states.is_state(
+                self.area_dark_switch.entity_id, STATE_ON
+            )
+        ):
+            return
+
+        self._trace(TRACE_SOURCE_PRELIGHT, SERVICE_TURN_ON)
+        self._async_request_lights(SERVICE_TURN_ON)
+
+        # Turn them off again unless presence arrives
+        self._schedule_delayed_off(PRELIGHT_TIMEOUT)
+
+    @callback
+    def _handle_numeric_reading(self, entity_id, new_state) -> None:
+        """Evaluate readings of a numeric source at most once per interval."""
+        if entity_id in self._throttle_unsubs:
+            return
+
+        numeric_filter = self._numeric_filters[entity_id]
+        if remaining := numeric_filter.remaining_interval(time.monotonic()):
+            # Evaluate the newest reading once the interval passed
+            self._throttle_unsubs[entity_id] = async_call_later(
+                self.hass,
+                remaining,
+                partial(self._async_throttle_expired, entity_id),
+            )
+            return
+
+        self._update_numeric(entity_id, new_state, time.monotonic())
+
+    @callback
+    def _async_throttle_expired(self, entity_id, _now=None) -> None:
+        """Evaluate the newest reading of a numeric source."""
+        self._throttle_unsubs.pop(entity_id, None)
+        self._update_numeric(
+            entity_id, self.hass.states.get(entity_id), time.monotonic()
+        )
+
+    @callback
+    def _update_numeric(self, entity_id, state, now=None) -> None:
+        """Record the reading of a numeric source and act on a crossing."""
+        try:
+            value = float(state.state)
+        except (AttributeError, ValueError):
+            # Unavailable and unknown sources do not detect presence
+            if self._numeric_filters[entity_id].clear():
+                self._handle_action(ACTION_TURN_OFF_LIGHTS, source=entity_id)
+            return
+
+        if not self._numeric_filters[entity_id].update(value, now):
+            return
+
+        self._handle_action(
+            ACTION_TURN_ON_LIGHTS
+            if self._numeric_filters[entity_id].state
+            else ACTION_TURN_OFF_LIGHTS,
+            state.last_updated_timestamp,
+            entity_id,
+        )
+
+    @callback
+    def _async_debounce_expired(self, entity_id, _now=None) -> None:
+        """Accept the state of a sensor after the minimum dwell time."""
+        self._debounce_unsubs.pop(entity_id, None)
+
+        state = self.hass.states.get(entity_id)
+        if state is None or state.state not in (STATE_ON, STATE_OFF):
+            return
+
+        is_on = state.state == STATE_ON
+        if not self._sensor_filters[entity_id].update(is_on, time.monotonic()):
+            return
+
+        action = ACTION_TURN_ON_LIGHTS if is_on else ACTION_TURN_OFF_LIGHTS
+        self._handle_action(action, source=entity_id)
+
+    def _presence_changed(self) -> None:
+        """Track a transition of the presence of the area."""
+        now = time.monotonic()
+
+        if self._unsub_adjacency is not None:
+            self.hass.data[DOMAIN][DATA_ADJACENCY].async_presence_changed(
+                self.entity_id, self._presence_detected
+            )
+
+        if self._presence_detected:
+            self._cancel_delayed_off()
+
+            # Learn how long the area stays empty before presence returns
+            if (
+                self._retrigger_gaps is not None
+                and self._presence_cleared_at is not None
+                and now - self._presence_cleared_at <= RETRIGGER_WINDOW
+            ):
+                self._retrigger_gaps.add(now - self._presence_cleared_at)
+            self._presence_cleared_at = None
+        else:
+            self._presence_cleared_at = now
+
+        if self._occupancy_model is not None:
+            if self._presence_detected:
+                self._occupancy_model.record_detected(now, dt_util.now())
+            else:
+                self._occupancy_model.record_cleared(now, dt_util.now())
+
+        if self._store is not None:
+            self._store.async_delay_save(
+                self._data_to_store, STORAGE_SAVE_DELAY
+            )
+
+    def _data_to_store(self) -> dict:
+        """Return the data learned about the area."""
+        data = {}
+        if self._occupancy_model is not None:
+            data["occupancy"] = self._occupancy_model.as_dict()
+        if self._retrigger_gaps is not None:
+            data["retrigger_gaps"] = self._retrigger_gaps.as_dict()
+
+        return data
+
+    def _get_off_delay(self) -> float:
+        """Return the seconds to keep the lights on after presence cleared."""
+        delay = self._off_delay
+
+        # Stretch the delay when presence is likely to return soon
+        if self._occupancy_model is not None:
+            delay += self._occupancy_model.extension(dt_util.now())
+
+        # Cover most of the gaps after which presence was detected again
+        if (
+            self._retrigger_gaps is not None
+            and self._retrigger_gaps.count >= ADAPTIVE_MIN_SAMPLES
+        ):
+            delay = max(delay, self._retrigger_gaps.value())
+
+        return min(delay, self._max_off_delay)
+
+    def _schedule_delayed_off(self, delay: float) -> None:
+        """Turn off the lights after a delay unless presence returns."""
+        _LOGGER.debug("%s turns off lights in %.0fs", self._name, delay)
+
+        self._cancel_delayed_off()
+        self._off_delay_unsub = async_call_later(
+            self.hass, delay, self._async_delayed_off
+        )
+
+    def _cancel_delayed_off(self) -> None:
+        if self._off_delay_unsub is not None:
+            self._off_delay_unsub()
+            self._off_delay_unsub = None
+
+    @callback
+    def _async_delayed_off(self, _now=None) -> None:
+        """Turn off the lights once the off delay passed."""
+        self._off_delay_unsub = None
+
+        self._update_attributes()
+        if self._presence_detected or self._is_manual_override_active():
+            return
+
+        if self._any_light_on():
+            self._trace(TRACE_SOURCE_OFF_DELAY, SERVICE_TURN_OFF)
+            self._async_request_lights(SERVICE_TURN_OFF)
+
+    def _is_manual_change(self, old_state, new_state) -> bool:
+        """Return if a light was switched by someone else."""
+        return (
+            bool(self._manual_override_duration)
+            and old_state is not None
+            and new_state is not None
+            and old_state.state in (STATE_ON, STATE_OFF)
+            and new_state.state in (STATE_ON, STATE_OFF)
+            and old_state.state != new_state.state
+            and self._context.id
+            not in (new_state.context.id, new_state.context.parent_id)
+            and not self.hass.data[DOMAIN][DATA_COMMANDS].is_acknowledged(
+                new_state
+            )
+        )
+
+    def _start_manual_override(self, entity_id) -> None:
+        """Pause the automatic control of the area."""
+        self._manual_override_until = (
+            dt_util.utcnow() + self._manual_override_duration
+        )
+        self._manual_override_presence_seen = self._presence_detected
+        _LOGGER.debug(
+            "%s paused by manual change of %s until %s",
+            self._name,
+            entity_id,
+            self._manual_override_until,
+        )
+
+        self._extra_state_attributes[
+            ATTR_MANUAL_OVERRIDE_UNTIL
+        ] = self._manual_override_until.isoformat()
+        self.async_write_ha_state()
+
+        # End the pause on time, even if nothing happens in the area
+        self._cancel_manual_override_timer()
+        self._manual_override_unsub = async_call_later(
+            self.hass,
+            self._manual_override_duration,
+            self._async_manual_override_expired,
+        )
+
+    def _cancel_manual_override_timer(self) -> None:
+        if self._manual_override_unsub is not None:
+            self._manual_override_unsub()
+            self._manual_override_unsub = None
+
+    @callback
+    def _async_manual_override_expired(self, _now=None) -> None:
+        """End the pause once its duration passed."""
+        self._manual_override_unsub = None
+        if self._manual_override_until is not None:
+            self._end_manual_override()
+
+    def _end_manual_override(self) -> None:
+        """Resume the automatic control of the area."""
+        self._cancel_manual_override_timer()
+        self._manual_override_until = None
+        self._extra_state_attributes[ATTR_MANUAL_OVERRIDE_UNTIL] = None
+        self.async_write_ha_state()
+        self._async_publish_state()
+
+    def _is_manual_override_active(self) -> bool:
+        """Return if the automatic control is paused.
+
+        The pause ends after its duration or as soon as presence seen
+        during the pause clears, so the attributes must be up to date. A
+        light switched in an empty room stays paused for the duration.
+        """
+        if self._manual_override_until is None:
+            return False
+
+        if self._presence_detected:
+            self._manual_override_presence_seen = True
+
+        if dt_util.utcnow() < self._manual_override_until and (
+            self._presence_detected or not self._manual_override_presence_seen
+        ):
+            return True
+
+        self._end_manual_override()
+        return False
+
+    def _issue_id(self, entity_id) -> str:
+        return f"{ISSUE_SENSOR_QUARANTINED}_{self._unique_id}_{entity_id}"
+
+    def _check_quarantine(self, entity_id, now) -> None:
+        """Quarantine or release a sensor and report it as repair issue."""
+        sensor_filter = self._sensor_filters[entity_id]
+        was_quarantined = sensor_filter.quarantined
+        if sensor_filter.check_quarantine(now) == was_quarantined:
+            return
+
+        if sensor_filter.quarantined:
+            _LOGGER.warning(
+                "%s quarantined chattering presence sensor %s",
+                self._name,
+                entity_id,
+            )
+            ir.async_create_issue(
+                self.hass,
+                DOMAIN,
+                self._issue_id(entity_id),
+                is_fixable=False,
+                severity=ir.IssueSeverity.WARNING,
+                translation_key=ISSUE_SENSOR_QUARANTINED,
+                translation_placeholders={
+                    "entity_id": entity_id,
+                    "name": self._name,
+                },
+            )
+
+            # Check periodically if the sensor calmed down
+            if self._quarantine_unsub is None:
+                self._quarantine_unsub = async_track_time_interval(
+                    self.hass,
+                    self._async_check_quarantines,
+                    timedelta(seconds=QUARANTINE_CHECK_INTERVAL),
+                )
+        else:
+            _LOGGER.info(
+                "%s released presence sensor %s", self._name, entity_id
+            )
+            ir.async_delete_issue(self.hass, DOMAIN, self._issue_id(entity_id))
+
+        self._extra_state_attributes[ATTR_QUARANTINED_SENSORS] = [
+            sensor
+            for sensor, sensor_filter in self._sensor_filters.items()
+            if sensor_filter.quarantined
+        ]
+        self._update_attributes()
+        self.async_write_ha_state()
+
+    @callback
+    def _async_check_quarantines(self, _now=None) -> None:
+        """Release quarantined sensors which calmed down."""
+        now = time.monotonic()
+        for entity_id, sensor_filter in self._sensor_filters.items():
+            if sensor_filter.quarantined:
+                self._check_quarantine(entity_id, now)
+
+        if not self._extra_state_attributes[ATTR_QUARANTINED_SENSORS]:
+            self._quarantine_unsub()
+            self._quarantine_unsub = None
+
+
+def _is_reconnect(old_state, new_state) -> bool:
+    """Return if an entity became available with a known state."""
+    return (
+        new_state is not None
+        and new_state.state in (STATE_ON, STATE_OFF)
+        and (
+            old_state is None
+            or old_state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN)
+        )
+    )
+
 
 class OverrideOccupancySwitch(SwitchEntity, RestoreEntity):
     """Representation of a override occupancy switch."""
@@ -448,8 +1411,10 @@ class AreaDarkSwitch(SwitchEntity, RestoreEntity):
         self,
         hass,
         entry_name,
+        options=None,
+        lights=None,
     ):
-        """Initialize the override occupancy switch."""
+        """Initialize the area dark switch."""
         self.hass = hass
 
         self._unique_id = f"{SWITCH_AREA_DARK_PREFIX_ID}_{entry_name}"
@@ -458,6 +1423,26 @@ class AreaDarkSwitch(SwitchEntity, RestoreEntity):
         self._icon = SWITCH_AREA_DARK_ICON
         self._state = None
 
+        options = options or {}
+        self._dark_mode = options.get(CONF_DARK_MODE, DEFAULT_DARK_MODE)
+        self._sun_elevation = options.get(
+            CONF_SUN_ELEVATION, DEFAULT_SUN_ELEVATION
+        )
+        self._sun_offset = timedelta(
+            minutes=options.get(CONF_SUN_OFFSET, DEFAULT_SUN_OFFSET)
+        )
+        self._unsub_dark = None
+
+        # Illuminance of the area, excluding the lights of the area
+        self._lights = lights or []
+        self._illuminance_sensor = options.get(
+            CONF_ILLUMINANCE_SENSOR, DEFAULT_ILLUMINANCE_SENSOR
+        )
+        self._illuminance_filter = IlluminanceFilter(
+            options.get(CONF_DARK_ILLUMINANCE, DEFAULT_DARK_ILLUMINANCE),
+            options.get(CONF_BRIGHT_ILLUMINANCE, DEFAULT_BRIGHT_ILLUMINANCE),
+        )
+
         _LOGGER.debug("Area dark switch created (%s)", self._unique_id)
 
     @property
@@ -498,3 +1483,81 @@ class AreaDarkSwitch(SwitchEntity, RestoreEntity):
             await self.async_turn_on()
         else:
             await self.async_turn_off()
+
+        # Follow the sun, switching by hand still works until it changes
+        if self._dark_mode == DARK_MODE_SUN:
+            self._unsub_dark = self.hass.data[DOMAIN][
+                DATA_SUN
+            ].async_add_listener(
+                self._unique_id,
+                self._sun_elevation,
+                self._sun_offset,
+                self._async_set_dark,
+            )
+
+        # Follow the illuminance sensor, only crossings cause work
+        elif (
+            self._dark_mode == DARK_MODE_ILLUMINANCE
+            and self._illuminance_sensor
+        ):
+            self._illuminance_filter.set_lights_on(self._any_light_on())
+            self._update_illuminance(
+                self.hass.states.get(self._illuminance_sensor)
+            )
+            self._unsub_dark = self.hass.bus.async_listen(
+                EVENT_STATE_CHANGED,
+                self._handle_illuminance_changed,
+                self._filter_illuminance_changed,
+                run_immediately=True,
+            )
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Call when entity will be removed from hass."""
+        if self._unsub_dark is not None:
+            self._unsub_dark()
+            self._unsub_dark = None
+
+    def _any_light_on(self) -> bool:
+        """Return if any of the lights of the area is on."""
+        return any(
+            self.hass.states.is_state(light, STATE_ON)
+            for light in self._lights
+        )
+
+    @callback
+    def _filter_illuminance_changed(self, event: Event) -> bool:
+        """Return if a 'state_changed' event is for the sensor or a light."""
+        entity_id = event.data[ATTR_ENTITY_ID]
+        return entity_id == self._illuminance_sensor or entity_id in (
+            self._lights
+        )
+
+    @callback
+    def _handle_illuminance_changed(self, event: Event) -> None:
+        """Track the illuminance sensor and the lights."""
+        if event.data[ATTR_ENTITY_ID] == self._illuminance_sensor:
+            self._update_illuminance(event.data["new_state"])
+        else:
+            self._illuminance_filter.set_lights_on(self._any_light_on())
+
+    @callback
+    def _update_illuminance(self, state) -> None:
+        """Record a reading and apply the darkness if it changed."""
+        if state is None:
+            return
+
+        try:
+            illuminance = float(state.state)
+        except ValueError:
+            return
+
+        dark = self._illuminance_filter.update(illuminance)
+        if dark is not None:
+            self._async_set_dark(dark)
+
+    @callback
+    def _async_set_dark(self, dark: bool) -> None:
+        """Set the darkness determined automatically."""
+        _LOGGER.debug("%s is dark: %s", self._name, dark)
+        self._state = dark
+        self.async_write_ha_state()
@@ -0,0 +1,82 @@
+"""Decision trace for the integration."""
+from __future__ import annotations
+
+import time
+
+from homeassistant.util import dt as dt_util
+
+from .const import TRACE_SIZE
+
+
+class DecisionTrace:
+    """Ring buffer of the latest decisions of an area.
+
+    The slots are allocated once and overwritten in place, so recording a
+    decision costs a few assignments and tracing can always be on.
+    """
+
+    __slots__ = ("_slots", "_index", "_count")
+
+    def __init__(self, size: int = TRACE_SIZE) -> None:
+        """Initialize the trace."""
+        self._slots = [
+            [0.0, None, None, False, False, False, None] for _ in range(size)
+        ]
+        self._index = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Return the number of recorded decisions."""
+        return self._count
+
+    def record(
+        self,
+        source: str | None,
+        action: str | None,
+        presence: bool,
+        dark: bool,
+        lights_on: bool,
+        outcome: str | None,
+    ) -> None:
+        """Record a decision, overwriting the oldest one when full."""
+        slot = self._slots[self._index]
+        slot[0] = time.time()
+        slot[1] = source
+        slot[2] = action
+        slot[3] = presence
+        slot[4] = dark
+        slot[5] = lights_on
+        slot[6] = outcome
+
+        self._index = (self._index + 1) % len(self._slots)
+        if self._count < len(self._slots):
+            self._count += 1
+
+    def as_list(self) -> list[dict]:
+        """Return the recorded decisions, oldest first."""
+        size = len(self._slots)
+        start = (self._index - self._count) % size
+
+        return [
+            {
+                "time": dt_util.utc_from_timestamp(timestamp).isoformat(),
+                "source": source,
+                "action": action,
+                "presence": presence,
+                "dark": dark,
+                "lights_on": lights_on,
+                "outcome": outcome,
+            }
+            for (
+                timestamp,
+                source,
+                action,
+                presence,
+                dark,
+                lights_on,
+                outcome,
+            ) in (
+                self._slots[(start + offset) % size]
+                for offset in range(self._count)
+            )
+        ]
@@ -0,0 +1,144 @@
+"""WebSocket API for the integration."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_CONTROLLERS, DATA_STREAM, DOMAIN, WS_TYPE_SUBSCRIBE
+
+# Fields of the compact state of an area
+STATE_KEYS = ("presence", "dark", "override", "lights_on")
+
+
+class AreaStateStream:
+    """Compact state of all areas streamed to subscribers.
+
+    Areas publish their state after handling events. Only areas which
+    changed are collected, and once per loop iteration the changed fields
+    are sent to the subscribers as a single delta.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the stream."""
+        self.hass = hass
+
+        self._subscribers: set[Callable[[dict], None]] = set()
+        self._states: dict[str, tuple] = {}
+        self._delta: dict[str, dict | None] = {}
+        self._flush_scheduled = False
+
+    def __len__(self) -> int:
+        """Return the number of subscribers."""
+        return len(self._subscribers)
+
+    @property
+    def has_subscribers(self) -> bool:
+        """Return if any dashboard is subscribed."""
+        return bool(self._subscribers)
+
+    @callback
+    def async_subscribe(
+        self, subscriber: Callable[[dict], None]
+    ) -> tuple[dict[str, dict], Callable[[], None]]:
+        """Subscribe to the deltas and return the snapshot of all areas."""
+        if not self._subscribers:
+            self._states = {
+                controller.entity_id: controller.compact_state()
+                for controller in self.hass.data[DOMAIN]
+                .get(DATA_CONTROLLERS, {})
+                .values()
+            }
+        self._subscribers.add(subscriber)
+
+        @callback
+        def _async_unsubscribe() -> None:
+            self._subscribers.discard(subscriber)
+            if not self._subscribers:
+                self._states.clear()
+                self._delta.clear()
+
+        return {
+            entity_id: dict(zip(STATE_KEYS, state))
+            for entity_id, state in self._states.items()
+        }, _async_unsubscribe
+
+    @callback
+    def async_publish(self, entity_id: str, state: tuple) -> None:
+        """Publish the state of an area, it is sent if it changed."""
+        old_state = self._states.get(entity_id)
+        if state == old_state:
+            return
+        self._states[entity_id] = state
+
+        changes = self._delta.get(entity_id)
+        if changes is None:
+            changes = self._delta[entity_id] = {}
+        if old_state is None:
+            changes.update(zip(STATE_KEYS, state))
+        else:
+            for key, old, new in zip(STATE_KEYS, old_state, state):
+                if old != new:
+                    changes[key] = new
+        self._schedule_flush()
+
+    @callback
+    def async_remove(self, entity_id: str) -> None:
+        """Remove an area from the stream."""
+        if self._states.pop(entity_id, None) is None:
+            return
+
+        self._delta[entity_id] = None
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.hass.loop.call_soon(self._async_flush)
+
+    @callback
+    def _async_flush(self) -> None:
+        """Send the delta collected since the last flush."""
+        self._flush_scheduled = False
+        delta, self._delta = self._delta, {}
+        if not delta:
+            return
+
+        for subscriber in list(self._subscribers):
+            subscriber(delta)
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Set up the WebSocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe)
+
+
+@websocket_api.websocket_command({vol.Required("type"): WS_TYPE_SUBSCRIBE})
+@callback
+def websocket_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Send the state of all areas, then the deltas as they happen."""
+    msg_id = msg["id"]
+
+    @callback
+    def _async_send_delta(delta: dict) -> None:
+        connection.send_message(
+            websocket_api.event_message(msg_id, {"delta": delta})
+        )
+
+    snapshot, unsubscribe = hass.data[DOMAIN][DATA_STREAM].async_subscribe(
+        _async_send_delta
+    )
+    connection.subscriptions[msg_id] = unsubscribe
+
+    connection.send_result(msg_id)
+    connection.send_message(
+        websocket_api.event_message(msg_id, {"snapshot": snapshot})
+    )
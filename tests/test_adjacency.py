@@ -0,0 +1,87 @@
+"""Tests for the adjacency of areas."""
+
+import pytest
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+
+from custom_components.simple_area_presence_lighting.adjacency import (
+    AreaAdjacency,
+)
+from custom_components.simple_area_presence_lighting.const import (
+    DOMAIN,
+    PRELIGHT_MIN_SAMPLES,
+)
+
+
+@pytest.mark.asyncio
+async def test_most_likely_next_area_is_prelit(hass, hass_storage):
+    """Test the most likely neighbour is pre-lit once transitions are known."""
+    adjacency = AreaAdjacency(hass)
+    await adjacency.async_load()
+
+    prelit = []
+    for area, neighbours in (
+        ("hallway", ["kitchen", "bathroom"]),
+        ("kitchen", []),
+        ("bathroom", []),
+    ):
+        adjacency.async_add_area(
+            area, neighbours, lambda area=area: prelit.append(area)
+        )
+
+    # People mostly walk from the hallway into the kitchen
+    for index in range(PRELIGHT_MIN_SAMPLES + 1):
+        target = "bathroom" if index == 0 else "kitchen"
+        adjacency.async_presence_changed("hallway", True)
+        adjacency.async_presence_changed("hallway", False)
+        adjacency.async_presence_changed(target, True)
+        adjacency.async_presence_changed(target, False)
+
+    assert adjacency.probabilities("hallway") == {
+        "bathroom": 1 / (PRELIGHT_MIN_SAMPLES + 1),
+        "kitchen": PRELIGHT_MIN_SAMPLES / (PRELIGHT_MIN_SAMPLES + 1),
+    }
+
+    # Pre-lighting starts once enough transitions were seen
+    assert prelit == ["kitchen"]
+
+    # The counts are persisted, at the latest when Home Assistant stops
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+    await hass.async_block_till_done()
+    assert hass_storage[f"{DOMAIN}.transitions"]["data"]["counts"][
+        "hallway"
+    ] == {"bathroom": 1, "kitchen": PRELIGHT_MIN_SAMPLES}
+
+    restored = AreaAdjacency(hass)
+    await restored.async_load()
+    restored.async_add_area("hallway", ["kitchen", "bathroom"], lambda: None)
+    assert restored.probabilities("hallway") == adjacency.probabilities(
+        "hallway"
+    )
+
+
+@pytest.mark.asyncio
+async def test_transitions_of_removed_area_are_forgotten(hass, hass_storage):
+    """Test the transitions from and to a removed area are pruned."""
+    hass_storage[f"{DOMAIN}.transitions"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.transitions",
+        "data": {
+            "counts": {
+                "hallway": {"kitchen": 3, "bathroom": 1},
+                "kitchen": {"hallway": 2},
+                "bathroom": {"kitchen": 1},
+            }
+        },
+    }
+    adjacency = AreaAdjacency(hass)
+    await adjacency.async_load()
+
+    adjacency.async_remove_transitions("kitchen")
+    assert adjacency.probabilities("kitchen") == {}
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+    await hass.async_block_till_done()
+    assert hass_storage[f"{DOMAIN}.transitions"]["data"]["counts"] == {
+        "hallway": {"bathroom": 1}
+    }
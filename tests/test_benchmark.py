@@ -0,0 +1,127 @@
+"""Benchmarks of the event path of the integration."""
+
+import asyncio
+
+import pytest
+
+from homeassistant.const import EVENT_STATE_CHANGED, STATE_OFF
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.simple_area_presence_lighting.const import (
+    CONF_AREA_ID,
+    CONF_CREATE_LIGHT_GROUP,
+    CONF_LIGHTS,
+    CONF_NAME,
+    CONF_PRESENCE_SENSOR_ENTITIES,
+    CONF_USE_AREA_LIGHTS,
+    CONF_USE_AREA_PRESENCE_SENSORS,
+    DEFAULT_AREA_ID,
+    DOMAIN,
+)
+
+AREAS = 5
+EVENTS = 200
+
+
+class TaskCounter:
+    """Count the tasks created in the event loop."""
+
+    def __init__(self, loop) -> None:
+        """Initialize the counter."""
+        self.loop = loop
+        self.count = 0
+        self._factory = None
+
+    def __enter__(self):
+        """Start counting."""
+        self._factory = self.loop.get_task_factory()
+
+        def factory(loop, coro, **kwargs):
+            self.count += 1
+            if self._factory is not None:
+                return self._factory(loop, coro, **kwargs)
+            return asyncio.Task(coro, loop=loop, **kwargs)
+
+        self.loop.set_task_factory(factory)
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Stop counting."""
+        self.loop.set_task_factory(self._factory)
+
+
+async def _async_setup_areas(hass) -> None:
+    for index in range(AREAS):
+        hass.states.async_set(f"light.area_{index}", STATE_OFF)
+        hass.states.async_set(f"binary_sensor.area_{index}", STATE_OFF)
+
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={CONF_NAME: f"area_{index}"},
+            options={
+                CONF_AREA_ID: DEFAULT_AREA_ID,
+                CONF_USE_AREA_LIGHTS: False,
+                CONF_LIGHTS: [f"light.area_{index}"],
+                CONF_USE_AREA_PRESENCE_SENSORS: False,
+                CONF_PRESENCE_SENSOR_ENTITIES: [f"binary_sensor.area_{index}"],
+                CONF_CREATE_LIGHT_GROUP: False,
+            },
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+
+    await hass.async_block_till_done()
+
+
+async def _async_fire_events(hass, run: int) -> None:
+    for index in range(EVENTS):
+        value = run * EVENTS + index
+
+        # Mostly unrelated entities, some updates of the presence sensors
+        if index % 10:
+            hass.states.async_set(f"sensor.unrelated_{index}", value)
+        else:
+            hass.states.async_set(
+                f"binary_sensor.area_{index // 10 % AREAS}",
+                STATE_OFF,
+                {"signal_strength": value},
+            )
+
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_state_changes_without_commands_create_no_tasks(hass):
+    """Test state changes only create tasks when a command is needed.
+
+    The comparison only covers the listener dispatch overhead, not the
+    handling itself: an unfiltered coroutine listener, as the areas used
+    before, makes the bus create a task for every state change for every
+    area before any handler code runs.
+    """
+    await _async_setup_areas(hass)
+
+    with TaskCounter(hass.loop) as counter:
+        await _async_fire_events(hass, 0)
+    assert counter.count == 0
+
+    # Dispatch overhead of an unfiltered coroutine listener per area, the
+    # listener is empty so only the tasks created by the bus are counted
+    def _create_handler():
+        async def _handle_state_changed(event):
+            pass
+
+        return _handle_state_changed
+
+    unsubs = [
+        hass.bus.async_listen(EVENT_STATE_CHANGED, _create_handler())
+        for _ in range(AREAS)
+    ]
+
+    with TaskCounter(hass.loop) as counter:
+        await _async_fire_events(hass, 1)
+    assert counter.count == AREAS * EVENTS
+
+    for unsub in unsubs:
+        unsub()
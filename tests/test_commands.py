@@ -0,0 +1,254 @@
+"""Tests for the command tracking."""
+
+from datetime import timedelta
+
+import pytest
+
+from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    SERVICE_TURN_ON,
+    STATE_OFF,
+    STATE_ON,
+)
+from homeassistant.core import Context
+from homeassistant.util import dt as dt_util
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    async_mock_service,
+)
+
+from custom_components.simple_area_presence_lighting.commands import (
+    CommandTracker,
+)
+from custom_components.simple_area_presence_lighting.const import (
+    COMMAND_ACK_TIMEOUT,
+    COMMAND_MAX_RETRIES,
+    CONF_AREA_ID,
+    CONF_CREATE_LIGHT_GROUP,
+    CONF_LIGHTS,
+    CONF_NAME,
+    CONF_PRESENCE_SENSOR_ENTITIES,
+    CONF_USE_AREA_LIGHTS,
+    CONF_USE_AREA_PRESENCE_SENSORS,
+    DATA_COMMANDS,
+    DEFAULT_AREA_ID,
+    DEFAULT_NAME,
+    DOMAIN,
+    TEST_LIGHTS,
+    TEST_PRESENCE_SENSOR_ENTITIES,
+)
+from custom_components.simple_area_presence_lighting.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+
+LIGHTS = ["light.fast", "light.flaky", "light.dead"]
+
+
+@pytest.mark.asyncio
+async def test_commands_are_retried_until_lights_respond(hass):
+    """Test only the lights which did not respond are retried."""
+    for light in LIGHTS:
+        hass.states.async_set(light, STATE_OFF)
+
+    calls = async_mock_service(hass, LIGHT_DOMAIN, SERVICE_TURN_ON)
+    context = Context()
+    commands = CommandTracker(hass)
+
+    await commands.async_send(LIGHTS, SERVICE_TURN_ON, context)
+    await hass.async_block_till_done()
+    assert calls[-1].data[ATTR_ENTITY_ID] == LIGHTS
+    assert len(commands) == 3
+
+    # One light responds in time
+    hass.states.async_set(LIGHTS[0], STATE_ON, context=context)
+    await hass.async_block_till_done()
+    assert len(commands) == 2
+
+    # The others are retried, one responds to the retry
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=COMMAND_ACK_TIMEOUT)
+    )
+    await hass.async_block_till_done()
+    assert calls[-1].data[ATTR_ENTITY_ID] == LIGHTS[1:]
+
+    hass.states.async_set(LIGHTS[1], STATE_ON, context=context)
+    await hass.async_block_till_done()
+    assert len(commands) == 1
+
+    # The last light is given up with a doubled timeout per retry
+    delay = COMMAND_ACK_TIMEOUT
+    for attempt in range(1, COMMAND_MAX_RETRIES + 1):
+        delay += COMMAND_ACK_TIMEOUT * 2**attempt
+        async_fire_time_changed(
+            hass, dt_util.utcnow() + timedelta(seconds=delay)
+        )
+        await hass.async_block_till_done()
+
+    assert len(calls) == 1 + COMMAND_MAX_RETRIES
+    assert calls[-1].data[ATTR_ENTITY_ID] == LIGHTS[2:]
+    assert not len(commands)
+
+    fast, flaky, dead = (commands.stats[light] for light in LIGHTS)
+    assert (fast.commands, fast.retries, fast.failures) == (1, 0, 0)
+    assert fast.latency.count == 1
+    assert not fast.is_flaky
+    assert (flaky.retries, flaky.failures) == (1, 0)
+    assert flaky.is_flaky
+    assert (dead.retries, dead.failures) == (COMMAND_MAX_RETRIES, 1)
+    assert dead.latency.count == 0
+
+    commands.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_manual_change_stops_retries(hass):
+    """Test a light switched by someone else is not retried."""
+    hass.states.async_set(LIGHTS[0], STATE_ON)
+
+    calls = async_mock_service(hass, LIGHT_DOMAIN, "turn_off")
+    commands = CommandTracker(hass)
+
+    await commands.async_send(LIGHTS[:1], "turn_off", Context())
+    hass.states.async_set(LIGHTS[0], STATE_ON, {"brightness": 1})
+    await hass.async_block_till_done()
+    assert not len(commands)
+
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=COMMAND_ACK_TIMEOUT)
+    )
+    await hass.async_block_till_done()
+    assert len(calls) == 1
+
+    commands.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_report_light_statistics(hass):
+    """Test the diagnostics report the statistics of the lights."""
+    hass.states.async_set(TEST_LIGHTS[0], STATE_OFF)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_NAME: DEFAULT_NAME},
+        options={
+            CONF_AREA_ID: DEFAULT_AREA_ID,
+            CONF_USE_AREA_LIGHTS: False,
+            CONF_LIGHTS: TEST_LIGHTS,
+            CONF_USE_AREA_PRESENCE_SENSORS: False,
+            CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+            CONF_CREATE_LIGHT_GROUP: False,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    async_mock_service(hass, LIGHT_DOMAIN, SERVICE_TURN_ON)
+    context = Context()
+    await hass.data[DOMAIN][DATA_COMMANDS].async_send(
+        TEST_LIGHTS, SERVICE_TURN_ON, context
+    )
+    hass.states.async_set(TEST_LIGHTS[0], STATE_ON, context=context)
+    await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["options"][CONF_LIGHTS] == TEST_LIGHTS
+    assert diagnostics["lights"][TEST_LIGHTS[0]]["commands"] == 1
+    assert diagnostics["lights"][TEST_LIGHTS[0]]["latency"]["count"] == 1
+    assert diagnostics["slow_lights"] == []
+    assert diagnostics["flaky_lights"] == []
+
+
+@pytest.mark.asyncio
+async def test_only_lights_in_wrong_state_are_commanded(hass):
+    """Test lights already in the target state are not commanded."""
+    hass.states.async_set(LIGHTS[0], STATE_ON)
+    hass.states.async_set(LIGHTS[1], STATE_OFF)
+
+    calls = async_mock_service(hass, LIGHT_DOMAIN, SERVICE_TURN_ON)
+    commands = CommandTracker(hass)
+
+    await commands.async_send(LIGHTS[:2], SERVICE_TURN_ON, Context())
+    await hass.async_block_till_done()
+    assert len(calls) == 1
+    assert calls[0].data[ATTR_ENTITY_ID] == LIGHTS[1:2]
+
+    # Nothing is sent when all lights are in the target state
+    hass.states.async_set(LIGHTS[1], STATE_ON)
+    await commands.async_send(LIGHTS[:2], SERVICE_TURN_ON, Context())
+    await hass.async_block_till_done()
+    assert len(calls) == 1
+    assert LIGHTS[0] not in commands.stats
+
+    commands.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_group_is_commanded_when_all_lights_differ(hass):
+    """Test the group is commanded only when all lights need the command."""
+    group = "light.group"
+    hass.states.async_set(group, STATE_OFF)
+    for light in LIGHTS[:2]:
+        hass.states.async_set(light, STATE_OFF)
+
+    calls = async_mock_service(hass, LIGHT_DOMAIN, SERVICE_TURN_ON)
+    commands = CommandTracker(hass)
+
+    await commands.async_send(LIGHTS[:2], SERVICE_TURN_ON, Context(), group)
+    await hass.async_block_till_done()
+    assert calls[-1].data[ATTR_ENTITY_ID] == [group]
+
+    # Members of native groups respond with a context of their own
+    hass.states.async_set(LIGHTS[0], STATE_ON)
+    await hass.async_block_till_done()
+    assert commands.is_acknowledged(hass.states.get(LIGHTS[0]))
+
+    # Retries go to the lights which did not respond
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=COMMAND_ACK_TIMEOUT)
+    )
+    await hass.async_block_till_done()
+    assert calls[-1].data[ATTR_ENTITY_ID] == LIGHTS[1:2]
+
+    # Only some lights differ, they are commanded individually
+    hass.states.async_set(LIGHTS[1], STATE_ON)
+    hass.states.async_set(LIGHTS[0], STATE_OFF)
+    await commands.async_send(LIGHTS[:2], SERVICE_TURN_ON, Context(), group)
+    await hass.async_block_till_done()
+    assert calls[-1].data[ATTR_ENTITY_ID] == LIGHTS[:1]
+
+    commands.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_duplicate_intents_are_dropped(hass):
+    """Test intents matching a command in flight are dropped."""
+    hass.states.async_set(LIGHTS[0], STATE_OFF)
+
+    on_calls = async_mock_service(hass, LIGHT_DOMAIN, SERVICE_TURN_ON)
+    off_calls = async_mock_service(hass, LIGHT_DOMAIN, "turn_off")
+    commands = CommandTracker(hass)
+
+    # A burst of edges, possibly from several areas sharing the light
+    for _ in range(3):
+        await commands.async_send(LIGHTS[:1], SERVICE_TURN_ON, Context())
+    await hass.async_block_till_done()
+    assert len(on_calls) == 1
+    assert commands.stats[LIGHTS[0]].duplicates == 2
+
+    # An opposite intent supersedes the command in flight, it is sent
+    # although the light has not reached the superseded target yet
+    await commands.async_send(LIGHTS[:1], "turn_off", Context())
+    await hass.async_block_till_done()
+    assert len(off_calls) == 1
+
+    await commands.async_send(LIGHTS[:1], "turn_off", Context())
+    await hass.async_block_till_done()
+    assert len(off_calls) == 1
+    assert commands.stats[LIGHTS[0]].duplicates == 3
+
+    commands.async_shutdown()
@@ -0,0 +1,55 @@
+"""Tests for the filters of the sources."""
+
+import pytest
+
+from custom_components.simple_area_presence_lighting.filters import (
+    CHATTER_RATE_WINDOW,
+    ChatterFilter,
+)
+
+
+def test_toggle_rate_decays():
+    """Test the toggle rate decays with the time since the last toggle."""
+    sensor_filter = ChatterFilter(0.0, 0.0)
+    sensor_filter.update(False, 0.0)
+    assert sensor_filter.rate(0.0) == 0.0
+
+    sensor_filter.update(True, 10.0)
+    sensor_filter.update(False, 20.0)
+    assert sensor_filter.toggles == 2
+    assert sensor_filter.mean_dwell_off == 10.0
+    assert sensor_filter.mean_dwell_on == 10.0
+
+    rate = sensor_filter.rate(20.0)
+    assert 1.0 < rate < 2.0
+    assert sensor_filter.rate(20.0 + CHATTER_RATE_WINDOW) == pytest.approx(
+        rate / 2.718281828, rel=1e-6
+    )
+
+
+def test_chattering_sensor_is_quarantined_and_released():
+    """Test a sensor enters and leaves the quarantine with hysteresis."""
+    sensor_filter = ChatterFilter(0.0, 5.0)
+    sensor_filter.update(False, 0.0)
+
+    now = 0.0
+    for _ in range(4):
+        for is_on in (True, False):
+            now += 1.0
+            sensor_filter.update(is_on, now)
+    assert sensor_filter.check_quarantine(now)
+
+    # Quarantined sensors report no edges
+    now += 1.0
+    assert not sensor_filter.update(True, now)
+    assert sensor_filter.state is False
+
+    # Still above half the threshold, the sensor stays quarantined
+    assert sensor_filter.check_quarantine(now + 10.0)
+
+    # Released once the rate dropped below half the threshold, with the
+    # latest raw state
+    later = now + 2 * CHATTER_RATE_WINDOW
+    assert not sensor_filter.check_quarantine(later)
+    assert sensor_filter.state is True
+    assert sensor_filter.as_dict(later)["quarantined"] is False
@@ -0,0 +1,75 @@
+"""Tests for the hierarchy of areas."""
+
+from custom_components.simple_area_presence_lighting.hierarchy import (
+    PresenceHierarchy,
+)
+
+
+def test_presence_rolls_up_incrementally():
+    """Test presence propagates up until an ancestor does not change."""
+    hierarchy = PresenceHierarchy()
+    changes = []
+
+    def _listener(node):
+        return lambda present: changes.append((node, present))
+
+    # Two rooms upstairs, the hallway contains one of them as well
+    hierarchy.async_add_node("house", ["upstairs"], False, _listener("house"))
+    hierarchy.async_add_node(
+        "upstairs", ["bedroom", "office"], False, _listener("upstairs")
+    )
+    hierarchy.async_add_node("hallway", ["office"], False, _listener("hall"))
+    for room in ("bedroom", "office"):
+        hierarchy.async_add_node(room, [], False, _listener(room))
+    assert not changes
+
+    hierarchy.async_set_present("bedroom", True)
+    assert changes == [("upstairs", True), ("house", True)]
+    assert not hierarchy.is_present("hallway")
+
+    # Upstairs is already occupied, only the hallway changes
+    changes.clear()
+    hierarchy.async_set_present("office", True)
+    assert changes == [("hall", True)]
+
+    hierarchy.async_set_present("bedroom", False)
+    assert changes == [("hall", True)]
+    assert hierarchy.is_present("house")
+
+    changes.clear()
+    hierarchy.async_set_present("office", False)
+    assert sorted(changes) == [
+        ("hall", False),
+        ("house", False),
+        ("upstairs", False),
+    ]
+
+
+def test_removed_area_releases_its_presence():
+    """Test removing an area keeps the edges declared by its parents."""
+    hierarchy = PresenceHierarchy()
+    changes = []
+
+    hierarchy.async_add_node("floor", ["room"], False, changes.append)
+    remove = hierarchy.async_add_node("room", [], True, lambda _: None)
+    assert changes == [True]
+
+    remove()
+    assert changes == [True, False]
+
+    # The room is added again, e.g. after a reload
+    hierarchy.async_add_node("room", [], True, lambda _: None)
+    assert changes == [True, False, True]
+
+
+def test_cycles_are_ignored():
+    """Test an area cannot contain one of the areas containing it."""
+    hierarchy = PresenceHierarchy()
+
+    hierarchy.async_add_node("floor", ["room"], False, lambda _: None)
+    hierarchy.async_add_node("room", ["floor", "room"], True, lambda _: None)
+
+    assert hierarchy.is_present("floor")
+    hierarchy.async_set_present("room", False)
+    assert not hierarchy.is_present("floor")
+    assert not hierarchy.is_present("room")
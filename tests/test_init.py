@@ -1,10 +1,29 @@
 """Tests for the integration."""
 
+import asyncio
+from unittest.mock import call, patch
+
 import pytest
+import voluptuous as vol
+from homeassistant.components.switch import DOMAIN as SWITCH_DOMAIN
 from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import (
+    EVENT_HOMEASSISTANT_FINAL_WRITE,
+    STATE_OFF,
+    STATE_ON,
+)
+from homeassistant.helpers.json import save_json
+from homeassistant.util import slugify
+from homeassistant.util.json import load_json
+from homeassistant.util.yaml import load_yaml
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.simple_area_presence_lighting.const import (
+    ATTR_CPROFILE,
+    ATTR_DURATION,
+    ATTR_ENTRIES,
+    ATTR_FILENAME,
+    ATTR_OPTIONS,
     CONF_AREA_ID,
     CONF_SENSOR_DEVICE_CLASSES,
     CONF_CREATE_LIGHT_GROUP,
@@ -13,12 +32,17 @@ from custom_components.simple_area_presence_lighting.const import (
     CONF_PRESENCE_SENSOR_ENTITIES,
     CONF_USE_AREA_LIGHTS,
     CONF_USE_AREA_PRESENCE_SENSORS,
+    DATA_SKIP_RELOAD,
     DEFAULT_AREA_ID,
     DEFAULT_SENSOR_DEVICE_CLASSES,
     DEFAULT_NAME,
     DEFAULT_USE_AREA_LIGHTS,
     DEFAULT_USE_AREA_PRESENCE_SENSORS,
     DOMAIN,
+    SERVICE_EXPORT_CONFIG,
+    SERVICE_IMPORT_CONFIG,
+    SERVICE_PROFILE,
+    SWITCH_LIGHT_CONTROL_PREFIX_NAME,
     TEST_LIGHTS,
     TEST_PRESENCE_SENSOR_ENTITIES,
 )
@@ -100,3 +124,187 @@ async def test_reconfigure_options(hass):
     await hass.async_block_till_done()
 
     assert entry.state == ConfigEntryState.LOADED
+
+
+@pytest.mark.asyncio
+async def test_export_and_import_config(hass, tmp_path):
+    """Test exporting all entries and importing them in one batch."""
+
+    hass.config.config_dir = str(tmp_path)
+
+    options = {
+        CONF_AREA_ID: DEFAULT_AREA_ID,
+        CONF_USE_AREA_LIGHTS: DEFAULT_USE_AREA_LIGHTS,
+        CONF_LIGHTS: TEST_LIGHTS,
+        CONF_USE_AREA_PRESENCE_SENSORS: DEFAULT_USE_AREA_PRESENCE_SENSORS,
+        CONF_SENSOR_DEVICE_CLASSES: DEFAULT_SENSOR_DEVICE_CLASSES,
+        CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+        CONF_CREATE_LIGHT_GROUP: False,
+    }
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_NAME: DEFAULT_NAME},
+        options=options,
+        unique_id=DEFAULT_NAME,
+    )
+
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_EXPORT_CONFIG,
+        {ATTR_FILENAME: "export.yaml"},
+        blocking=True,
+    )
+
+    exported = load_yaml(str(tmp_path / "export.yaml"))
+    assert len(exported[ATTR_ENTRIES]) == 1
+    assert exported[ATTR_ENTRIES][0][CONF_NAME] == DEFAULT_NAME
+    assert exported[ATTR_ENTRIES][0][ATTR_OPTIONS][CONF_LIGHTS] == TEST_LIGHTS
+
+    # Change the existing entry and add a new one
+    exported[ATTR_ENTRIES][0][ATTR_OPTIONS][CONF_LIGHTS] = ["light.other"]
+    exported[ATTR_ENTRIES].append(
+        {CONF_NAME: "other", ATTR_OPTIONS: {CONF_AREA_ID: "other_area"}}
+    )
+    save_json(str(tmp_path / "import.json"), exported)
+
+    # The updated entry is reloaded once by the import, not by its listener
+    with patch.object(
+        hass.config_entries,
+        "async_reload",
+        wraps=hass.config_entries.async_reload,
+    ) as reload:
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_IMPORT_CONFIG,
+            {ATTR_FILENAME: "import.json"},
+            blocking=True,
+        )
+        await hass.async_block_till_done()
+
+    assert reload.call_args_list == [call(entry.entry_id)]
+
+    entries = hass.config_entries.async_entries(DOMAIN)
+    assert len(entries) == 2
+    assert entry.options[CONF_LIGHTS] == ["light.other"]
+    assert entry.state == ConfigEntryState.LOADED
+
+    other = next(e for e in entries if e.unique_id == "other")
+    assert other.options[CONF_AREA_ID] == "other_area"
+    assert other.state == ConfigEntryState.LOADED
+    assert not hass.data[DOMAIN][DATA_SKIP_RELOAD]
+
+
+@pytest.mark.asyncio
+async def test_profile_records_hot_paths(hass, tmp_path):
+    """Test the profile service writes the timings of the hot paths."""
+
+    hass.config.config_dir = str(tmp_path)
+    hass.states.async_set(TEST_LIGHTS[0], STATE_OFF)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_NAME: DEFAULT_NAME},
+        options={
+            CONF_AREA_ID: DEFAULT_AREA_ID,
+            CONF_USE_AREA_LIGHTS: False,
+            CONF_LIGHTS: TEST_LIGHTS,
+            CONF_USE_AREA_PRESENCE_SENSORS: False,
+            CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+            CONF_CREATE_LIGHT_GROUP: False,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    with pytest.raises(vol.Invalid):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_PROFILE, {ATTR_DURATION: 0}, blocking=True
+        )
+
+    profile = hass.async_create_task(
+        hass.services.async_call(
+            DOMAIN,
+            SERVICE_PROFILE,
+            {
+                ATTR_DURATION: 1,
+                ATTR_FILENAME: "profile.json",
+                ATTR_CPROFILE: True,
+            },
+            blocking=True,
+        )
+    )
+    await asyncio.sleep(0)
+
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_ON)
+    await hass.async_block_till_done()
+    await profile
+
+    data = load_json(str(tmp_path / "profile.json"))
+    assert (
+        data["functions"]["LightControlSwitch._handle_state_changed"]["count"]
+        == 1
+    )
+    assert "LightControlSwitch._update_attributes" in data["functions"]
+    assert (tmp_path / "profile.prof").exists()
+
+
+@pytest.mark.asyncio
+async def test_remove_entry_removes_stored_data(hass, hass_storage):
+    """Test the data learned about an area is removed with its entry."""
+    key = f"{DOMAIN}.{DEFAULT_NAME}"
+    hass_storage[key] = {"version": 1, "key": key, "data": {}}
+
+    # The area is a neighbour of another one
+    area = (
+        f"{SWITCH_DOMAIN}."
+        f"{slugify(SWITCH_LIGHT_CONTROL_PREFIX_NAME)}_{slugify(DEFAULT_NAME)}"
+    )
+    transitions_key = f"{DOMAIN}.transitions"
+    hass_storage[transitions_key] = {
+        "version": 1,
+        "key": transitions_key,
+        "data": {
+            "counts": {
+                "switch.other": {area: 2, "switch.hallway": 1},
+                area: {"switch.other": 3},
+            }
+        },
+    }
+
+    hass.states.async_set(TEST_LIGHTS[0], STATE_OFF)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_NAME: DEFAULT_NAME},
+        options={
+            CONF_AREA_ID: DEFAULT_AREA_ID,
+            CONF_USE_AREA_LIGHTS: False,
+            CONF_LIGHTS: TEST_LIGHTS,
+            CONF_USE_AREA_PRESENCE_SENSORS: False,
+            CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+            CONF_CREATE_LIGHT_GROUP: False,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert hass.states.get(area) is not None
+
+    assert await hass.config_entries.async_remove(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert key not in hass_storage
+
+    # The transitions from and to the area are forgotten
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+    await hass.async_block_till_done()
+    assert hass_storage[transitions_key]["data"]["counts"] == {
+        "switch.other": {"switch.hallway": 1}
+    }
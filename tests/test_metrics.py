@@ -0,0 +1,106 @@
+"""Tests for the Prometheus metrics."""
+
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.components.http import KEY_HASS
+
+from homeassistant.components.switch import DOMAIN as SWITCH_DOMAIN
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.util import slugify
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.simple_area_presence_lighting.const import (
+    CONF_AREA_ID,
+    CONF_CREATE_LIGHT_GROUP,
+    CONF_LIGHTS,
+    CONF_NAME,
+    CONF_PRESENCE_SENSOR_ENTITIES,
+    CONF_USE_AREA_LIGHTS,
+    CONF_USE_AREA_PRESENCE_SENSORS,
+    DEFAULT_AREA_ID,
+    DEFAULT_NAME,
+    DOMAIN,
+    SWITCH_LIGHT_CONTROL_PREFIX_NAME,
+    TEST_LIGHTS,
+    TEST_PRESENCE_SENSOR_ENTITIES,
+)
+from custom_components.simple_area_presence_lighting.metrics import (
+    CONTENT_TYPE,
+    MetricsView,
+    _MetricsWriter,
+    render_metrics,
+)
+
+
+@pytest.mark.asyncio
+async def test_metrics_render_areas_and_indexes(hass):
+    """Test the metrics are rendered from the in-memory state."""
+    hass.states.async_set(TEST_LIGHTS[0], STATE_OFF)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_NAME: DEFAULT_NAME},
+        options={
+            CONF_AREA_ID: DEFAULT_AREA_ID,
+            CONF_USE_AREA_LIGHTS: False,
+            CONF_LIGHTS: TEST_LIGHTS,
+            CONF_USE_AREA_PRESENCE_SENSORS: False,
+            CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+            CONF_CREATE_LIGHT_GROUP: False,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_ON)
+    await hass.async_block_till_done()
+
+    area = (
+        f"{SWITCH_DOMAIN}."
+        f"{slugify(SWITCH_LIGHT_CONTROL_PREFIX_NAME)}_{slugify(DEFAULT_NAME)}"
+    )
+    lines = render_metrics(hass).splitlines()
+
+    assert f"# TYPE {DOMAIN}_presence gauge" in lines
+    assert f'{DOMAIN}_presence{{area="{area}"}} 1' in lines
+    assert f'{DOMAIN}_lights_on{{area="{area}"}} 0' in lines
+    assert f'{DOMAIN}_tracked_entities{{area="{area}"}} 4' in lines
+    assert f'{DOMAIN}_handler_seconds_count{{area="{area}"}} 1' in lines
+    assert (
+        f'{DOMAIN}_dispatch_seconds_bucket{{area="{area}",le="+Inf"}} 0'
+        in lines
+    )
+    assert f'{DOMAIN}_index_size{{index="controllers"}} 1' in lines
+
+
+def test_metrics_keep_full_precision():
+    """Test large counters and sums are not rounded."""
+    writer = _MetricsWriter()
+    writer.sample("commands_total", {}, 1000001)
+    writer.sample("command_seconds_sum", {}, 12.3456789)
+
+    assert writer.render().splitlines() == [
+        f"{DOMAIN}_commands_total 1000001",
+        f"{DOMAIN}_command_seconds_sum 12.3456789",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_metrics_view_returns_text_format(hass):
+    """Test the view serves the rendered metrics."""
+    entry = MockConfigEntry(domain=DOMAIN, data={CONF_NAME: DEFAULT_NAME})
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    request = MagicMock()
+    request.app = {KEY_HASS: hass}
+    response = await MetricsView().get(request)
+
+    assert response.status == 200
+    assert response.headers["Content-Type"] == CONTENT_TYPE
+    assert response.text == render_metrics(hass)
@@ -0,0 +1,65 @@
+"""Tests for the occupancy model."""
+
+from datetime import datetime
+
+import pytest
+
+from custom_components.simple_area_presence_lighting.const import (
+    OCCUPANCY_BINS,
+    OCCUPANCY_MAX_EXTENSION,
+    OCCUPANCY_MIN_SAMPLES,
+    RETRIGGER_WINDOW,
+)
+from custom_components.simple_area_presence_lighting.occupancy import (
+    OccupancyModel,
+)
+
+EVENING = datetime(2024, 1, 1, 20, 10)
+MORNING = datetime(2024, 1, 1, 7, 40)
+
+
+def test_occupancy_model_stretches_off_delay_after_retriggers():
+    """Test re-triggers stretch the off delay of their time of day."""
+    model = OccupancyModel()
+    now = 0.0
+
+    assert model.extension(EVENING) == 0
+
+    # Presence always returns shortly after it cleared in the evening
+    for _ in range(OCCUPANCY_MIN_SAMPLES + 1):
+        model.record_cleared(now, EVENING)
+        now += 30
+        model.record_detected(now, EVENING)
+        now += 600
+
+    assert model.retrigger_probability(EVENING) > 0.9
+    assert model.mean_gap(EVENING) == pytest.approx(30)
+    assert 27 < model.extension(EVENING) <= 30
+    assert model.extension(MORNING) == 0
+
+    # Long intervals stretch the off delay by the maximum at most
+    model.record_cleared(now, EVENING)
+    model.record_detected(now + RETRIGGER_WINDOW, EVENING)
+    assert model.extension(EVENING) <= OCCUPANCY_MAX_EXTENSION
+
+    # Presence returning after the window is no re-trigger
+    model.record_cleared(now, MORNING)
+    model.record_detected(now + RETRIGGER_WINDOW + 1, MORNING)
+    assert model.retrigger_probability(MORNING) == 0
+
+
+def test_occupancy_model_restores_stored_data():
+    """Test the histograms are restored and invalid data is ignored."""
+    model = OccupancyModel()
+    model.record_cleared(0, EVENING)
+    model.record_detected(10, EVENING)
+
+    restored = OccupancyModel(model.as_dict())
+    assert restored.as_dict() == model.as_dict()
+
+    # Histograms of older versions are dropped
+    restored = OccupancyModel({"presence": [1.0] * OCCUPANCY_BINS})
+    assert "presence" not in restored.as_dict()
+
+    restored = OccupancyModel({"clears": [1.0]})
+    assert restored.as_dict()["clears"] == [0.0] * OCCUPANCY_BINS
@@ -0,0 +1,52 @@
+"""Tests for the scheduler."""
+
+from datetime import timedelta
+
+import pytest
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    async_fire_time_changed,
+)
+
+from custom_components.simple_area_presence_lighting.scheduler import (
+    StaggeredScheduler,
+    stagger_offset,
+)
+
+
+def test_stagger_offset():
+    """Test offsets are deterministic and spread within the window."""
+    offsets = [stagger_offset(f"area_{index}", 30) for index in range(100)]
+
+    assert offsets == [
+        stagger_offset(f"area_{index}", 30) for index in range(100)
+    ]
+    assert all(0 <= offset < 30 for offset in offsets)
+    assert len(set(offsets)) > 50
+    assert stagger_offset("area_0", 0) == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_spreads_and_replaces_jobs(hass):
+    """Test jobs run at their offsets and replaced jobs run once."""
+    scheduler = StaggeredScheduler(hass)
+    runs = []
+
+    for index in range(10):
+        key = f"area_{index}"
+        scheduler.async_schedule(key, 30, lambda key=key: runs.append(key))
+
+    # Reschedule a job, it must only run once
+    scheduler.async_schedule("area_0", 30, lambda: runs.append("area_0"))
+    scheduler.async_cancel("area_1")
+    assert len(scheduler) == 9
+
+    now = dt_util.utcnow()
+    for seconds in range(32):
+        async_fire_time_changed(hass, now + timedelta(seconds=seconds))
+        await hass.async_block_till_done()
+
+    assert sorted(runs) == sorted(
+        f"area_{index}" for index in range(10) if index != 1
+    )
+    assert len(scheduler) == 0
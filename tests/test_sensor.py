@@ -0,0 +1,114 @@
+"""Tests for the integration."""
+
+import pytest
+
+from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
+from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
+from homeassistant.components.switch import DOMAIN as SWITCH_DOMAIN
+from homeassistant.const import SERVICE_TURN_ON, STATE_OFF, STATE_ON
+from homeassistant.core import Context
+from homeassistant.helpers.entity_component import async_update_entity
+from homeassistant.util import slugify
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_mock_service,
+)
+
+from custom_components.simple_area_presence_lighting.const import (
+    CONF_AREA_ID,
+    CONF_CREATE_LIGHT_GROUP,
+    CONF_LIGHTS,
+    CONF_NAME,
+    CONF_PRESENCE_SENSOR_ENTITIES,
+    CONF_USE_AREA_LIGHTS,
+    CONF_USE_AREA_PRESENCE_SENSORS,
+    DEFAULT_AREA_ID,
+    DEFAULT_NAME,
+    DOMAIN,
+    SENSOR_DISPATCH_LATENCY_PREFIX_NAME,
+    SENSOR_LIGHT_LATENCY_PREFIX_NAME,
+    SWITCH_AREA_DARK_PREFIX_NAME,
+    TEST_LIGHTS,
+    TEST_PRESENCE_SENSOR_ENTITIES,
+)
+
+
+@pytest.mark.asyncio
+async def test_latency_sensors_report_percentiles(hass):
+    """Test the latency from a sensor edge to the command and the light."""
+    hass.states.async_set(TEST_LIGHTS[0], STATE_OFF)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_NAME: DEFAULT_NAME},
+        options={
+            CONF_AREA_ID: DEFAULT_AREA_ID,
+            CONF_USE_AREA_LIGHTS: False,
+            CONF_LIGHTS: TEST_LIGHTS,
+            CONF_USE_AREA_PRESENCE_SENSORS: False,
+            CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+            CONF_CREATE_LIGHT_GROUP: False,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    hass.states.async_set(
+        f"{SWITCH_DOMAIN}."
+        f"{slugify(SWITCH_AREA_DARK_PREFIX_NAME)}_{slugify(DEFAULT_NAME)}",
+        STATE_ON,
+    )
+    await hass.async_block_till_done()
+
+    calls = async_mock_service(hass, LIGHT_DOMAIN, SERVICE_TURN_ON)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_ON)
+    await hass.async_block_till_done()
+    assert len(calls) == 1
+
+    hass.states.async_set(
+        TEST_LIGHTS[0],
+        STATE_ON,
+        context=Context(parent_id=calls[0].context.id),
+    )
+    await hass.async_block_till_done()
+
+    for prefix_name in (
+        SENSOR_DISPATCH_LATENCY_PREFIX_NAME,
+        SENSOR_LIGHT_LATENCY_PREFIX_NAME,
+    ):
+        entity_id = (
+            f"{SENSOR_DOMAIN}."
+            f"{slugify(prefix_name)}_{slugify(DEFAULT_NAME)}"
+        )
+        await async_update_entity(hass, entity_id)
+
+        state = hass.states.get(entity_id)
+        assert state.attributes["count"] == 1
+        assert 0 <= float(state.state) < 1
+        assert state.attributes["p50"] <= state.attributes["p99"]
+
+
+@pytest.mark.asyncio
+async def test_latency_sensors_need_a_controlled_area(hass):
+    """Test no latency sensors are created for an area without lights."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_NAME: DEFAULT_NAME},
+        options={
+            CONF_AREA_ID: DEFAULT_AREA_ID,
+            CONF_USE_AREA_LIGHTS: False,
+            CONF_LIGHTS: [],
+            CONF_USE_AREA_PRESENCE_SENSORS: False,
+            CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+            CONF_CREATE_LIGHT_GROUP: False,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert hass.states.async_entity_ids(SWITCH_DOMAIN) == []
+    assert hass.states.async_entity_ids(SENSOR_DOMAIN) == []
@@ -0,0 +1,66 @@
+"""Tests for the streaming statistics."""
+
+import random
+
+from custom_components.simple_area_presence_lighting.stats import (
+    LatencyHistogram,
+    P2Quantile,
+)
+
+
+def test_p2_quantile_tracks_exact_quantile():
+    """Test the estimate is close to the exact quantile."""
+    generator = random.Random(42)
+    samples = [generator.expovariate(1 / 60) for _ in range(2000)]
+
+    estimator = P2Quantile(0.9)
+    assert estimator.value() is None
+
+    for sample in samples:
+        estimator.add(sample)
+
+    exact = sorted(samples)[int(0.9 * len(samples))]
+    assert estimator.count == len(samples)
+    assert abs(estimator.value() - exact) / exact < 0.05
+
+
+def test_p2_quantile_restores_stored_markers():
+    """Test the markers are restored only for the same quantile."""
+    estimator = P2Quantile(0.9)
+    for sample in range(1, 20):
+        estimator.add(sample)
+
+    data = estimator.as_dict()
+
+    restored = P2Quantile(0.9, data)
+    assert restored.count == estimator.count
+    assert restored.value() == estimator.value()
+
+    restored.add(100)
+    estimator.add(100)
+    assert restored.value() == estimator.value()
+
+    other = P2Quantile(0.5, data)
+    assert other.count == 0
+    assert other.value() is None
+
+
+def test_latency_histogram_quantiles():
+    """Test the quantiles are interpolated within their bucket."""
+    histogram = LatencyHistogram()
+    assert histogram.quantile(0.5) is None
+
+    for _ in range(90):
+        histogram.add(0.2)
+    for _ in range(10):
+        histogram.add(4.0)
+
+    assert 0.1 <= histogram.quantile(0.5) <= 0.25
+    assert 2.5 <= histogram.quantile(0.95) <= 4.0
+    assert histogram.quantile(1.0) == 4.0
+
+    data = histogram.as_dict()
+    assert data["count"] == 100
+    assert data["max"] == 4.0
+    assert data["buckets"]["le_0.25"] == 90
+    assert data["buckets"]["le_5"] == 10
@@ -0,0 +1,75 @@
+"""Tests for the sun position."""
+
+from datetime import timedelta
+
+import pytest
+
+from astral.sun import elevation as solar_elevation
+from homeassistant.helpers.sun import get_astral_location
+from homeassistant.util import dt as dt_util
+
+from pytest_homeassistant_custom_component.common import (
+    async_fire_time_changed,
+)
+
+from custom_components.simple_area_presence_lighting.sun import (
+    SunDarkness,
+    SunElevationTable,
+)
+
+
+@pytest.mark.asyncio
+async def test_sun_elevation_table_matches_astral(hass):
+    """Test the interpolated table is close to the exact sun elevation."""
+    observer = get_astral_location(hass)[0].observer
+    start = dt_util.as_utc(dt_util.start_of_local_day())
+    table = SunElevationTable(observer, start, start + timedelta(days=1))
+
+    for minutes in range(0, 24 * 60, 37):
+        when = start + timedelta(minutes=minutes)
+        assert (
+            abs(table.elevation(when) - solar_elevation(observer, when)) < 0.2
+        )
+
+    # The sun crosses the horizon at the crossing
+    crossing = table.next_crossing(0.0, timedelta(), start)
+    assert crossing is not None
+    assert abs(solar_elevation(observer, crossing)) < 0.2
+
+    # A positive offset crosses earlier
+    earlier = table.next_crossing(0.0, timedelta(minutes=30), start)
+    assert abs((crossing - earlier) - timedelta(minutes=30)) < timedelta(
+        seconds=2
+    )
+
+
+@pytest.mark.asyncio
+async def test_sun_darkness_applies_due_changes_together(hass, freezer):
+    """Test areas with the same threshold change in the same update."""
+    sun = SunDarkness(hass)
+    changes = []
+
+    now = dt_util.utcnow()
+    for key, threshold in (("one", 0.0), ("two", 0.0), ("three", 10.0)):
+        sun.async_add_listener(
+            key,
+            threshold,
+            timedelta(),
+            lambda dark, key=key: changes.append((key, dark)),
+        )
+    assert [key for key, _ in changes] == ["one", "two", "three"]
+    dark = changes[0][1]
+    changes.clear()
+
+    # The timer is re-armed at the next change of any area
+    crossing = sun._table.next_crossing(0.0, timedelta(), now)
+    freezer.move_to(crossing)
+    for _ in range(2):
+        async_fire_time_changed(hass, crossing)
+        await hass.async_block_till_done()
+
+    # Both areas following the horizon change in the same update
+    changes = [change for change in changes if change[0] != "three"]
+    assert changes == [("one", not dark), ("two", not dark)]
+
+    sun.async_shutdown()
@@ -1,5 +1,8 @@
 """Tests for the integration."""
 
+from datetime import timedelta
+from unittest.mock import patch
+
 import pytest
 
 from homeassistant.components.binary_sensor import (
@@ -7,44 +10,82 @@ from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
 )
 
+from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
 from homeassistant.components.switch import DOMAIN as SWITCH_DOMAIN
 from homeassistant.const import (
-    # ATTR_ENTITY_ID,
+    ATTR_ENTITY_ID,
     ATTR_FRIENDLY_NAME,
-    # SERVICE_TURN_OFF,
-    # SERVICE_TURN_ON,
+    EVENT_CALL_SERVICE,
+    SERVICE_TURN_OFF,
+    SERVICE_TURN_ON,
     # EVENT_STATE_CHANGED,
     STATE_OFF,
     STATE_ON,
+    STATE_UNAVAILABLE,
+)
+from homeassistant.core import Context
+from homeassistant.helpers import (
+    area_registry,
+    entity_registry,
+    issue_registry,
 )
-from homeassistant.helpers import area_registry, entity_registry
-from homeassistant.util import slugify
+from homeassistant.util import dt as dt_util, slugify
 
-from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+    async_mock_service,
+)
 
 from custom_components.simple_area_presence_lighting.const import (
     ATTR_LIGHTS,
+    ATTR_MANUAL_OVERRIDE_UNTIL,
+    ATTR_PRESENCE,
     ATTR_PRESENCE_SENSOR_ENTITIES,
+    ATTR_QUARANTINED_SENSORS,
+    CONF_ADAPTIVE_OFF_DELAY,
     CONF_AREA_ID,
+    CONF_CHATTER_THRESHOLD,
+    CONF_CHILD_AREAS,
     CONF_CREATE_LIGHT_GROUP,
+    CONF_DARK_MODE,
+    CONF_ILLUMINANCE_SENSOR,
+    CONF_LIGHT_GROUP_ENTITY,
     CONF_LIGHTS,
+    CONF_MAX_OFF_DELAY,
+    CONF_MIN_DWELL,
     CONF_NAME,
+    CONF_NUMERIC_PRESENCE_ENTITIES,
+    CONF_OCCUPANCY_MODEL,
+    CONF_OFF_DELAY,
     CONF_PRESENCE_SENSOR_ENTITIES,
     CONF_SENSOR_DEVICE_CLASSES,
     CONF_USE_AREA_LIGHTS,
     CONF_USE_AREA_PRESENCE_SENSORS,
+    DARK_MODE_ILLUMINANCE,
+    DATA_CONTROLLERS,
     DEFAULT_AREA_ID,
+    DEFAULT_MANUAL_OVERRIDE_DURATION,
     DEFAULT_NAME,
     DEFAULT_SENSOR_DEVICE_CLASSES,
+    DEFAULT_STAGGER_WINDOW,
     DEFAULT_USE_AREA_LIGHTS,
     DEFAULT_USE_AREA_PRESENCE_SENSORS,
     DOMAIN,
+    ISSUE_SENSOR_QUARANTINED,
+    LIGHT_GROUP_PREFIX_NAME,
+    RECONCILE_INTERVAL,
+    RECONNECT_STAGGER_WINDOW,
     SWITCH_AREA_DARK_PREFIX_NAME,
     SWITCH_LIGHT_CONTROL_PREFIX_NAME,
     SWITCH_OVERRIDE_PRESENCE_PREFIX_NAME,
     TEST_LIGHTS,
     TEST_PRESENCE_SENSOR_ENTITIES,
 )
+from custom_components.simple_area_presence_lighting.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
 
 
 @pytest.mark.asyncio
@@ -434,3 +475,1007 @@ async def test_state_machine_when_light_turned_on_and_dark(hass):
     # await hass.async_block_till_done()
     # Check that light is turned on
     # assert hass.states.is_state(TEST_LIGHTS[0], STATE_ON)
+
+
+@pytest.mark.asyncio
+async def test_chattering_presence_sensor_is_quarantined(hass):
+    """Test a chattering presence sensor is quarantined and reported."""
+
+    # Set test states
+    hass.states.async_set(TEST_LIGHTS[0], STATE_OFF)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+
+    # Create config entry
+    config = {
+        CONF_NAME: DEFAULT_NAME,
+    }
+
+    options = {
+        CONF_AREA_ID: DEFAULT_AREA_ID,
+        CONF_USE_AREA_LIGHTS: DEFAULT_USE_AREA_LIGHTS,
+        CONF_LIGHTS: TEST_LIGHTS,
+        CONF_USE_AREA_PRESENCE_SENSORS: DEFAULT_USE_AREA_PRESENCE_SENSORS,
+        CONF_SENSOR_DEVICE_CLASSES: DEFAULT_SENSOR_DEVICE_CLASSES,
+        CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+        CONF_CREATE_LIGHT_GROUP: False,
+        CONF_CHATTER_THRESHOLD: 5,
+    }
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data=config,
+        options=options,
+    )
+
+    # Setup config entry
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    # Simulate a chattering sensor
+    for _ in range(5):
+        hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_ON)
+        await hass.async_block_till_done()
+        hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+        await hass.async_block_till_done()
+
+    issue_reg = issue_registry.async_get(hass)
+    assert any(
+        issue_id.startswith(ISSUE_SENSOR_QUARANTINED)
+        and issue_id.endswith(TEST_PRESENCE_SENSOR_ENTITIES[0])
+        for _, issue_id in issue_reg.issues
+    )
+
+    # Quarantined sensors no longer detect presence
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_ON)
+    await hass.async_block_till_done()
+
+    state = hass.states.get(
+        f"{SWITCH_DOMAIN}."
+        f"{slugify(SWITCH_LIGHT_CONTROL_PREFIX_NAME)}_"
+        f"{slugify(DEFAULT_NAME)}"
+    )
+    assert state.attributes[ATTR_QUARANTINED_SENSORS] == (
+        TEST_PRESENCE_SENSOR_ENTITIES
+    )
+    assert not state.attributes[ATTR_PRESENCE]
+
+
+@pytest.mark.asyncio
+async def test_presence_sensor_is_debounced(hass, freezer):
+    """Test an edge within the minimum dwell time is accepted later."""
+    hass.states.async_set(TEST_LIGHTS[0], STATE_OFF)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_NAME: DEFAULT_NAME},
+        options={
+            CONF_AREA_ID: DEFAULT_AREA_ID,
+            CONF_USE_AREA_LIGHTS: False,
+            CONF_LIGHTS: TEST_LIGHTS,
+            CONF_USE_AREA_PRESENCE_SENSORS: False,
+            CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+            CONF_CREATE_LIGHT_GROUP: False,
+            CONF_MIN_DWELL: 5,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    hass.states.async_set(
+        f"{SWITCH_DOMAIN}."
+        f"{slugify(SWITCH_AREA_DARK_PREFIX_NAME)}_"
+        f"{slugify(DEFAULT_NAME)}",
+        STATE_ON,
+    )
+    await hass.async_block_till_done()
+
+    calls = async_capture_events(hass, EVENT_CALL_SERVICE)
+    (controller,) = hass.data[DOMAIN][DATA_CONTROLLERS].values()
+
+    # The edge arrives within the dwell time of the seeded state
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_ON)
+    await hass.async_block_till_done()
+    assert not controller.extra_state_attributes[ATTR_PRESENCE]
+    assert not [call for call in calls if call.data["domain"] == LIGHT_DOMAIN]
+
+    freezer.tick(timedelta(seconds=6))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert controller.extra_state_attributes[ATTR_PRESENCE]
+
+    light_calls = [
+        call.data["service"]
+        for call in calls
+        if call.data["domain"] == LIGHT_DOMAIN
+    ]
+    assert light_calls == [SERVICE_TURN_ON]
+
+    # The statistics of the sensor are part of the diagnostics
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    statistics = diagnostics["sensors"][controller.entity_id][
+        TEST_PRESENCE_SENSOR_ENTITIES[0]
+    ]
+    assert statistics["toggles"] == 1
+    assert statistics["state"] is True
+    assert not statistics["quarantined"]
+
+
+@pytest.mark.asyncio
+async def test_reconcile_lights_on_setup_and_reconnect(hass):
+    """Test lights are reconciled on setup and when a sensor reconnects."""
+
+    # Set test states, the light is on without presence
+    hass.states.async_set(TEST_LIGHTS[0], STATE_ON)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+
+    calls = async_capture_events(hass, EVENT_CALL_SERVICE)
+
+    # Create config entry
+    config = {
+        CONF_NAME: DEFAULT_NAME,
+    }
+
+    options = {
+        CONF_AREA_ID: DEFAULT_AREA_ID,
+        CONF_USE_AREA_LIGHTS: DEFAULT_USE_AREA_LIGHTS,
+        CONF_LIGHTS: TEST_LIGHTS,
+        CONF_USE_AREA_PRESENCE_SENSORS: DEFAULT_USE_AREA_PRESENCE_SENSORS,
+        CONF_SENSOR_DEVICE_CLASSES: DEFAULT_SENSOR_DEVICE_CLASSES,
+        CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+        CONF_CREATE_LIGHT_GROUP: False,
+    }
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data=config,
+        options=options,
+    )
+
+    # Setup config entry
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    # The initial reconciliation is staggered
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=DEFAULT_STAGGER_WINDOW)
+    )
+    await hass.async_block_till_done()
+
+    light_calls = [
+        call for call in calls if call.data["domain"] == LIGHT_DOMAIN
+    ]
+    assert len(light_calls) == 1
+    assert light_calls[0].data["service"] == SERVICE_TURN_OFF
+    assert light_calls[0].data["service_data"][ATTR_ENTITY_ID] == TEST_LIGHTS
+
+    # Simulate the light turned off and the area turned dark
+    hass.states.async_set(TEST_LIGHTS[0], STATE_OFF)
+    hass.states.async_set(
+        f"{SWITCH_DOMAIN}."
+        f"{slugify(SWITCH_AREA_DARK_PREFIX_NAME)}_"
+        f"{slugify(DEFAULT_NAME)}",
+        STATE_ON,
+    )
+    await hass.async_block_till_done()
+    calls.clear()
+
+    # Simulate the sensor reconnecting with presence, there is no edge
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_UNAVAILABLE)
+    await hass.async_block_till_done()
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_ON)
+    await hass.async_block_till_done()
+
+    # The reconciliation after a reconnect is staggered in a short window
+    assert not [call for call in calls if call.data["domain"] == LIGHT_DOMAIN]
+    async_fire_time_changed(
+        hass,
+        dt_util.utcnow() + timedelta(seconds=RECONNECT_STAGGER_WINDOW),
+    )
+    await hass.async_block_till_done()
+
+    light_calls = [
+        call for call in calls if call.data["domain"] == LIGHT_DOMAIN
+    ]
+    assert len(light_calls) == 1
+    assert light_calls[0].data["service"] == SERVICE_TURN_ON
+
+
+@pytest.mark.asyncio
+async def test_manual_override_pauses_automatic_control(hass):
+    """Test lights switched manually pause the automatic control."""
+
+    # Set test states, presence is detected and the light is on
+    hass.states.async_set(TEST_LIGHTS[0], STATE_ON)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_ON)
+
+    # Create config entry
+    config = {
+        CONF_NAME: DEFAULT_NAME,
+    }
+
+    options = {
+        CONF_AREA_ID: DEFAULT_AREA_ID,
+        CONF_USE_AREA_LIGHTS: DEFAULT_USE_AREA_LIGHTS,
+        CONF_LIGHTS: TEST_LIGHTS,
+        CONF_USE_AREA_PRESENCE_SENSORS: DEFAULT_USE_AREA_PRESENCE_SENSORS,
+        CONF_SENSOR_DEVICE_CLASSES: DEFAULT_SENSOR_DEVICE_CLASSES,
+        CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+        CONF_CREATE_LIGHT_GROUP: False,
+    }
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data=config,
+        options=options,
+    )
+
+    # Setup config entry
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    calls = async_capture_events(hass, EVENT_CALL_SERVICE)
+
+    # Simulate someone turning the light off by hand
+    hass.states.async_set(TEST_LIGHTS[0], STATE_OFF, context=Context())
+    await hass.async_block_till_done()
+
+    light_control_entity_id = (
+        f"{SWITCH_DOMAIN}."
+        f"{slugify(SWITCH_LIGHT_CONTROL_PREFIX_NAME)}_"
+        f"{slugify(DEFAULT_NAME)}"
+    )
+    state = hass.states.get(light_control_entity_id)
+    assert state.attributes[ATTR_MANUAL_OVERRIDE_UNTIL] is not None
+
+    # Simulate the area turning dark, the lights must not be turned on
+    hass.states.async_set(
+        f"{SWITCH_DOMAIN}."
+        f"{slugify(SWITCH_AREA_DARK_PREFIX_NAME)}_"
+        f"{slugify(DEFAULT_NAME)}",
+        STATE_ON,
+    )
+    await hass.async_block_till_done()
+
+    assert not [call for call in calls if call.data["domain"] == LIGHT_DOMAIN]
+
+    # Presence clears and ends the manual override
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+    await hass.async_block_till_done()
+
+    state = hass.states.get(light_control_entity_id)
+    assert state.attributes[ATTR_MANUAL_OVERRIDE_UNTIL] is None
+
+
+@pytest.mark.asyncio
+async def test_manual_override_without_presence_survives_reconcile(
+    hass, freezer
+):
+    """Test a light switched on by hand in an empty room is left on."""
+
+    # Set test states, no presence is detected and the light is off
+    hass.states.async_set(TEST_LIGHTS[0], STATE_OFF)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_NAME: DEFAULT_NAME},
+        options={
+            CONF_AREA_ID: DEFAULT_AREA_ID,
+            CONF_USE_AREA_LIGHTS: False,
+            CONF_LIGHTS: TEST_LIGHTS,
+            CONF_USE_AREA_PRESENCE_SENSORS: False,
+            CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+            CONF_CREATE_LIGHT_GROUP: False,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    calls = async_capture_events(hass, EVENT_CALL_SERVICE)
+
+    # Simulate someone turning the light on by hand
+    hass.states.async_set(TEST_LIGHTS[0], STATE_ON, context=Context())
+    await hass.async_block_till_done()
+
+    # A reconcile sweep leaves the light on during the pause
+    for seconds in (RECONCILE_INTERVAL, DEFAULT_STAGGER_WINDOW):
+        freezer.tick(timedelta(seconds=seconds))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+    assert not [call for call in calls if call.data["domain"] == LIGHT_DOMAIN]
+
+    # Once the pause is over, the next sweep turns the light off
+    for seconds in (
+        DEFAULT_MANUAL_OVERRIDE_DURATION * 60,
+        DEFAULT_STAGGER_WINDOW,
+    ):
+        freezer.tick(timedelta(seconds=seconds))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+    light_calls = [
+        call for call in calls if call.data["domain"] == LIGHT_DOMAIN
+    ]
+    assert len(light_calls) == 1
+    assert light_calls[0].data["service"] == SERVICE_TURN_OFF
+
+
+@pytest.mark.asyncio
+async def test_off_delay_keeps_lights_on_after_presence_cleared(hass):
+    """Test the lights are turned off after the off delay."""
+
+    # Set test states, presence is detected and the light is on
+    hass.states.async_set(TEST_LIGHTS[0], STATE_ON)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_ON)
+
+    # Create config entry
+    config = {
+        CONF_NAME: DEFAULT_NAME,
+    }
+
+    options = {
+        CONF_AREA_ID: DEFAULT_AREA_ID,
+        CONF_USE_AREA_LIGHTS: DEFAULT_USE_AREA_LIGHTS,
+        CONF_LIGHTS: TEST_LIGHTS,
+        CONF_USE_AREA_PRESENCE_SENSORS: DEFAULT_USE_AREA_PRESENCE_SENSORS,
+        CONF_SENSOR_DEVICE_CLASSES: DEFAULT_SENSOR_DEVICE_CLASSES,
+        CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+        CONF_CREATE_LIGHT_GROUP: False,
+        CONF_OFF_DELAY: 60,
+        CONF_OCCUPANCY_MODEL: True,
+    }
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data=config,
+        options=options,
+    )
+
+    # Setup config entry
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    calls = async_capture_events(hass, EVENT_CALL_SERVICE)
+
+    # Presence clears, the lights stay on during the off delay
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+    await hass.async_block_till_done()
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=30))
+    await hass.async_block_till_done()
+    assert not [call for call in calls if call.data["domain"] == LIGHT_DOMAIN]
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=61))
+    await hass.async_block_till_done()
+
+    light_calls = [
+        call for call in calls if call.data["domain"] == LIGHT_DOMAIN
+    ]
+    assert len(light_calls) == 1
+    assert light_calls[0].data["service"] == SERVICE_TURN_OFF
+
+
+@pytest.mark.asyncio
+async def test_adaptive_off_delay_learns_retrigger_gaps(hass, freezer):
+    """Test the off delay follows the gaps until presence returns."""
+    hass.states.async_set(TEST_LIGHTS[0], STATE_ON)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_ON)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_NAME: DEFAULT_NAME},
+        options={
+            CONF_AREA_ID: DEFAULT_AREA_ID,
+            CONF_USE_AREA_LIGHTS: False,
+            CONF_LIGHTS: TEST_LIGHTS,
+            CONF_USE_AREA_PRESENCE_SENSORS: False,
+            CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+            CONF_CREATE_LIGHT_GROUP: False,
+            CONF_OFF_DELAY: 10,
+            CONF_MAX_OFF_DELAY: 600,
+            CONF_ADAPTIVE_OFF_DELAY: True,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    (controller,) = hass.data[DOMAIN][DATA_CONTROLLERS].values()
+    assert controller._get_off_delay() == 10
+
+    # People keep leaving the area for about a minute
+    for gap in (50, 55, 60, 65, 70, 60):
+        freezer.tick(timedelta(seconds=120))
+        hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+        await hass.async_block_till_done()
+
+        freezer.tick(timedelta(seconds=gap))
+        hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_ON)
+        await hass.async_block_till_done()
+
+    assert 50 <= controller._get_off_delay() <= 70
+
+    # Returns after a long absence are not re-triggers
+    for gap in (1200, 1500):
+        freezer.tick(timedelta(seconds=120))
+        hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+        await hass.async_block_till_done()
+
+        freezer.tick(timedelta(seconds=gap))
+        hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_ON)
+        await hass.async_block_till_done()
+
+    assert 50 <= controller._get_off_delay() <= 70
+
+    # The learned delay keeps the lights on during the usual gap
+    calls = async_capture_events(hass, EVENT_CALL_SERVICE)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+    await hass.async_block_till_done()
+
+    freezer.tick(timedelta(seconds=30))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert not [call for call in calls if call.data["domain"] == LIGHT_DOMAIN]
+
+    freezer.tick(timedelta(seconds=60))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert [
+        call.data["service"]
+        for call in calls
+        if call.data["domain"] == LIGHT_DOMAIN
+    ] == [SERVICE_TURN_OFF]
+
+
+@pytest.mark.asyncio
+async def test_shared_light_stays_on_while_another_area_wants_it(hass):
+    """Test areas sharing a light do not turn it off for each other."""
+    shared_light = TEST_LIGHTS[0]
+    sensors = {
+        "kitchen": "binary_sensor.kitchen",
+        "dining": "binary_sensor.dining",
+    }
+
+    hass.states.async_set(shared_light, STATE_ON)
+    for name, sensor in sensors.items():
+        hass.states.async_set(sensor, STATE_ON)
+
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={CONF_NAME: name},
+            options={
+                CONF_AREA_ID: DEFAULT_AREA_ID,
+                CONF_USE_AREA_LIGHTS: False,
+                CONF_LIGHTS: [shared_light],
+                CONF_USE_AREA_PRESENCE_SENSORS: False,
+                CONF_PRESENCE_SENSOR_ENTITIES: [sensor],
+                CONF_CREATE_LIGHT_GROUP: False,
+            },
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        # Both areas are dark
+        hass.states.async_set(
+            f"{SWITCH_DOMAIN}."
+            f"{slugify(SWITCH_AREA_DARK_PREFIX_NAME)}_{slugify(name)}",
+            STATE_ON,
+        )
+    await hass.async_block_till_done()
+
+    calls = async_capture_events(hass, EVENT_CALL_SERVICE)
+
+    # Presence clears in one area, the other one still wants the light
+    hass.states.async_set(sensors["dining"], STATE_OFF)
+    await hass.async_block_till_done()
+    assert not [call for call in calls if call.data["domain"] == LIGHT_DOMAIN]
+
+    # Presence clears in both areas
+    hass.states.async_set(sensors["kitchen"], STATE_OFF)
+    await hass.async_block_till_done()
+
+    light_calls = [
+        call for call in calls if call.data["domain"] == LIGHT_DOMAIN
+    ]
+    assert len(light_calls) == 1
+    assert light_calls[0].data["service"] == SERVICE_TURN_OFF
+    assert light_calls[0].data["service_data"][ATTR_ENTITY_ID] == [
+        shared_light
+    ]
+
+
+@pytest.mark.asyncio
+async def test_shared_light_does_not_keep_other_lights_off(hass):
+    """Test a light shared with another area does not block own lights."""
+    lights = {
+        "kitchen": ["light.shared", "light.kitchen"],
+        "dining": ["light.shared", "light.dining"],
+    }
+    sensors = {
+        "kitchen": "binary_sensor.kitchen",
+        "dining": "binary_sensor.dining",
+    }
+
+    for name, sensor in sensors.items():
+        for light in lights[name]:
+            hass.states.async_set(light, STATE_OFF)
+        hass.states.async_set(sensor, STATE_OFF)
+
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={CONF_NAME: name},
+            options={
+                CONF_AREA_ID: DEFAULT_AREA_ID,
+                CONF_USE_AREA_LIGHTS: False,
+                CONF_LIGHTS: lights[name],
+                CONF_USE_AREA_PRESENCE_SENSORS: False,
+                CONF_PRESENCE_SENSOR_ENTITIES: [sensor],
+                CONF_CREATE_LIGHT_GROUP: False,
+            },
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        # Both areas are dark
+        hass.states.async_set(
+            f"{SWITCH_DOMAIN}."
+            f"{slugify(SWITCH_AREA_DARK_PREFIX_NAME)}_{slugify(name)}",
+            STATE_ON,
+        )
+    await hass.async_block_till_done()
+
+    calls = async_capture_events(hass, EVENT_CALL_SERVICE)
+
+    # Presence in one area turns on its lights, including the shared one
+    hass.states.async_set(sensors["dining"], STATE_ON)
+    await hass.async_block_till_done()
+
+    light_calls = [
+        call for call in calls if call.data["domain"] == LIGHT_DOMAIN
+    ]
+    assert len(light_calls) == 1
+    assert light_calls[0].data["service"] == SERVICE_TURN_ON
+    assert (
+        light_calls[0].data["service_data"][ATTR_ENTITY_ID] == lights["dining"]
+    )
+    for light in lights["dining"]:
+        hass.states.async_set(light, STATE_ON)
+    await hass.async_block_till_done()
+    calls.clear()
+
+    # Presence in the other area turns on its own light
+    hass.states.async_set(sensors["kitchen"], STATE_ON)
+    await hass.async_block_till_done()
+
+    light_calls = [
+        call for call in calls if call.data["domain"] == LIGHT_DOMAIN
+    ]
+    assert len(light_calls) == 1
+    assert light_calls[0].data["service"] == SERVICE_TURN_ON
+    assert light_calls[0].data["service_data"][ATTR_ENTITY_ID] == [
+        "light.kitchen"
+    ]
+
+    # Reconciling turns the own light on as well while it is off
+    kitchen = next(
+        controller
+        for controller in hass.data[DOMAIN][DATA_CONTROLLERS].values()
+        if controller.lights == lights["kitchen"]
+    )
+    assert kitchen._reconcile_service() == SERVICE_TURN_ON
+
+    hass.states.async_set("light.kitchen", STATE_ON)
+    await hass.async_block_till_done()
+    assert kitchen._reconcile_service() is None
+
+
+@pytest.mark.parametrize(
+    ("group_options", "group"),
+    [
+        (
+            {
+                CONF_LIGHT_GROUP_ENTITY: "light.group",
+                CONF_CREATE_LIGHT_GROUP: False,
+            },
+            "light.group",
+        ),
+        (
+            {CONF_CREATE_LIGHT_GROUP: True},
+            f"{LIGHT_DOMAIN}."
+            f"{slugify(LIGHT_GROUP_PREFIX_NAME)}_{slugify(DEFAULT_NAME)}",
+        ),
+    ],
+)
+@pytest.mark.asyncio
+async def test_lights_are_switched_through_their_group(
+    hass, group_options, group
+):
+    """Test the light group is targeted instead of its members."""
+    lights = ["light.one", "light.two"]
+    for light in lights:
+        hass.states.async_set(light, STATE_OFF)
+    hass.states.async_set("light.group", STATE_OFF)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_NAME: DEFAULT_NAME},
+        options={
+            CONF_AREA_ID: DEFAULT_AREA_ID,
+            CONF_USE_AREA_LIGHTS: False,
+            CONF_LIGHTS: lights,
+            CONF_USE_AREA_PRESENCE_SENSORS: False,
+            CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+            **group_options,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert hass.states.get(group).state == STATE_OFF
+
+    hass.states.async_set(
+        f"{SWITCH_DOMAIN}."
+        f"{slugify(SWITCH_AREA_DARK_PREFIX_NAME)}_"
+        f"{slugify(DEFAULT_NAME)}",
+        STATE_ON,
+    )
+    await hass.async_block_till_done()
+
+    calls = async_mock_service(hass, LIGHT_DOMAIN, SERVICE_TURN_ON)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_ON)
+    await hass.async_block_till_done()
+
+    assert len(calls) == 1
+    assert calls[0].data[ATTR_ENTITY_ID] == [group]
+
+
+@pytest.mark.asyncio
+async def test_only_latest_light_request_is_sent(hass):
+    """Test requests superseded before they are sent are dropped."""
+    hass.states.async_set(TEST_LIGHTS[0], STATE_ON)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_NAME: DEFAULT_NAME},
+        options={
+            CONF_AREA_ID: DEFAULT_AREA_ID,
+            CONF_USE_AREA_LIGHTS: False,
+            CONF_LIGHTS: TEST_LIGHTS,
+            CONF_USE_AREA_PRESENCE_SENSORS: False,
+            CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+            CONF_CREATE_LIGHT_GROUP: False,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    calls = async_capture_events(hass, EVENT_CALL_SERVICE)
+    (controller,) = hass.data[DOMAIN][DATA_CONTROLLERS].values()
+
+    # Requests made within the same loop iteration collapse to the latest
+    controller._async_request_lights(SERVICE_TURN_ON)
+    controller._async_request_lights(SERVICE_TURN_OFF)
+    await hass.async_block_till_done()
+
+    light_calls = [
+        call for call in calls if call.data["domain"] == LIGHT_DOMAIN
+    ]
+    assert len(light_calls) == 1
+    assert light_calls[0].data["service"] == SERVICE_TURN_OFF
+
+
+@pytest.mark.asyncio
+async def test_event_storm_is_collapsed(hass):
+    """Test a storm of events is processed once per entity."""
+    hass.states.async_set(TEST_LIGHTS[0], STATE_OFF)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_NAME: DEFAULT_NAME},
+        options={
+            CONF_AREA_ID: DEFAULT_AREA_ID,
+            CONF_USE_AREA_LIGHTS: False,
+            CONF_LIGHTS: TEST_LIGHTS,
+            CONF_USE_AREA_PRESENCE_SENSORS: False,
+            CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+            CONF_CREATE_LIGHT_GROUP: False,
+            CONF_CHATTER_THRESHOLD: 0,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    hass.states.async_set(
+        f"{SWITCH_DOMAIN}."
+        f"{slugify(SWITCH_AREA_DARK_PREFIX_NAME)}_"
+        f"{slugify(DEFAULT_NAME)}",
+        STATE_ON,
+    )
+    await hass.async_block_till_done()
+
+    calls = async_capture_events(hass, EVENT_CALL_SERVICE)
+    (controller,) = hass.data[DOMAIN][DATA_CONTROLLERS].values()
+
+    with patch.object(
+        controller,
+        "_process_state_change",
+        wraps=controller._process_state_change,
+    ) as process_state_change:
+        # The sensor flaps while the network heals and ends up on
+        for index in range(100):
+            hass.states.async_set(
+                TEST_PRESENCE_SENSOR_ENTITIES[0],
+                STATE_ON if index % 2 else STATE_OFF,
+                {"index": index},
+            )
+        await hass.async_block_till_done()
+
+    assert process_state_change.call_count == 1
+
+    light_calls = [
+        call for call in calls if call.data["domain"] == LIGHT_DOMAIN
+    ]
+    assert len(light_calls) == 1
+    assert light_calls[0].data["service"] == SERVICE_TURN_ON
+
+
+@pytest.mark.asyncio
+async def test_area_dark_follows_illuminance(hass):
+    """Test the area dark switch follows the filtered illuminance."""
+    illuminance_sensor = "sensor.illuminance"
+    area_dark_switch = (
+        f"{SWITCH_DOMAIN}."
+        f"{slugify(SWITCH_AREA_DARK_PREFIX_NAME)}_{slugify(DEFAULT_NAME)}"
+    )
+
+    hass.states.async_set(TEST_LIGHTS[0], STATE_OFF)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+    hass.states.async_set(illuminance_sensor, 200)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_NAME: DEFAULT_NAME},
+        options={
+            CONF_AREA_ID: DEFAULT_AREA_ID,
+            CONF_USE_AREA_LIGHTS: False,
+            CONF_LIGHTS: TEST_LIGHTS,
+            CONF_USE_AREA_PRESENCE_SENSORS: False,
+            CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+            CONF_CREATE_LIGHT_GROUP: False,
+            CONF_DARK_MODE: DARK_MODE_ILLUMINANCE,
+            CONF_ILLUMINANCE_SENSOR: illuminance_sensor,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert hass.states.get(area_dark_switch).state == STATE_OFF
+
+    # A single spike does not pass the median filter
+    for illuminance in (201, 0, 202):
+        hass.states.async_set(illuminance_sensor, illuminance)
+    await hass.async_block_till_done()
+    assert hass.states.get(area_dark_switch).state == STATE_OFF
+
+    # Dusk, the switch only changes when the threshold is crossed
+    for illuminance in [*range(100, 0, -5), *range(4, 0, -1)]:
+        hass.states.async_set(illuminance_sensor, illuminance)
+        await hass.async_block_till_done()
+    assert hass.states.get(area_dark_switch).state == STATE_ON
+
+    # The own lights brighten the area, it stays dark
+    hass.states.async_set(TEST_LIGHTS[0], STATE_ON)
+    for illuminance in range(300, 310):
+        hass.states.async_set(illuminance_sensor, illuminance)
+        await hass.async_block_till_done()
+    assert hass.states.get(area_dark_switch).state == STATE_ON
+
+    # Daylight on top of the lights makes the area bright
+    for illuminance in range(400, 500, 10):
+        hass.states.async_set(illuminance_sensor, illuminance)
+        await hass.async_block_till_done()
+    assert hass.states.get(area_dark_switch).state == STATE_OFF
+
+
+@pytest.mark.asyncio
+async def test_numeric_presence_source_only_reports_crossings(hass):
+    """Test a fast numeric source only reaches the decision path on edges."""
+    distance_sensor = "sensor.distance"
+    hass.states.async_set(TEST_LIGHTS[0], STATE_OFF)
+    hass.states.async_set(distance_sensor, 0)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_NAME: DEFAULT_NAME},
+        options={
+            CONF_AREA_ID: DEFAULT_AREA_ID,
+            CONF_USE_AREA_LIGHTS: False,
+            CONF_LIGHTS: TEST_LIGHTS,
+            CONF_USE_AREA_PRESENCE_SENSORS: False,
+            CONF_NUMERIC_PRESENCE_ENTITIES: [distance_sensor],
+            CONF_CREATE_LIGHT_GROUP: False,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    hass.states.async_set(
+        f"{SWITCH_DOMAIN}."
+        f"{slugify(SWITCH_AREA_DARK_PREFIX_NAME)}_"
+        f"{slugify(DEFAULT_NAME)}",
+        STATE_ON,
+    )
+    await hass.async_block_till_done()
+
+    calls = async_capture_events(hass, EVENT_CALL_SERVICE)
+    (controller,) = hass.data[DOMAIN][DATA_CONTROLLERS].values()
+
+    with patch.object(
+        controller, "_handle_action", wraps=controller._handle_action
+    ) as handle_action:
+        # A target walks in, the sensor reports many times a second
+        for distance in range(120, 170):
+            hass.states.async_set(distance_sensor, distance)
+        await hass.async_block_till_done()
+        assert handle_action.call_count == 1
+        assert controller.extra_state_attributes[ATTR_PRESENCE]
+
+        hass.states.async_set(TEST_LIGHTS[0], STATE_ON)
+
+        # The target leaves, the newest reading is evaluated after the
+        # interval
+        for distance in (80, 40, 0):
+            hass.states.async_set(distance_sensor, distance)
+        await hass.async_block_till_done()
+        assert handle_action.call_count == 1
+
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=2))
+        await hass.async_block_till_done()
+        assert handle_action.call_count == 2
+        assert not controller.extra_state_attributes[ATTR_PRESENCE]
+
+    light_calls = [
+        call.data["service"]
+        for call in calls
+        if call.data["domain"] == LIGHT_DOMAIN
+    ]
+    assert light_calls == [SERVICE_TURN_ON, SERVICE_TURN_OFF]
+
+
+@pytest.mark.asyncio
+async def test_unavailable_numeric_source_clears_presence(hass):
+    """Test a numeric source dropping out does not keep the lights on."""
+    distance_sensor = "sensor.distance"
+    hass.states.async_set(TEST_LIGHTS[0], STATE_OFF)
+    hass.states.async_set(distance_sensor, 0)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_NAME: DEFAULT_NAME},
+        options={
+            CONF_AREA_ID: DEFAULT_AREA_ID,
+            CONF_USE_AREA_LIGHTS: False,
+            CONF_LIGHTS: TEST_LIGHTS,
+            CONF_USE_AREA_PRESENCE_SENSORS: False,
+            CONF_NUMERIC_PRESENCE_ENTITIES: [distance_sensor],
+            CONF_CREATE_LIGHT_GROUP: False,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    hass.states.async_set(
+        f"{SWITCH_DOMAIN}."
+        f"{slugify(SWITCH_AREA_DARK_PREFIX_NAME)}_"
+        f"{slugify(DEFAULT_NAME)}",
+        STATE_ON,
+    )
+    await hass.async_block_till_done()
+
+    calls = async_capture_events(hass, EVENT_CALL_SERVICE)
+    (controller,) = hass.data[DOMAIN][DATA_CONTROLLERS].values()
+
+    hass.states.async_set(distance_sensor, 150)
+    await hass.async_block_till_done()
+    assert controller.extra_state_attributes[ATTR_PRESENCE]
+
+    hass.states.async_set(TEST_LIGHTS[0], STATE_ON)
+
+    # The sensor drops out while it detects presence
+    hass.states.async_set(distance_sensor, STATE_UNAVAILABLE)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=2))
+    await hass.async_block_till_done()
+    assert not controller.extra_state_attributes[ATTR_PRESENCE]
+
+    light_calls = [
+        call.data["service"]
+        for call in calls
+        if call.data["domain"] == LIGHT_DOMAIN
+    ]
+    assert light_calls == [SERVICE_TURN_ON, SERVICE_TURN_OFF]
+
+
+@pytest.mark.asyncio
+async def test_parent_area_follows_presence_of_child_areas(hass):
+    """Test an area without sensors follows the areas it contains."""
+    hallway_light = "light.hallway"
+    bedroom_sensor = "binary_sensor.bedroom"
+    bedroom_switch = (
+        f"{SWITCH_DOMAIN}."
+        f"{slugify(SWITCH_LIGHT_CONTROL_PREFIX_NAME)}_bedroom"
+    )
+
+    hass.states.async_set(hallway_light, STATE_OFF)
+    hass.states.async_set(TEST_LIGHTS[0], STATE_OFF)
+    hass.states.async_set(bedroom_sensor, STATE_OFF)
+
+    areas = {
+        "hallway": {
+            CONF_LIGHTS: [hallway_light],
+            CONF_CHILD_AREAS: [bedroom_switch],
+        },
+        "bedroom": {
+            CONF_LIGHTS: TEST_LIGHTS,
+            CONF_PRESENCE_SENSOR_ENTITIES: [bedroom_sensor],
+        },
+    }
+    for name, options in areas.items():
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={CONF_NAME: name},
+            options={
+                CONF_AREA_ID: DEFAULT_AREA_ID,
+                CONF_USE_AREA_LIGHTS: False,
+                CONF_USE_AREA_PRESENCE_SENSORS: False,
+                CONF_CREATE_LIGHT_GROUP: False,
+                **options,
+            },
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        hass.states.async_set(
+            f"{SWITCH_DOMAIN}."
+            f"{slugify(SWITCH_AREA_DARK_PREFIX_NAME)}_{name}",
+            STATE_ON,
+        )
+    await hass.async_block_till_done()
+
+    calls = async_capture_events(hass, EVENT_CALL_SERVICE)
+
+    hass.states.async_set(bedroom_sensor, STATE_ON)
+    await hass.async_block_till_done()
+
+    turned_on = [
+        entity_id
+        for call in calls
+        if call.data["domain"] == LIGHT_DOMAIN
+        and call.data["service"] == SERVICE_TURN_ON
+        for entity_id in call.data["service_data"][ATTR_ENTITY_ID]
+    ]
+    assert sorted(turned_on) == sorted([hallway_light, TEST_LIGHTS[0]])
+
+    hallway = next(
+        controller
+        for controller in hass.data[DOMAIN][DATA_CONTROLLERS].values()
+        if controller.lights == [hallway_light]
+    )
+    assert hallway.extra_state_attributes[ATTR_PRESENCE]
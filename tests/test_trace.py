@@ -0,0 +1,105 @@
+"""Tests for the decision trace."""
+
+import pytest
+
+from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
+from homeassistant.components.switch import DOMAIN as SWITCH_DOMAIN
+from homeassistant.const import SERVICE_TURN_ON, STATE_OFF, STATE_ON
+from homeassistant.util import slugify
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_mock_service,
+)
+
+from custom_components.simple_area_presence_lighting.const import (
+    ACTION_TURN_ON_LIGHTS,
+    CONF_AREA_ID,
+    CONF_CREATE_LIGHT_GROUP,
+    CONF_LIGHTS,
+    CONF_NAME,
+    CONF_PRESENCE_SENSOR_ENTITIES,
+    CONF_USE_AREA_LIGHTS,
+    CONF_USE_AREA_PRESENCE_SENSORS,
+    DEFAULT_AREA_ID,
+    DEFAULT_NAME,
+    DOMAIN,
+    SERVICE_GET_TRACE,
+    SWITCH_AREA_DARK_PREFIX_NAME,
+    SWITCH_LIGHT_CONTROL_PREFIX_NAME,
+    TEST_LIGHTS,
+    TEST_PRESENCE_SENSOR_ENTITIES,
+)
+from custom_components.simple_area_presence_lighting.trace import (
+    DecisionTrace,
+)
+
+
+def test_trace_keeps_latest_decisions():
+    """Test the trace overwrites the oldest decisions when full."""
+    trace = DecisionTrace(3)
+    for index in range(5):
+        trace.record(f"sensor_{index}", None, False, False, False, None)
+
+    assert len(trace) == 3
+    assert [decision["source"] for decision in trace.as_list()] == [
+        "sensor_2",
+        "sensor_3",
+        "sensor_4",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_trace_returns_decisions(hass):
+    """Test the decisions of an area are returned by the service."""
+    hass.states.async_set(TEST_LIGHTS[0], STATE_OFF)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_NAME: DEFAULT_NAME},
+        options={
+            CONF_AREA_ID: DEFAULT_AREA_ID,
+            CONF_USE_AREA_LIGHTS: False,
+            CONF_LIGHTS: TEST_LIGHTS,
+            CONF_USE_AREA_PRESENCE_SENSORS: False,
+            CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+            CONF_CREATE_LIGHT_GROUP: False,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    hass.states.async_set(
+        f"{SWITCH_DOMAIN}."
+        f"{slugify(SWITCH_AREA_DARK_PREFIX_NAME)}_{slugify(DEFAULT_NAME)}",
+        STATE_ON,
+    )
+    await hass.async_block_till_done()
+
+    async_mock_service(hass, LIGHT_DOMAIN, SERVICE_TURN_ON)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_ON)
+    await hass.async_block_till_done()
+
+    entity_id = (
+        f"{SWITCH_DOMAIN}."
+        f"{slugify(SWITCH_LIGHT_CONTROL_PREFIX_NAME)}_{slugify(DEFAULT_NAME)}"
+    )
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_GET_TRACE,
+        {"entity_id": entity_id},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response[entity_id][-1] == {
+        "time": response[entity_id][-1]["time"],
+        "source": TEST_PRESENCE_SENSOR_ENTITIES[0],
+        "action": ACTION_TURN_ON_LIGHTS,
+        "presence": True,
+        "dark": True,
+        "lights_on": False,
+        "outcome": SERVICE_TURN_ON,
+    }
@@ -0,0 +1,177 @@
+"""Tests for the WebSocket API."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.components import websocket_api
+
+from homeassistant.components.switch import DOMAIN as SWITCH_DOMAIN
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.util import slugify
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.simple_area_presence_lighting.const import (
+    CONF_AREA_ID,
+    CONF_CREATE_LIGHT_GROUP,
+    CONF_LIGHTS,
+    CONF_NAME,
+    CONF_PRESENCE_SENSOR_ENTITIES,
+    CONF_USE_AREA_LIGHTS,
+    CONF_USE_AREA_PRESENCE_SENSORS,
+    DEFAULT_AREA_ID,
+    DATA_STREAM,
+    DEFAULT_MANUAL_OVERRIDE_DURATION,
+    DEFAULT_NAME,
+    DOMAIN,
+    SWITCH_LIGHT_CONTROL_PREFIX_NAME,
+    TEST_LIGHTS,
+    TEST_PRESENCE_SENSOR_ENTITIES,
+    WS_TYPE_SUBSCRIBE,
+)
+from custom_components.simple_area_presence_lighting.websocket_api import (
+    websocket_subscribe,
+)
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_snapshot_and_deltas(hass):
+    """Test a snapshot of all areas is sent, then only the changes."""
+    hass.states.async_set(TEST_LIGHTS[0], STATE_OFF)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_NAME: DEFAULT_NAME},
+        options={
+            CONF_AREA_ID: DEFAULT_AREA_ID,
+            CONF_USE_AREA_LIGHTS: False,
+            CONF_LIGHTS: TEST_LIGHTS,
+            CONF_USE_AREA_PRESENCE_SENSORS: False,
+            CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+            CONF_CREATE_LIGHT_GROUP: False,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = (
+        f"{SWITCH_DOMAIN}."
+        f"{slugify(SWITCH_LIGHT_CONTROL_PREFIX_NAME)}_{slugify(DEFAULT_NAME)}"
+    )
+
+    deltas = []
+    snapshot, unsubscribe = hass.data[DOMAIN][DATA_STREAM].async_subscribe(
+        deltas.append
+    )
+    assert snapshot == {
+        entity_id: {
+            "presence": False,
+            "dark": False,
+            "override": False,
+            "lights_on": 0,
+        }
+    }
+
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_ON)
+    await hass.async_block_till_done()
+
+    await asyncio.sleep(0)
+    assert deltas == [{entity_id: {"presence": True}}]
+
+    # Events without a change of an area are not sent
+    hass.states.async_set(TEST_LIGHTS[0], STATE_OFF, {"brightness": 0})
+    await hass.async_block_till_done()
+    await asyncio.sleep(0)
+    assert len(deltas) == 1
+
+    # Switching the light by hand pauses the area
+    hass.states.async_set(TEST_LIGHTS[0], STATE_ON)
+    await hass.async_block_till_done()
+    await asyncio.sleep(0)
+    assert deltas[1:] == [{entity_id: {"override": True, "lights_on": 1}}]
+
+    unsubscribe()
+    assert not hass.data[DOMAIN][DATA_STREAM].has_subscribers
+
+
+@pytest.mark.asyncio
+async def test_subscribe_command_sends_snapshot_and_deltas(hass, freezer):
+    """Test the subscribe command until the subscription is removed."""
+    hass.states.async_set(TEST_LIGHTS[0], STATE_OFF)
+    hass.states.async_set(TEST_PRESENCE_SENSOR_ENTITIES[0], STATE_OFF)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_NAME: DEFAULT_NAME},
+        options={
+            CONF_AREA_ID: DEFAULT_AREA_ID,
+            CONF_USE_AREA_LIGHTS: False,
+            CONF_LIGHTS: TEST_LIGHTS,
+            CONF_USE_AREA_PRESENCE_SENSORS: False,
+            CONF_PRESENCE_SENSOR_ENTITIES: TEST_PRESENCE_SENSOR_ENTITIES,
+            CONF_CREATE_LIGHT_GROUP: False,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = (
+        f"{SWITCH_DOMAIN}."
+        f"{slugify(SWITCH_LIGHT_CONTROL_PREFIX_NAME)}_{slugify(DEFAULT_NAME)}"
+    )
+
+    connection = MagicMock()
+    connection.subscriptions = {}
+    websocket_subscribe(hass, connection, {"id": 5, "type": WS_TYPE_SUBSCRIBE})
+
+    connection.send_result.assert_called_once_with(5)
+    assert connection.send_message.call_args_list[0].args == (
+        websocket_api.event_message(
+            5,
+            {
+                "snapshot": {
+                    entity_id: {
+                        "presence": False,
+                        "dark": False,
+                        "override": False,
+                        "lights_on": 0,
+                    }
+                }
+            },
+        ),
+    )
+    connection.send_message.reset_mock()
+
+    # Switching the light by hand pauses the area
+    hass.states.async_set(TEST_LIGHTS[0], STATE_ON)
+    await hass.async_block_till_done()
+    await asyncio.sleep(0)
+    connection.send_message.assert_called_once_with(
+        websocket_api.event_message(
+            5, {"delta": {entity_id: {"override": True, "lights_on": 1}}}
+        )
+    )
+    connection.send_message.reset_mock()
+
+    # The end of the pause is sent even if nothing else happens
+    freezer.tick(timedelta(minutes=DEFAULT_MANUAL_OVERRIDE_DURATION))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    await asyncio.sleep(0)
+    connection.send_message.assert_called_once_with(
+        websocket_api.event_message(
+            5, {"delta": {entity_id: {"override": False}}}
+        )
+    )
+
+    # Removing the subscription stops the stream
+    connection.subscriptions.pop(5)()
+    assert not hass.data[DOMAIN][DATA_STREAM].has_subscribers